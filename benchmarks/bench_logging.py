@@ -0,0 +1,64 @@
+"""
+Compares the time per record of PrintyFormatter with a plain
+logging.Formatter, and with formatting the record by hand with raw()
+
+    uv run python benchmarks/bench_logging.py
+"""
+
+from __future__ import annotations
+
+import logging
+import timeit
+
+from printy import escape, raw
+from printy.logging import PrintyFormatter
+
+FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+NUMBER = 20000
+
+
+class RawFormatter(logging.Formatter):
+    """The formatter we used to write, parsing every record with raw()"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        record = logging.makeLogRecord(record.__dict__)
+        record.args = tuple(
+            escape(arg) if isinstance(arg, str) else arg for arg in record.args or ()
+        )
+        return raw(super().format(record))
+
+
+def make_record() -> logging.LogRecord:
+    return logging.makeLogRecord(
+        {
+            "name": "app.requests",
+            "levelno": logging.INFO,
+            "levelname": "INFO",
+            "msg": "[nB]Handled@ %s in %d ms",
+            "args": ("GET /api/items?filter=[a]", 12),
+        }
+    )
+
+
+def main() -> None:
+    record = make_record()
+    formatters = {
+        "logging.Formatter": logging.Formatter(FORMAT),
+        "PrintyFormatter": PrintyFormatter(FORMAT),
+        "raw() by hand": RawFormatter(FORMAT),
+    }
+    baseline = None
+    for name, formatter in formatters.items():
+        seconds = min(
+            timeit.repeat(lambda: formatter.format(record), number=NUMBER, repeat=5)
+        )
+        per_record = seconds / NUMBER * 1e6
+        baseline = baseline or per_record
+        print(
+            "%-20s %8.2f us/record  (+%.2f us)"
+            % (name, per_record, per_record - baseline)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Compares the bytes written by printy, which only adds the changes of style
+between sections, with the bytes of adding the codes of each section and
+resetting them after it, as printy used to do
+
+    uv run python benchmarks/bench_output_size.py
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from printy.core import Printy
+from printy.flags import Flags
+
+PRINTY = Printy(color=True)
+
+WORKLOADS: dict[str, tuple[Any, str]] = {
+    "pretty printed dict": (
+        {
+            "id": 71,
+            "zip_codes": ["050001", "050005", "050011", "050015", "050024"],
+            "code": "05001",
+            "country": {"code": "co", "active": True},
+            "city_translations": [{"language_code": "es", "name": "Medellín"}],
+            "flag": None,
+        },
+        "",
+    ),
+    "pretty printed list": (list(range(200)), "y"),
+    "log lines": (
+        "".join(
+            "[g]2024-01-01 10:00:%02d@ [c]INFO@ [nB]GET@ [n]/api/items/%d@ "
+            "in [y]%d@ ms\n" % (i % 60, i, i % 17)
+            for i in range(100)
+        ),
+        "",
+    ),
+    "bold words": ("[B]Some@ [B]bold@ [BU]and@ [B]underlined@ [B]words@ " * 50, ""),
+    "predefined colors": ("Some [r]red@ text, and [rB]bold@ text, " * 50, "r"),
+}
+
+
+def per_section(value: Any, predefined: str) -> str:
+    """The text formatted with the codes of each section, and a reset after it"""
+    if not isinstance(value, str):
+        value = Printy._pretty_print_object(value, 4)
+    sections = []
+    for text, flags in Printy._tokenize(value, unescape=True):
+        flags = flags or predefined
+        if flags:
+            sections.append(Flags.get_prefix(flags) + text + Flags.get_end_of_line())
+        else:
+            sections.append(text)
+    return "".join(sections)
+
+
+def main() -> None:
+    print("%-22s %12s %12s %8s" % ("", "per section", "changes", "saved"))
+    for name, (value, predefined) in WORKLOADS.items():
+        before = len(per_section(value, predefined).encode())
+        after = len(PRINTY.get_formatted_text(value, predefined=predefined).encode())
+        print(
+            "%-22s %12d %12d %7.1f%%"
+            % (name, before, after, 100 - 100 * after / before)
+        )
+
+
+if __name__ == "__main__":
+    main()
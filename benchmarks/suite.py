@@ -0,0 +1,297 @@
+"""
+Benchmarks of the parser, the flags, the pretty printer, the output and the
+import of printy. The results are compared with the ones saved in a baseline
+file, and any benchmark slower than its tolerance allows is a regression (the
+exit code is 1)
+
+    uv run python benchmarks/suite.py              # compares with the baseline
+    uv run python benchmarks/suite.py --save       # saves a new baseline
+    uv run python benchmarks/suite.py -k parse     # only the matching benchmarks
+
+The times depend on the machine, so the baseline is not kept in the repo: save
+one on the same machine (and python version) before comparing, e.g. before
+starting some perf work.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import timeit
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import printy
+from printy.core import Printy
+from printy.flags import Flags
+from printy.logging import PrintyFormatter
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+# A benchmark is slower than its baseline if it takes more than this ratio
+# longer, unless the benchmark sets its own tolerance
+DEFAULT_TOLERANCE = 0.2
+
+# Each benchmark is timed this many times, and only the best time is kept,
+# the other ones were slowed down by the machine
+REPEAT = 20
+
+PRINTY = Printy(color=True)
+
+SHORT_TEXT = "[rB]Some@ text, and [y]more@ text"
+LONG_TEXT = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua. [B]Ut enim@ ad minim "
+    "veniam, quis nostrud exercitation ullamco laboris nisi ut aliquip ex ea "
+    "commodo consequat, [c]support\\@example.com@. "
+) * 100
+DENSE_TEXT = "[r]a@[B]b@\\@[y]\\[c\\]@[]@" * 500
+FLAGS = "rBU{y}"
+
+NESTED_DATA = [
+    {
+        "id": i,
+        "name": "item [%d]" % i,
+        "price": i * 1.25,
+        "active": i % 2 == 0,
+        "tags": ["a", "b@", "c"],
+        "owner": {"id": i % 7, "email": "user%d@example.com" % i, "roles": None},
+    }
+    for i in range(500)
+]
+
+RECORD = logging.makeLogRecord(
+    {
+        "name": "app.requests",
+        "levelno": logging.INFO,
+        "levelname": "INFO",
+        "msg": "[nB]Handled@ %s in %d ms",
+        "args": ("GET /api/items?filter=[a]", 12),
+    }
+)
+FORMATTER = PrintyFormatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+
+class Benchmark(NamedTuple):
+    name: str
+    function: Callable[[], Any]
+    tolerance: float | None = None
+
+
+def printy_to_null(value: Any) -> Callable[[], None]:
+    """Prints the value out with printy() to a file that discards it"""
+
+    def _printy() -> None:
+        with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+            PRINTY.format(value)
+
+    return _printy
+
+
+BENCHMARKS = [
+    Benchmark("parse_short", lambda: Printy._get_inline_format_as_tuple(SHORT_TEXT)),
+    Benchmark("parse_long", lambda: Printy._get_inline_format_as_tuple(LONG_TEXT)),
+    Benchmark("parse_dense", lambda: Printy._get_inline_format_as_tuple(DENSE_TEXT)),
+    Benchmark("flag_values", lambda: Flags.get_flag_values(FLAGS)),
+    Benchmark("flag_prefix", lambda: Flags.get_prefix(FLAGS)),
+    Benchmark(
+        "pretty_print_markup", lambda: Printy._pretty_print_object(NESTED_DATA, 4)
+    ),
+    Benchmark("pretty_print_formatted", lambda: PRINTY.get_formatted_text(NESTED_DATA)),
+    Benchmark("escape", lambda: PRINTY.escape(LONG_TEXT)),
+    Benchmark("strip", lambda: Printy.strip(DENSE_TEXT)),
+    Benchmark("raw_short", lambda: PRINTY.get_formatted_text(SHORT_TEXT)),
+    Benchmark("raw_long", lambda: PRINTY.get_formatted_text(LONG_TEXT)),
+    Benchmark("logging_format", lambda: FORMATTER.format(RECORD)),
+    # Opening the null sink makes these ones noisier
+    Benchmark("printy_short", printy_to_null(SHORT_TEXT), 0.3),
+    Benchmark("printy_nested", printy_to_null(NESTED_DATA), 0.3),
+]
+
+
+class ImportBenchmark(NamedTuple):
+    name: str
+    code: str
+    tolerance: float | None = None
+
+
+# Timed with 'python -X importtime' in a new interpreter each time, adding the
+# times of printy's modules, as they may be imported when first used
+IMPORT_BENCHMARKS = [
+    ImportBenchmark("import_printy", "import printy", 0.3),
+    ImportBenchmark("import_printy_first_use", "import printy; printy.raw('[r]a@')"),
+]
+
+
+def measure(functions: dict[str, Callable[[], Any]], repeat: int) -> dict[str, float]:
+    """
+    Returns the best time, in seconds, of a call to each function. The
+    functions are timed in turns, so if the machine gets slower for a while,
+    that doesn't slow down all the times of a single function
+    """
+    timers = {name: timeit.Timer(function) for name, function in functions.items()}
+    # The number of calls that take about 0.05 seconds
+    numbers = {
+        name: max(timer.autorange()[0] // 4, 1) for name, timer in timers.items()
+    }
+    times: dict[str, list[float]] = {name: [] for name in timers}
+    for _ in range(repeat):
+        for name, timer in timers.items():
+            times[name].append(timer.timeit(numbers[name]) / numbers[name])
+    return {name: min(seconds) for name, seconds in times.items()}
+
+
+def measure_imports(codes: dict[str, str], repeat: int) -> dict[str, float]:
+    """Returns the best time, in seconds, of the imports of printy in each code"""
+    environment = {
+        **os.environ,
+        # The same printy as the one of this process
+        "PYTHONPATH": os.pathsep.join(
+            [str(Path(printy.__file__).parent.parent), os.environ.get("PYTHONPATH", "")]
+        ),
+    }
+    # The bytecode is cached, as it is for an installed package
+    environment.pop("PYTHONDONTWRITEBYTECODE", None)
+    command = [sys.executable, "-X", "importtime", "-c"]
+    times: dict[str, list[float]] = {name: [] for name in codes}
+    for code in codes.values():
+        # Writes the bytecode, if it's not cached yet
+        subprocess.run(command + [code], env=environment, capture_output=True)
+    for _ in range(repeat):
+        for name, code in codes.items():
+            process = subprocess.run(
+                command + [code],
+                env=environment,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            # Lines like 'import time: self [us] | cumulative | package', where
+            # the packages imported by another one are indented
+            microseconds = 0
+            for line in process.stderr.splitlines():
+                _, cumulative, package = line.split("|")
+                if package.startswith(" printy"):
+                    microseconds += int(cumulative)
+            times[name].append(microseconds / 1e6)
+    return {name: min(seconds) for name, seconds in times.items()}
+
+
+def get_environment() -> dict[str, str]:
+    """The machine and python the results were measured on"""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return "%.2f %s" % (seconds / scale, unit)
+    return "%.1f ns" % (seconds / 1e-9)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Runs the benchmarks of printy")
+    parser.add_argument(
+        "--baseline", type=Path, default=BASELINE, help="baseline file (json)"
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="save the results as the new baseline"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=None,
+        help="allowed slowdown ratio for every benchmark, i.e. 0.2 for 20%%",
+    )
+    parser.add_argument(
+        "-k", dest="keyword", default="", help="only the benchmarks with this text"
+    )
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    baseline: dict[str, Any] = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+    elif not args.save:
+        print(
+            "There's no baseline in %s yet, save one with --save" % args.baseline,
+            file=sys.stderr,
+        )
+    environment = get_environment()
+    if not args.save and baseline.get("environment", environment) != environment:
+        print(
+            "Warning: the baseline was measured on %s" % baseline["environment"],
+            file=sys.stderr,
+        )
+    saved = baseline.get("results", {})
+
+    benchmarks = [
+        benchmark for benchmark in BENCHMARKS if args.keyword in benchmark.name
+    ]
+    import_benchmarks = [
+        benchmark for benchmark in IMPORT_BENCHMARKS if args.keyword in benchmark.name
+    ]
+    results = {
+        **measure(
+            {benchmark.name: benchmark.function for benchmark in benchmarks},
+            args.repeat,
+        ),
+        **measure_imports(
+            {benchmark.name: benchmark.code for benchmark in import_benchmarks},
+            args.repeat,
+        ),
+    }
+    regressions = []
+    print("%-24s %12s %12s %9s" % ("", "baseline", "current", "change"))
+    for benchmark in [*benchmarks, *import_benchmarks]:
+        seconds = results[benchmark.name]
+        line = "%-24s %12s %12s" % (benchmark.name, "-", format_time(seconds))
+        if benchmark.name in saved:
+            before = saved[benchmark.name]
+            change = seconds / before - 1
+            tolerance = args.tolerance
+            if tolerance is None:
+                tolerance = benchmark.tolerance or DEFAULT_TOLERANCE
+            line = "%-24s %12s %12s %+8.1f%%" % (
+                benchmark.name,
+                format_time(before),
+                format_time(seconds),
+                100 * change,
+            )
+            if change > tolerance:
+                regressions.append(benchmark.name)
+                line += "  slower (tolerance %.0f%%)" % (100 * tolerance)
+        print(line)
+
+    if args.save:
+        # Keeps the results of the benchmarks that were not run
+        baseline = {
+            "environment": environment,
+            "results": {**saved, **results},
+        }
+        args.baseline.write_text(json.dumps(baseline, indent=2) + "\n")
+        print("Saved the baseline in %s" % args.baseline)
+        return 0
+    if regressions:
+        print("Slower than the baseline: %s" % ", ".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
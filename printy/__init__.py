@@ -8,24 +8,209 @@ a friendly and intuitive syntax
 
 from __future__ import annotations
 
+import os
 import warnings
-from importlib.metadata import version
-from typing import Any
 
-from .core import Printy
-from .flags import Flags
-
-try:
-    __version__ = version("printy")
-except Exception:  # pragma: no cover
-    __version__ = "unknown"  # Fallback for development
-
-__all__ = ["raw", "raw_format", "printy", "inputy", "escape", "COLORS", "FORMATS"]
+# Without importing typing, which takes longer than the rest of the package
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+
+    from .core import Printy
+
+__all__ = [
+    "raw",
+    "raw_format",
+    "printy",
+    "raw_many",
+    "printy_many",
+    "fmt",
+    "inputy",
+    "escape",
+    "strip",
+    "strip_many",
+    "width",
+    "ljust",
+    "rjust",
+    "center",
+    "set_color",
+    "set_color_depth",
+    "TRUECOLOR",
+    "COLORS",
+    "FORMATS",
+    "add_flag",
+    "add_alias",
+    "remove_flag",
+    "add_theme",
+    "use_theme",
+    "get_theme",
+    "Style",
+    "Template",
+    "stream",
+    "PrintyWriter",
+    "AsyncPrintyWriter",
+    "LiveRegion",
+    "Table",
+    "stats",
+    "enable_stats",
+    "disable_stats",
+    "reset_stats",
+    "enable_profiler",
+    "disable_profiler",
+    "reset_profiler",
+    "profiler_report",
+]
+
+# The functions of the package are methods of the default instance, created
+# (and so the platform is detected) the first time one of them is used
+_instance_methods = {
+    # If user just want to get the formatted text with the ANSI escape sequences
+    "raw": "get_formatted_text",
+    # Main function to extend print() functionality
+    "printy": "format",
+    # The same for many values with the same flags, resolved once per batch
+    "raw_many": "get_formatted_texts",
+    "printy_many": "format_many",
+    # Pre-parses a format to render it many times. Not included in __all__ so
+    # a star import does not shadow the builtin compile()
+    "compile": "compile",
+    # Formats a template with values that are never parsed, i.e. untrusted ones
+    "fmt": "fmt",
+    # Formats texts that come in chunks, i.e. big files
+    "stream": "stream",
+    # Escaping function for untrusted sources
+    "escape": "escape",
+    # Removes the inline formats, i.e. to write the same text to a plain log file
+    "strip": "strip",
+    "strip_many": "strip_many",
+    # Forces or disables the ansi codes, by default they depend on the output
+    "set_color": "set_color",
+}
+
+# Other functions of the package, with their modules and names in them
+_functions = {
+    # Number of cells of the terminal a text takes once printed, and padding
+    # with inline formats (see 'printy.widths')
+    "width": ("widths", "get_width"),
+    "ljust": ("widths", "ljust"),
+    "rjust": ("widths", "rjust"),
+    "center": ("widths", "center"),
+    # Number of colors of the terminal, that the truecolor flags ('#rrggbb'
+    # and 'rgb(r,g,b)') are downgraded to (see 'printy.colors')
+    "set_color_depth": ("flags", "set_color_depth"),
+    "TRUECOLOR": ("colors", "TRUECOLOR"),
+    # Colors, aliases and themes added at runtime (see 'printy.themes')
+    "add_flag": ("themes", "add_flag"),
+    "add_alias": ("themes", "add_alias"),
+    "remove_flag": ("themes", "remove_flag"),
+    "add_theme": ("themes", "add_theme"),
+    "use_theme": ("themes", "use_theme"),
+    "get_theme": ("themes", "get_theme"),
+    # Opt-in counters and timers of each stage (see 'printy.instrumentation')
+    "stats": ("instrumentation", "get_stats"),
+    "enable_stats": ("instrumentation", "enable"),
+    "disable_stats": ("instrumentation", "disable"),
+    "reset_stats": ("instrumentation", "reset"),
+    # Opt-in profiler of the lines that call printy (see 'printy.profiler')
+    "enable_profiler": ("profiler", "enable"),
+    "disable_profiler": ("profiler", "disable"),
+    "reset_profiler": ("profiler", "reset"),
+    "profiler_report": ("profiler", "report"),
+}
+
+# The classes of the package, and their modules
+_classes = {
+    "Printy": "core",
+    "Flags": "flags",
+    "Style": "style",
+    "Template": "template",
+    "PrintyWriter": "writer",
+    "AsyncPrintyWriter": "writer",
+    "LiveRegion": "live",
+    "Table": "table",
+}
+
+
+def _get_printy_instance() -> Printy:
+    """Returns the default instance, creating it the first time"""
+    instance = globals().get("printy_instance")
+    if instance is None:
+        from .core import Printy
+
+        instance = globals()["printy_instance"] = Printy()
+        if os.environ.get("PRINTY_PROFILE"):
+            from .profiler import enable_from_environment
+
+            enable_from_environment()
+    return instance
+
+
+def _bind_instance_methods() -> None:
+    """
+    Binds the functions of the package already used (and so kept in its
+    globals) to the methods of the default instance again, i.e. once the
+    instrumentation or the profiler replace or restore them
+    """
+    instance = globals().get("printy_instance")
+    if instance is None:
+        return
+    for name, method in _instance_methods.items():
+        if name in globals():
+            globals()[name] = getattr(instance, method)
 
-printy_instance = Printy()
 
-# If user just want to get the formatted text with the ANSI escape sequences
-raw = printy_instance.get_formatted_text
+def __getattr__(name: str) -> Any:
+    """
+    Resolves the attributes of the package the first time they're used, so
+    importing printy doesn't import the parser, the flags or the package
+    metadata until they're needed
+    """
+    value: Any
+    if name == "printy_instance":
+        value = _get_printy_instance()
+    elif name in _instance_methods:
+        value = getattr(_get_printy_instance(), _instance_methods[name])
+    elif name in _classes or name in _functions:
+        from importlib import import_module
+
+        module, attribute = _functions.get(name, (_classes.get(name, ""), name))
+        value = getattr(import_module("." + module, __name__), attribute)
+    elif name in ("available_flags", "COLORS", "FORMATS"):
+        from .flags import Flags
+
+        # shortcut to get a list of the available flags and formats
+        available_flags = globals()["available_flags"] = Flags.get_flags().keys()
+        globals()["COLORS"] = list(filter(lambda c: c.islower(), available_flags))
+        globals()["FORMATS"] = list(filter(lambda f: f.isupper(), available_flags))
+        return globals()[name]
+    elif name == "__version__":
+        from importlib.metadata import version
+
+        try:
+            value = version("printy")
+        except Exception:  # pragma: no cover
+            value = "unknown"  # Fallback for development
+    else:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    # The next time, it's found without calling this function
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(
+        {
+            *globals(),
+            *_instance_methods,
+            *_functions,
+            *_classes,
+            "printy_instance",
+            "available_flags",
+            "COLORS",
+            "FORMATS",
+            "__version__",
+        }
+    )
 
 
 # Backward compatibility alias - will be deprecated in future versions
@@ -37,7 +222,7 @@ def _deprecated_raw_format(*args: Any, **kwargs: Any) -> str:
         DeprecationWarning,
         stacklevel=2,
     )
-    return raw(*args, **kwargs)
+    return _get_printy_instance().get_formatted_text(*args, **kwargs)
 
 
 raw_format = _deprecated_raw_format
@@ -61,18 +246,7 @@ def _deprecated_inputy(*args: Any, **kwargs: Any) -> str:
     # max_digits, max_decimals) are ignored as they're not supported by built-in input()
     # Apply raw() formatting to maintain backward compatibility with formatted prompts
     prompt = args[0] if args else ""
-    return input(raw(prompt))
+    return input(_get_printy_instance().get_formatted_text(prompt))
 
 
 inputy = _deprecated_inputy
-
-# Main function to extend print() functionality
-printy = printy_instance.format
-
-# Escaping function for untrusted sources
-escape = printy_instance.escape
-
-# shortcut to get a list of the available flags and formats
-available_flags = Flags.get_flags().keys()
-COLORS = list(filter(lambda c: c.islower(), available_flags))
-FORMATS = list(filter(lambda f: f.isupper(), available_flags))
@@ -0,0 +1,114 @@
+"""
+Truecolor flags, '#rrggbb' or 'rgb(r,g,b)', and their nearest colors in the
+palettes of the terminals that don't support them, i.e.
+
+>>> parse_color('#ff8800')
+(255, 136, 0)
+>>> get_nearest_256(255, 136, 0)
+208
+>>> get_nearest_16(255, 136, 0)
+3
+"""
+
+from __future__ import annotations
+
+import os
+import re
+
+# The number of colors a terminal can show
+TRUECOLOR = 1 << 24
+color_depths = (16, 256, TRUECOLOR)
+
+hex_color_regex = re.compile(r"#([0-9a-fA-F]{2})([0-9a-fA-F]{2})([0-9a-fA-F]{2})")
+rgb_color_regex = re.compile(r"rgb\((\d{1,3}),(\d{1,3}),(\d{1,3})\)")
+
+# Levels of each channel in the 6x6x6 cube of the 256 color palette (16 to
+# 231), and the first of the 24 grays after it (232 to 255, 10 apart)
+cube_levels = (0, 95, 135, 175, 215, 255)
+first_gray = 8
+
+# The 16 colors of a basic terminal, as xterm shows them by default
+basic_colors = (
+    (0, 0, 0),
+    (205, 0, 0),
+    (0, 205, 0),
+    (205, 205, 0),
+    (0, 0, 238),
+    (205, 0, 205),
+    (0, 205, 205),
+    (229, 229, 229),
+    (127, 127, 127),
+    (255, 0, 0),
+    (0, 255, 0),
+    (255, 255, 0),
+    (92, 92, 255),
+    (255, 0, 255),
+    (0, 255, 255),
+    (255, 255, 255),
+)
+
+# Terminals that only show the basic colors, without a 256 color TERM
+basic_terminals = {"linux", "vt100", "vt220", "ansi", "cygwin"}
+
+
+def parse_color(flag: str) -> tuple[int, int, int] | None:
+    """Returns the (red, green, blue) of a truecolor flag, or None if it's not"""
+    matched = hex_color_regex.fullmatch(flag)
+    if matched is not None:
+        red, green, blue = matched.groups()
+        return int(red, 16), int(green, 16), int(blue, 16)
+    matched = rgb_color_regex.fullmatch(flag)
+    if matched is not None:
+        rgb = int(matched[1]), int(matched[2]), int(matched[3])
+        if max(rgb) <= 255:
+            return rgb
+    return None
+
+
+def _distance(a: tuple[int, int, int], b: tuple[int, int, int]) -> int:
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+
+def _cube_index(channel: int) -> int:
+    """The index of the nearest level of the cube to a channel"""
+    if channel < 48:
+        return 0
+    if channel < 115:
+        return 1
+    return (channel - 35) // 40
+
+
+def get_nearest_256(red: int, green: int, blue: int) -> int:
+    """
+    Returns the nearest color of the 256 color palette, either from the cube
+    or from the grays, found without looking through all of them
+    """
+    rgb = (red, green, blue)
+    r, g, b = _cube_index(red), _cube_index(green), _cube_index(blue)
+    cube = (cube_levels[r], cube_levels[g], cube_levels[b])
+    gray_index = min(max(round(((red + green + blue) / 3 - first_gray) / 10), 0), 23)
+    gray_level = first_gray + 10 * gray_index
+    if _distance(rgb, (gray_level,) * 3) < _distance(rgb, cube):
+        return 232 + gray_index
+    return 16 + 36 * r + 6 * g + b
+
+
+def get_nearest_16(red: int, green: int, blue: int) -> int:
+    """Returns the nearest of the 16 basic colors"""
+    rgb = (red, green, blue)
+    return min(range(16), key=lambda index: _distance(rgb, basic_colors[index]))
+
+
+def get_color_depth() -> int:
+    """
+    Returns the number of colors the terminal shows, according to the
+    environment: all of them if COLORTERM says so (or in Windows Terminal),
+    16 for the basic terminals, and 256 otherwise, as for printy's own flags
+    """
+    if os.environ.get("COLORTERM") in ("truecolor", "24bit") or os.environ.get(
+        "WT_SESSION"
+    ):
+        return TRUECOLOR
+    if os.environ.get("TERM") in basic_terminals:
+        return 16
+    return 256
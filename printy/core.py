@@ -1,9 +1,16 @@
 from __future__ import annotations
 
-import platform
-from typing import Any
+import mmap
+import os
+import re
+import sys
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
+from functools import lru_cache, partial
+from typing import Any, AnyStr, BinaryIO, Generic, TextIO, cast
 
-from .flags import Flags
+from .flags import Flags, dependent_caches
+from .template import Template
 
 LINUX = "Linux"
 WINDOWS = "Windows"
@@ -12,6 +19,34 @@ OSX = "Darwin"
 # For format() and format_input()
 default_end = "\n"
 
+# Size of the chunks read from files when streaming them
+default_chunk_size = 64 * 1024
+
+# Size of the blocks of a memory-mapped file formatted at once
+default_block_size = 1024 * 1024
+
+# Number of pieces of text joined in each chunk when pretty printing objects
+default_pretty_chunk_size = 4096
+
+# Max number of different templates of 'fmt' kept already formatted
+template_cache_size = 256
+
+
+def get_platform() -> str:
+    """
+    Returns the name of the os, as platform.system() does, without importing
+    the platform module for the usual ones
+    """
+    if sys.platform == "win32":
+        return WINDOWS
+    if sys.platform == "darwin":
+        return OSX
+    if sys.platform.startswith("linux"):
+        return LINUX
+    import platform  # pragma: no cover
+
+    return platform.system()  # pragma: no cover
+
 
 class Printy:
     """
@@ -28,6 +63,23 @@ class Printy:
     open_flag_char = "["
     close_flag_char = "]"
     special_chars = [end_format_char, open_flag_char, close_flag_char]
+    special_chars_regex = re.compile("[%s]" % re.escape("".join(special_chars)))
+
+    # A text that has to be parsed as it would be part of the inline formats,
+    # i.e. it has special characters, or a backslash that may escape them
+    unescaped_regex = re.compile("[%s]" % re.escape("".join(special_chars) + "\\"))
+
+    # A replacement field of a template (see 'compile' and 'fmt'), with the
+    # fields nested in its format spec, or a doubled brace, which is not one
+    format_field_regex = re.compile(r"\{\{|\}\}|\{(?:[^{}]|\{[^{}]*\})*\}")
+
+    # Flags used when pretty printing objects, the same ones in the inline
+    # formats of '_pretty_print_object'
+    pretty_key_flags = "n>"
+    pretty_str_flags = "c>"
+    pretty_number_flags = "c"
+    pretty_constant_flags = "<o"
+    pretty_punctuation_flags = "<oB"
 
     # Actions for inline formats
     START_FLAGS = "start_flags"
@@ -35,9 +87,32 @@ class Printy:
     END_FORMAT = "end_format"
     ESCAPE_CHAR = "escape_char"
 
-    def __init__(self) -> None:
-        self.platform = platform.system()
-        self.virtual_terminal_processing = self.set_windows_console_mode()
+    def __init__(self, color: bool | None = None) -> None:
+        self.platform = get_platform()
+        # Set up the first time the ansi codes may be added (see
+        # 'virtual_terminal_processing')
+        self._virtual_terminal_processing: bool | None = None
+        # Forces (True) or disables (False) the ansi codes, if None, they're
+        # added only if the output supports them (see 'supports_color')
+        self.color = color
+        self.color_env = self.get_color_env()
+        # The last stream checked by 'supports_color', and if it's a terminal
+        self._color_stream: Any = None
+        self._color_stream_isatty = False
+
+    @property
+    def virtual_terminal_processing(self) -> bool:
+        """
+        Tells if the console processes the escape sequences, only needed on
+        Windows, where it's set up the first time it's checked
+        """
+        if self._virtual_terminal_processing is None:
+            self._virtual_terminal_processing = self.set_windows_console_mode()
+        return self._virtual_terminal_processing
+
+    @virtual_terminal_processing.setter
+    def virtual_terminal_processing(self, value: bool) -> None:
+        self._virtual_terminal_processing = value
 
     def set_windows_console_mode(self) -> bool:
         """
@@ -60,56 +135,60 @@ class Printy:
                 return False
         return False
 
-    @classmethod
-    def _define_char(cls, prev: str, current: str) -> bool:
+    @staticmethod
+    def get_color_env() -> bool | None:
         """
-        Helper method that'll tell us if a character has to be treated as a
-        special one or it is part of the text that 's intended to be printed
-        out.
-
-        Takes the previous character and the current character, in case it is
-        one of the special characters defined in the class and is prepended by
-        a '\' means that it has not to be treated as a special one
+        Returns False if the ansi codes are disabled by the environment
+        variables (NO_COLOR or TERM=dumb), True if they're forced (FORCE_COLOR),
+        or None if it depends on the output being a terminal
+        """
+        if os.environ.get("NO_COLOR"):
+            return False
+        if os.environ.get("FORCE_COLOR"):
+            return True
+        if os.environ.get("TERM") == "dumb":
+            return False
+        return None
 
-        Returns True if it's a special character
+    def supports_color(self, stream: Any = None) -> bool:
         """
-        if current in cls.special_chars:
-            if prev != "\\":
-                return True
-        return False
+        Tells if the ansi codes are added to the text written to the stream.
 
-    @classmethod
-    def _check_special_char_position(
-        cls, last_special: str | None, special: str
-    ) -> str:
+        Unless 'color' forces it, they're not added on Windows if the virtual
+        terminal processing couldn't be enabled, if the environment disables
+        them (see 'get_color_env'), or, for a stream, if it's a file descriptor
+        that is not a terminal (i.e. piped or redirected to a file). A stream
+        in memory keeps them, as its text may end up anywhere.
+
+        Without a stream, the terminal is not checked.
         """
-        Returns an action to execute if the character is well placed. It should
-        only be applied over special characters.
+        # The console is set up even if the ansi codes are forced
+        unsupported = self.platform == WINDOWS and not self.virtual_terminal_processing
+        if self.color is not None:
+            return self.color
+        if unsupported:
+            return False
+        if self.color_env is not None:
+            return self.color_env
+        if stream is None:
+            return True
+        if stream is not self._color_stream:
+            try:
+                isatty = os.isatty(stream.fileno())
+            except (AttributeError, OSError, TypeError, ValueError):
+                isatty = True
+            self._color_stream = stream
+            self._color_stream_isatty = isatty
+        return self._color_stream_isatty
 
-        If it's not well placed, the character will be included in the text
+    def set_color(self, color: bool | None) -> None:
         """
-        if special == cls.open_flag_char:
-            # In this case the 'last_special' must always be
-            # the 'end_format_char' or None if it's the first appearing
-            if last_special not in [cls.end_format_char, None]:
-                return cls.ESCAPE_CHAR
-            else:
-                return cls.START_FLAGS
-        elif special == cls.close_flag_char:
-            # In this case the 'last_special' must always be the 'open_flag_char'
-            if last_special != cls.open_flag_char:
-                return cls.ESCAPE_CHAR
-            else:
-                return cls.START_FORMAT
-        elif special == cls.end_format_char:
-            # In this case the 'last_special' must always be the 'close_flag_char'
-            # Or None if the text does not include any other formatting character
-            if last_special in [cls.open_flag_char, cls.end_format_char, None]:
-                return cls.ESCAPE_CHAR
-            else:
-                return cls.END_FORMAT
-        # Fallback for any unexpected special character
-        return cls.ESCAPE_CHAR
+        Forces (True) or disables (False) the ansi codes, or with None, lets
+        them depend on the output again, checking the environment variables
+        """
+        self.color = color
+        self.color_env = self.get_color_env()
+        self._color_stream = None
 
     @classmethod
     def _replace_escaped(cls, text: str) -> str:
@@ -119,80 +198,106 @@ class Printy:
         return text
 
     @classmethod
-    def _get_inline_format_as_tuple(cls, text: str) -> list[tuple[str, str | None]]:
+    def _escape_fields(cls, template: str) -> str:
         """
-        In case some inline formats have been applied we need to get a list of
-        tuples indicating the formats to be applied via flags and the text
-        where the format should be applied, for instance, if the text is:
-        "[rB]Some@ Te[H]xt@"
-        We'll get the list [('Some', 'rB), (' Te', None), ('xt', 'H')]
+        Escapes the special characters of the replacement fields of a template,
+        like the ones of '{0[key]}' or '{:@>10}', so they're part of the field
+        and not of the inline formats
         """
-        prev = ""  # Stores the last character in the loop
-        last_special_char: str | None = None
-        list_of_formats: list[tuple[str, str | None]] = []  # Final list to be returned
+        escape = partial(cls.special_chars_regex.sub, r"\\\g<0>")
+        return cls.format_field_regex.sub(lambda match: escape(match[0]), template)
 
-        # While looping the text, we'll get the formats to be applied to
-        # certain section of that text
+    @classmethod
+    def _tokenize(
+        cls, text: str, unescape: bool = False
+    ) -> list[tuple[str, str | None]]:
+        """
+        Splits the text in sections of (text, flags). Instead of checking every
+        character, it jumps from one special character to the next one and
+        takes the text in between as a whole.
+
+        If 'unescape' is True, the escaped special characters in the text of
+        each section are replaced by the character itself, the same as
+        '_replace_escaped' does.
+        """
+        list_of_formats: list[tuple[str, str | None]] = []
+        end_format_char = cls.end_format_char
+        open_flag_char = cls.open_flag_char
+        close_flag_char = cls.close_flag_char
+
+        last_special_char: str | None = None
         section_text: list[str] = []
         section_flags: list[str] = []
-        current_action = cls.START_FORMAT
-
-        # Will tell us when we're at the last character of the loop
-        counter = 0
-        # Will tell us if we need to reset the sections variables
-        close_section = False
-        for char in text:
-            is_special = cls._define_char(prev, char)
-            if is_special:
-                action = cls._check_special_char_position(last_special_char, char)
-
-                if action == cls.ESCAPE_CHAR:
-                    # Add the character to the text
-                    if current_action == cls.START_FLAGS:  # pragma: no cover
-                        section_flags.append(char)  # pragma: no cover
-                    elif current_action == cls.START_FORMAT:
-                        section_text.append(char)
-                else:
-                    # Here we know that the special character is well placed
-                    # and has a special meaning
-                    current_action = action
-
-                    if current_action == cls.END_FORMAT:
-                        current_action = cls.START_FORMAT
-                        close_section = True
-                    if last_special_char in [cls.end_format_char, None]:
-                        # Here we'll catch 'open_flag_char's
-                        current_action = cls.START_FLAGS
-                        close_section = True
-                    last_special_char = char
-            else:
-                if current_action == cls.START_FLAGS:
-                    section_flags.append(char)
-                elif current_action == cls.START_FORMAT:
-                    section_text.append(char)
-            prev = char
-            counter += 1
-
-            if counter == len(text) or close_section:
-                # Reset the 'section_*' lists and add them (joined)
-                # to the final list
-                list_of_formats.append(
-                    (
-                        "".join(section_text),
-                        "".join(section_flags) if len(section_flags) > 0 else None,
-                    )
-                )
-                section_text = []
-                section_flags = []
-                close_section = False
+        in_flags = False
+        # Start of the piece of text not yet added to the section
+        start = 0
+        # Position of the last special character that closed a section
+        last_close = -1
+
+        for match in cls.special_chars_regex.finditer(text):
+            position = match.start()
+            char = match.group()
 
+            # A special character prepended by a '\' has not to be treated as
+            # a special one, it's part of the text
+            if position and text[position - 1] == "\\":
+                if unescape and not in_flags:
+                    section_text.append(text[start : position - 1])
+                    start = position
+                continue
+
+            # If the special character is misplaced, it's part of the current
+            # piece of text (or flags). An 'open_flag_char' must always come
+            # after an 'end_format_char' (or be the first one), a
+            # 'close_flag_char' after an 'open_flag_char' and an
+            # 'end_format_char' after a 'close_flag_char'
+            if char == open_flag_char:
+                if last_special_char != end_format_char and last_special_char:
+                    continue
+            elif char == close_flag_char:
+                if last_special_char != open_flag_char:
+                    continue
+            elif last_special_char != close_flag_char:
+                continue
+
+            (section_flags if in_flags else section_text).append(text[start:position])
+            start = position + 1
+            last_special_char = char
+            if char == close_flag_char:
+                in_flags = False
+                continue
+
+            # Both opening the flags and ending the format close the section
+            in_flags = char == open_flag_char
+            list_of_formats.append(
+                ("".join(section_text), "".join(section_flags) or None)
+            )
+            section_text = []
+            section_flags = []
+            last_close = position
+
+        if last_close != len(text) - 1:
+            (section_flags if in_flags else section_text).append(text[start:])
+            list_of_formats.append(
+                ("".join(section_text), "".join(section_flags) or None)
+            )
         return list_of_formats
 
+    @classmethod
+    def _get_inline_format_as_tuple(cls, text: str) -> list[tuple[str, str | None]]:
+        """
+        In case some inline formats have been applied we need to get a list of
+        tuples indicating the formats to be applied via flags and the text
+        where the format should be applied, for instance, if the text is:
+        "[rB]Some@ Te[H]xt@"
+        We'll get the list [('', None), ('Some', 'rB), (' Te', None), ('xt', 'H')]
+        """
+        return cls._tokenize(text)
+
     @classmethod
     def _get_cleaned_text(cls, text: str) -> str:
         """Returns the cleaned value, with no formats"""
-        tuple_text = cls._get_inline_format_as_tuple(text)
-        return cls._replace_escaped("".join(x[0] for x in tuple_text))
+        return cls.strip(text)
 
     @classmethod
     def _escape_special_chars(cls, value: Any) -> str:
@@ -206,75 +311,230 @@ class Printy:
         return _str
 
     @classmethod
-    def _pretty_print_object(cls, obj: Any, indentation: int, level: int = 1) -> str:
+    def _iter_object_tokens(
+        cls,
+        obj: Any,
+        indentation: int,
+        level: int = 1,
+        max_depth: int | None = None,
+        max_items: int | None = None,
+        max_string_length: int | None = None,
+    ) -> Iterator[tuple[str, str, bool]]:
         """
-        Recursive function to pretty print objects, with some
-        indentations if needed.
+        Goes through the object yielding its pieces of text as tuples of
+        (flags, text, escape), the flags are empty for the text that is not
+        formatted, and 'escape' is False for the keys and the str() of other
+        objects, whose special characters are taken as inline formats.
+
+        The nested objects are visited with a stack instead of recursively, so
+        they can be as deep as needed. An object that contains itself is shown
+        as [...], and 'max_depth', 'max_items' and 'max_string_length' cut the
+        output, telling how many items (or characters) are left with '… N more'
         """
+        key_flags = cls.pretty_key_flags
+        punctuation_flags = cls.pretty_punctuation_flags
 
-        def _nested(nested_obj: Any, nested_level: int = level) -> str:
-            indentation_values = " " * indentation * nested_level
-            indentation_braces = " " * indentation * (nested_level - 1)
-            if isinstance(nested_obj, dict):
-                return "{\n%(body)s%(indent_braces)s}" % {
-                    "body": "".join(
-                        "%(indent_values)s[n>]'%(key)s'@: %(value)s[<oB],@\n"
-                        % {
-                            "key": str(key),
-                            "value": _nested(value, nested_level + 1),
-                            "indent_values": indentation_values,
-                        }
-                        for key, value in nested_obj.items()
-                    ),
-                    "indent_braces": indentation_braces,
-                }
-            elif isinstance(nested_obj, list):
-                return "\\[\n%(indent_values)s%(body)s\n%(indent_braces)s\\]" % {
-                    "body": "[<oB],@ ".join(
-                        "%(value)s"
-                        % {
-                            "value": _nested(value, nested_level + 1),
-                        }
-                        for value in nested_obj
-                    ),
-                    "indent_braces": indentation_braces,
-                    "indent_values": indentation_values,
-                }
-            elif isinstance(nested_obj, tuple):
-                return "(\n%(indent_values)s%(body)s\n%(indent_braces)s)" % {
-                    "body": "[<oB],@ ".join(
-                        "%(value)s"
-                        % {
-                            "value": _nested(value, nested_level + 1),
-                        }
-                        for value in nested_obj
-                    ),
-                    "indent_braces": indentation_braces,
-                    "indent_values": indentation_values,
-                }
-            elif isinstance(nested_obj, set):
-                return "{\n%(indent_values)s%(body)s\n%(indent_braces)s}" % {
-                    "body": "[<oB],@ ".join(
-                        "%(value)s"
-                        % {
-                            "value": _nested(value, nested_level + 1),
-                        }
-                        for value in nested_obj
-                    ),
-                    "indent_braces": indentation_braces,
-                    "indent_values": indentation_values,
-                }
+        def _dict(nested_obj: dict[Any, Any], nested_level: int) -> Iterator[Any]:
+            # Each item comes after a line break and its indentation
+            separator = "\n" + " " * indentation * nested_level
+            opening = "{"
+            for index, (key, value) in enumerate(nested_obj.items()):
+                if index == max_items:
+                    more = "… %d more" % (len(nested_obj) - index)
+                    yield "", opening + separator + more, True
+                    opening = ""
+                    break
+                yield "", opening + separator, True
+                yield key_flags, "'" + str(key) + "'", False
+                yield "", ": ", True
+                yield None, value, nested_level + 1
+                yield punctuation_flags, ",", True
+                opening = ""
+            closing = "\n" + " " * indentation * (nested_level - 1) + "}"
+            yield "", opening + closing, True
+
+        def _sequence(
+            nested_obj: list[Any] | tuple[Any, ...] | set[Any],
+            nested_level: int,
+            opening: str,
+            closing: str,
+        ) -> Iterator[Any]:
+            yield "", opening + "\n" + " " * indentation * nested_level, True
+            for index, value in enumerate(nested_obj):
+                if index:
+                    yield punctuation_flags, ",", True
+                    yield "", " ", True
+                if index == max_items:
+                    yield "", "… %d more" % (len(nested_obj) - index), True
+                    break
+                yield None, value, nested_level + 1
+            yield "", "\n" + " " * indentation * (nested_level - 1) + closing, True
+
+        # Flags of the objects that are not visited, by their exact type
+        scalar_flags = {
+            int: cls.pretty_number_flags,
+            float: cls.pretty_number_flags,
+            bool: cls.pretty_constant_flags,
+            type(None): cls.pretty_constant_flags,
+        }
+        # The objects being visited, and the ids of the nested ones to find
+        # those that contain themselves. 'None' as flags means that the text
+        # is an object to visit
+        stack: list[Iterator[Any]] = [iter([(None, obj, level)])]
+        path: list[int] = []
+        visiting: set[int] = set()
+        while stack:
+            for flags, value, value_level in stack[-1]:
+                if flags is not None:
+                    yield flags, value, value_level
+                    continue
+
+                value_type = type(value)
+                if value_type in scalar_flags:
+                    yield scalar_flags[value_type], str(value), True
+                    continue
+                elif isinstance(value, dict):
+                    opening, closing = "{", "}"
+                elif isinstance(value, list):
+                    opening, closing = "[", "]"
+                elif isinstance(value, tuple):
+                    opening, closing = "(", ")"
+                elif isinstance(value, set):
+                    opening, closing = "{", "}"
+                elif isinstance(value, str):
+                    # As str(), subclasses (i.e. str enums) may have their own
+                    value = str(value)
+                    if max_string_length is not None and (
+                        len(value) > max_string_length
+                    ):
+                        more = "… %d more" % (len(value) - max_string_length)
+                        value = value[:max_string_length] + more
+                    yield cls.pretty_str_flags, "'" + value + "'", True
+                    continue
+                elif isinstance(value, (int, float)):
+                    yield cls.pretty_number_flags, str(value), True
+                    continue
+                else:
+                    yield "", str(value), False
+                    continue
+
+                if id(value) in visiting:
+                    yield "", opening + "..." + closing, True
+                elif max_depth is not None and value_level > max_depth and value:
+                    more = "… %d more" % len(value)
+                    yield "", opening + more + closing, True
+                else:
+                    path.append(id(value))
+                    visiting.add(path[-1])
+                    if isinstance(value, dict):
+                        stack.append(_dict(value, value_level))
+                    else:
+                        stack.append(_sequence(value, value_level, opening, closing))
+                    break
             else:
-                if isinstance(nested_obj, str):
-                    return "[c>]'" + cls._escape_special_chars(nested_obj) + "'@"
-                elif isinstance(nested_obj, bool) or nested_obj is None:
-                    return "[<o]" + cls._escape_special_chars(nested_obj) + "@"
-                elif isinstance(nested_obj, (int, float)):
-                    return "[c]" + str(nested_obj) + "@"
+                stack.pop()
+                if path:
+                    visiting.discard(path.pop())
+
+    @classmethod
+    def _pretty_print_object(
+        cls,
+        obj: Any,
+        indentation: int,
+        level: int = 1,
+        max_depth: int | None = None,
+        max_items: int | None = None,
+        max_string_length: int | None = None,
+    ) -> str:
+        """
+        Pretty prints objects with their inline formats, with some
+        indentations if needed.
+        """
+        escape = cls._escape_special_chars
+        return "".join(
+            ("[%s]%s@" % (flags, escape(text) if escaped else text))
+            if flags
+            else (escape(text) if escaped else text)
+            for flags, text, escaped in cls._iter_object_tokens(
+                obj, indentation, level, max_depth, max_items, max_string_length
+            )
+        )
+
+    @classmethod
+    def _iter_formatted_object(
+        cls,
+        obj: Any,
+        indentation: int,
+        predefined: str = "",
+        plain: bool = False,
+        max_depth: int | None = None,
+        max_items: int | None = None,
+        max_string_length: int | None = None,
+    ) -> Iterator[str]:
+        """
+        Yields the same text as formatting the result of '_pretty_print_object'
+        in chunks, but the ansi codes are added while going through the object,
+        so the text is never escaped, parsed and unescaped.
+
+        If 'plain' is True, no ansi codes are added.
+
+        Once a key, or the str() of an object, has special characters that
+        would be taken as inline formats, the rest of the object is parsed by a
+        StreamFormatter that starts where the parser would be at that point.
+        """
+        get_transition = Flags.get_transition
+        unescaped_regex = cls.unescaped_regex
+        escape = cls._escape_special_chars
+        output: list[str] = []
+        # The flags of the current style, only its changes are added, and the
+        # text that is not formatted gets the 'predefined' flags, if any
+        style = ""
+        # The few transitions between the styles of the object
+        transitions: dict[tuple[str, str], str] = {}
+        formatted = False
+        formatter: StreamFormatter | None = None
+        chunk_size = default_pretty_chunk_size
+
+        for flags, text, escaped in cls._iter_object_tokens(
+            obj, indentation, 1, max_depth, max_items, max_string_length
+        ):
+            if formatter is None and not escaped and unescaped_regex.search(text):
+                formatter = StreamFormatter(predefined=predefined, plain=plain)
+                formatter.started = True
+                formatter.style = style
+                if formatted:
+                    formatter.last_special_char = cls.end_format_char
+
+            if formatter is not None:
+                if escaped:
+                    text = escape(text)
+                output.append(
+                    formatter.feed("[%s]%s@" % (flags, text) if flags else text)
+                )
+            elif text:
+                if flags:
+                    formatted = True
                 else:
-                    return str(nested_obj)
+                    flags = predefined
+                if flags != style and not plain:
+                    transition = transitions.get((style, flags))
+                    if transition is None:
+                        transition = transitions[style, flags] = get_transition(
+                            style, flags
+                        )
+                    output.append(transition)
+                    style = flags
+                output.append(text)
+
+            if len(output) >= chunk_size:
+                yield "".join(output)
+                output = []
 
-        return _nested(obj)
+        if formatter is not None:
+            output.append(formatter.close())
+        elif style:
+            output.append(get_transition(style, ""))
+        yield "".join(output)
 
     @classmethod
     def _repr_value(cls, value: Any, pretty: bool = True, indentation: int = 4) -> str:
@@ -302,44 +562,209 @@ class Printy:
         predefined: str = "",
         pretty: bool = True,
         indentation: int = 4,
+        max_depth: int | None = None,
+        max_items: int | None = None,
+        max_string_length: int | None = None,
+        color: bool | None = None,
         **kwargs: Any,
     ) -> str:
         """
         Applies the format specified by the 'flags' to the 'value'.
 
         If 'flag's is passed, 'predefined' will be omitted.
+
+        When pretty printing objects, 'max_depth', 'max_items' and
+        'max_string_length' limit how much of them is shown.
+
+        'color' forces (or disables) the ansi codes, by default they're added
+        unless disabled for the instance (see 'supports_color').
         """
+        if pretty and isinstance(value, (dict, list, tuple, set)):
+            return "".join(
+                self.iter_formatted(
+                    value,
+                    flags,
+                    predefined,
+                    pretty,
+                    indentation,
+                    max_depth,
+                    max_items,
+                    max_string_length,
+                    color,
+                )
+            )
+
+        plain = not (self.supports_color() if color is None else color)
+
         # In case an object is passed instead of a string
         value = self._repr_value(value, pretty, indentation)
 
-        if self.platform == WINDOWS and not self.virtual_terminal_processing:
+        if plain:
+            # The flags are not used, but they must be valid anyway
+            if flags:
+                Flags.get_prefix(flags)
             text = self._get_cleaned_text(value)
         else:
             if flags:
-                flags_values = Flags.get_flag_values(flags)
                 value = self._get_cleaned_text(value)
                 text = "%s%s%s" % (
-                    Flags.join_flags(flags_values),
+                    Flags.get_prefix(flags),
                     value,
                     Flags.get_end_of_line(),
                 )
             else:
-                tuple_text = self._get_inline_format_as_tuple(value)
-                text = ""
-                for section in tuple_text:
-                    section_text = self._replace_escaped(section[0])
-                    section_flags = section[1] or predefined
-                    if section_flags:
-                        flags_values = Flags.get_flag_values(section_flags)
-                        text += "%s%s%s" % (
-                            Flags.join_flags(flags_values),
-                            section_text,
-                            Flags.get_end_of_line(),
-                        )
-                    else:
-                        text += section_text
+                text = self._format_inline(value, predefined)
         return text
 
+    @classmethod
+    def _format_inline(cls, text: str, predefined: str = "") -> str:
+        """
+        Applies the inline formats of the text, the sections with no flags
+        take the 'predefined' ones
+        """
+        return cls._join_sections(cls._tokenize(text, unescape=True), predefined)
+
+    @staticmethod
+    def _join_sections(
+        sections: Iterable[tuple[str, str | None]], predefined: str = ""
+    ) -> str:
+        """Joins the sections of (text, flags) returned by '_tokenize'"""
+        get_transition = Flags.get_transition
+        pieces: list[str] = []
+        # Only the changes of style between sections are added, and the style
+        # is reset once at the end
+        style = ""
+        for section_text, flags_or_none in sections:
+            section_flags = flags_or_none or predefined
+            # Empty sections change nothing, but their flags must be valid
+            transition = get_transition(style, section_flags)
+            if section_text:
+                if transition:
+                    pieces.append(transition)
+                style = section_flags
+                pieces.append(section_text)
+        if style:
+            pieces.append(get_transition(style, ""))
+        return "".join(pieces)
+
+    def get_formatted_texts(
+        self,
+        values: Iterable[Any],
+        flags: str = "",
+        predefined: str = "",
+        pretty: bool = True,
+        indentation: int = 4,
+        max_depth: int | None = None,
+        max_items: int | None = None,
+        max_string_length: int | None = None,
+        color: bool | None = None,
+        processes: int | None = None,
+    ) -> list[str]:
+        """
+        Formats many values with the same flags, returning the same texts as
+        calling 'get_formatted_text' for each one, but whether to add the ansi
+        codes and the global flags are resolved only once for the whole batch.
+
+        If 'processes' is greater than 1, the values are formatted in chunks
+        by that many processes, i.e. to pretty print a lot of big objects. The
+        values must be picklable, and the texts keep the order of the values. The
+        processes use the flags added at runtime and the color depth of this one.
+        """
+        if processes is not None and processes < 1:
+            raise ValueError("processes must be 1 or greater")
+        color = self.supports_color() if color is None else color
+        if processes is not None and processes > 1:
+            return _format_in_processes(
+                list(values),
+                processes,
+                dict(
+                    flags=flags,
+                    predefined=predefined,
+                    pretty=pretty,
+                    indentation=indentation,
+                    max_depth=max_depth,
+                    max_items=max_items,
+                    max_string_length=max_string_length,
+                    color=color,
+                ),
+            )
+
+        prefix = end_of_line = ""
+        if flags:
+            # The flags must be valid even if they're not used
+            prefix = Flags.get_prefix(flags)
+            if color:
+                end_of_line = Flags.get_end_of_line()
+            else:
+                prefix = ""
+        strip = self._get_cleaned_text
+        format_inline = self._format_inline
+        texts: list[str] = []
+        for value in values:
+            if type(value) is not str:
+                # Objects are formatted one by one, as their representation
+                # depends on their type (str subclasses included, as str()
+                # may not give their contents)
+                texts.append(
+                    self.get_formatted_text(
+                        value,
+                        flags,
+                        predefined,
+                        pretty,
+                        indentation,
+                        max_depth,
+                        max_items,
+                        max_string_length,
+                        color,
+                    )
+                )
+            elif flags or not color:
+                texts.append(prefix + strip(value) + end_of_line)
+            else:
+                texts.append(format_inline(value, predefined))
+        return texts
+
+    def iter_formatted(
+        self,
+        value: Any,
+        flags: str = "",
+        predefined: str = "",
+        pretty: bool = True,
+        indentation: int = 4,
+        max_depth: int | None = None,
+        max_items: int | None = None,
+        max_string_length: int | None = None,
+        color: bool | None = None,
+    ) -> Iterator[str]:
+        """
+        Yields the same text as 'get_formatted_text', but a pretty printed
+        object is yielded in chunks while going through it, so the whole text
+        is never kept in memory at once.
+        """
+        if not (pretty and isinstance(value, (dict, list, tuple, set))):
+            yield self.get_formatted_text(
+                value, flags, predefined, pretty, indentation, color=color
+            )
+            return
+
+        plain = not (self.supports_color() if color is None else color)
+        if flags:
+            # The flags must be valid even if they're not used
+            prefix = Flags.get_prefix(flags)
+            if not plain:
+                yield prefix
+        yield from self._iter_formatted_object(
+            value,
+            indentation,
+            predefined,
+            plain or bool(flags),
+            max_depth,
+            max_items,
+            max_string_length,
+        )
+        if flags and not plain:
+            yield Flags.get_end_of_line()
+
     @staticmethod
     def read_file(file: str) -> str:
         """Given a file path, we read it and print it out"""
@@ -357,14 +782,198 @@ class Printy:
         end: str = default_end,
         pretty: bool = True,
         indentation: int = 4,
+        use_mmap: bool = False,
+        max_depth: int | None = None,
+        max_items: int | None = None,
+        max_string_length: int | None = None,
     ) -> None:
-        """Prints out the value"""
-        value = self.read_file(file) if file else value
+        """
+        Prints out the value.
+
+        If 'use_mmap' is True, the file is mapped in memory and its bytes are
+        written as they are to the stdout's binary buffer (see 'write_file')
+
+        Pretty printed objects are printed out in chunks (see 'iter_formatted')
+
+        The ansi codes are added only if the stdout supports them (see
+        'supports_color'), otherwise the inline formats are just removed.
+        """
+        color = self.supports_color(sys.stdout)
+        if file and use_mmap and hasattr(sys.stdout, "buffer"):
+            # Anything already printed must be written before the file
+            sys.stdout.flush()
+            self.write_file(file, sys.stdout.buffer, flags, predefined, color=color)
+            print(end=end)
+            return
+        if file:
+            # Files are streamed, so they're never loaded in memory at once
+            with open(str(file)) as f:
+                for chunk in self.stream(f, flags, predefined, color=color):
+                    print(chunk, end="")
+            print(end=end)
+            return
+        if pretty and isinstance(value, (dict, list, tuple, set)):
+            for chunk in self.iter_formatted(
+                value,
+                flags,
+                predefined,
+                pretty,
+                indentation,
+                max_depth,
+                max_items,
+                max_string_length,
+                color,
+            ):
+                print(chunk, end="")
+            print(end=end)
+            return
         print(
-            self.get_formatted_text(value, flags, predefined, pretty, indentation),
+            self.get_formatted_text(
+                value, flags, predefined, pretty, indentation, color=color
+            ),
             end=end,
         )
 
+    def format_many(
+        self,
+        values: Iterable[Any],
+        flags: str = "",
+        predefined: str = "",
+        end: str = default_end,
+        pretty: bool = True,
+        indentation: int = 4,
+        max_depth: int | None = None,
+        max_items: int | None = None,
+        max_string_length: int | None = None,
+        processes: int | None = None,
+    ) -> None:
+        """
+        Prints out many values with the same flags, each one followed by
+        'end', formatting them with 'get_formatted_texts' and writing the
+        whole batch at once
+        """
+        texts = self.get_formatted_texts(
+            values,
+            flags,
+            predefined,
+            pretty,
+            indentation,
+            max_depth,
+            max_items,
+            max_string_length,
+            self.supports_color(sys.stdout),
+            processes,
+        )
+        if texts:
+            print(end.join(texts), end=end)
+
+    def write_file(
+        self,
+        file: str,
+        output: BinaryIO,
+        flags: str = "",
+        predefined: str = "",
+        block_size: int = default_block_size,
+        color: bool | None = None,
+    ) -> None:
+        """
+        Formats a file mapped in memory, writing it in blocks to the binary
+        stream 'output', so big files use a constant amount of memory.
+
+        The text is never decoded, so it has to be encoded in utf-8 (or any
+        other ascii compatible encoding), and it's written in that encoding
+        """
+        formatter = BinaryStreamFormatter(
+            flags,
+            predefined,
+            plain=not (self.supports_color() if color is None else color),
+        )
+        with open(str(file), "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            # Empty files can't be mapped
+            if size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    if hasattr(mapped, "madvise"):
+                        mapped.madvise(mmap.MADV_SEQUENTIAL)
+                    for offset in range(0, size, block_size):
+                        formatted = formatter.feed(mapped[offset : offset + block_size])
+                        if formatted:
+                            output.write(formatted)
+        output.write(formatter.close())
+
+    def stream(
+        self,
+        source: Iterable[str] | TextIO,
+        flags: str = "",
+        predefined: str = "",
+        chunk_size: int = default_chunk_size,
+        color: bool | None = None,
+    ) -> Iterator[str]:
+        """
+        Formats a text that comes in chunks, either from an iterable of
+        strings or from a text file object (read 'chunk_size' characters at a
+        time), yielding the formatted text as soon as it's available.
+
+        Joining all the yielded chunks gives the same text as formatting the
+        whole text at once with 'get_formatted_text'.
+        """
+        formatter = StreamFormatter(
+            flags,
+            predefined,
+            plain=not (self.supports_color() if color is None else color),
+        )
+        chunks: Iterable[str] = source
+        if hasattr(source, "read"):
+            # Files are read in chunks rather than by lines, so a very long
+            # line is not loaded in memory at once either
+            chunks = iter(partial(cast(TextIO, source).read, chunk_size), "")
+        for chunk in chunks:
+            formatted = formatter.feed(chunk)
+            if formatted:
+                yield formatted
+        formatted = formatter.close()
+        if formatted:
+            yield formatted
+
+    def compile(
+        self,
+        template: str,
+        flags: str = "",
+        predefined: str = "",
+        end: str = default_end,
+    ) -> Template:
+        """
+        Parses the inline formats of the template and resolves its flags only
+        once, returning a Template whose values are replaced with the
+        str.format() syntax on each render, i.e.
+        >>> printy.compile('[rB]{level}@ [c]{msg}@').print(level='INFO', msg='Hi')
+
+        The text without the ansi codes is kept too, for the outputs that
+        don't support them (see 'Template.print'). The special characters of
+        the fields are part of them, i.e. '{0[key]}' or '{:@>10}'.
+        """
+        template = self._escape_fields(template)
+        return Template(
+            self.get_formatted_text(template, flags, predefined),
+            end,
+            self.get_formatted_text(template, flags, predefined, color=False),
+            self,
+        )
+
+    def fmt(self, template: str, *args: Any, **kwargs: Any) -> str:
+        """
+        Formats the template like 'get_formatted_text' does, and then replaces
+        its fields with the values, with the str.format() syntax, i.e.
+        >>> printy.fmt('[r]{}@ said [c]{}@', user, message)
+
+        The values are never parsed, so they don't need to be escaped even if
+        they come from untrusted sources, and their size doesn't matter. The
+        last formatted templates are cached, like 'compile' but without
+        keeping the Template. Literal braces must be doubled: {{ }}
+        """
+        formatted = _get_formatted_template(template, self.supports_color())
+        return formatted.format(*args, **kwargs)
+
     def escape(self, value: str) -> str:
         """
         Escape the special characters of the value passed to printy. Useful
@@ -373,3 +982,339 @@ class Printy:
         for char in self.special_chars:
             value = value.replace(char, r"\{}".format(char))
         return value
+
+    @classmethod
+    def strip(cls, text: str) -> str:
+        """
+        Removes the inline formats of the text, and the backslashes of the
+        escaped special characters, returning the text as it would be printed
+        out with no formats, in a single pass.
+
+        Each special character is found with str.find(), which is much faster
+        than a regex to skip long pieces of plain text.
+        """
+        end_format_char = cls.end_format_char
+        open_flag_char = cls.open_flag_char
+        close_flag_char = cls.close_flag_char
+        find = text.find
+        size = len(text)
+
+        # Next position of each special character, 'size' if there's none
+        next_end = find(end_format_char) % (size + 1)
+        next_open = find(open_flag_char) % (size + 1)
+        next_close = find(close_flag_char) % (size + 1)
+
+        pieces: list[str] = []
+        last_special_char: str | None = None
+        in_flags = False
+        start = 0
+        while True:
+            position = next_end if next_end < next_open else next_open
+            if next_close < position:
+                position = next_close
+            if position == size:
+                break
+            char = text[position]
+            if char == end_format_char:
+                next_end = find(char, position + 1) % (size + 1)
+            elif char == open_flag_char:
+                next_open = find(char, position + 1) % (size + 1)
+            else:
+                next_close = find(char, position + 1) % (size + 1)
+
+            if position and text[position - 1] == "\\":
+                if not in_flags:
+                    pieces.append(text[start : position - 1])
+                    start = position
+                continue
+
+            # Same rules as in '_tokenize'
+            if char == open_flag_char:
+                if last_special_char != end_format_char and last_special_char:
+                    continue
+            elif char == close_flag_char:
+                if last_special_char != open_flag_char:
+                    continue
+            elif last_special_char != close_flag_char:
+                continue
+
+            # The text in between the flags is dropped
+            if not in_flags:
+                pieces.append(text[start:position])
+            start = position + 1
+            last_special_char = char
+            in_flags = char == open_flag_char
+
+        # Nothing to remove
+        if not pieces:
+            return text
+        if not in_flags:
+            pieces.append(text[start:])
+        return "".join(pieces)
+
+    @classmethod
+    def strip_many(cls, texts: Iterable[str]) -> list[str]:
+        """
+        Strips the inline formats of many texts (see 'strip'), each different
+        text is stripped only once, i.e. the same messages written to a
+        colored console and to a plain log file
+        """
+        stripped: dict[str, str] = {}
+        strip = cls.strip
+        result: list[str] = []
+        for text in texts:
+            cleaned = stripped.get(text)
+            if cleaned is None:
+                cleaned = stripped[text] = strip(text)
+            result.append(cleaned)
+        return result
+
+
+@lru_cache(maxsize=template_cache_size)
+def _get_formatted_template(template: str, color: bool) -> str:
+    template = Printy._escape_fields(template)
+    return Printy._format_inline(template) if color else Printy.strip(template)
+
+
+dependent_caches.append(_get_formatted_template.cache_clear)
+
+
+def _init_worker(
+    custom_colors: dict[str, str], aliases: dict[str, str], color_depth: int
+) -> None:
+    """
+    Gives a worker process the flags added at runtime and the color depth of
+    the process that started it, which a spawned process doesn't inherit
+    """
+    Flags.custom_colors = custom_colors
+    Flags.aliases = aliases
+    Flags.color_depth = color_depth
+    Flags.cache_clear()
+
+
+def _format_chunk(chunk: tuple[list[Any], dict[str, Any]]) -> list[str]:
+    """Formats a chunk of values in a worker process"""
+    values, options = chunk
+    return Printy().get_formatted_texts(values, **options)
+
+
+def _format_in_processes(
+    values: list[Any], processes: int, options: dict[str, Any]
+) -> list[str]:
+    """
+    Formats the values with 'get_formatted_texts' in many processes, each one
+    takes a few chunks of them, so every process gets work until the end
+    """
+    # Not imported with the rest of the package, few programs need it
+    from concurrent.futures import ProcessPoolExecutor
+
+    size = max(1, -(-len(values) // (processes * 4)))
+    chunks = [(values[i : i + size], options) for i in range(0, len(values), size)]
+    if not chunks:
+        return []
+    texts: list[str] = []
+    with ProcessPoolExecutor(
+        min(processes, len(chunks)),
+        initializer=_init_worker,
+        initargs=(Flags.custom_colors, Flags.aliases, Flags.get_color_depth()),
+    ) as executor:
+        # The chunks are returned in the same order they were sent
+        for formatted in executor.map(_format_chunk, chunks):
+            texts.extend(formatted)
+    return texts
+
+
+class _BaseStreamFormatter(ABC, Generic[AnyStr]):
+    """
+    Formats a text that is received in chunks. The state of the inline formats
+    is kept from one chunk to the next one, so the flags, the text of a
+    section, or an escaped character can be split between two chunks.
+
+    The subclasses define the type of the text, either str or bytes
+    """
+
+    empty: AnyStr
+    backslash: AnyStr
+    end_format_char: AnyStr
+    open_flag_char: AnyStr
+    close_flag_char: AnyStr
+    special_chars_regex: re.Pattern[AnyStr]
+
+    def __init__(self, flags: str = "", predefined: str = "", plain: bool = False):
+        self.predefined = predefined
+        # With global flags (or when the escape sequences are not supported)
+        # the inline formats are removed and only the text is kept
+        self.clean = plain or bool(flags)
+        self.prefix: AnyStr = self._code(
+            Flags.get_prefix(flags) if flags and not plain else ""
+        )
+        self.end_of_line: AnyStr = self._code(Flags.get_end_of_line())
+        self.started = False
+
+        self.last_special_char: AnyStr | None = None
+        self.in_flags = False
+        self.section_flags: list[AnyStr] = []
+        # Tells if the text of the current section has started
+        self.section_open = False
+        # The flags of the current style, only its changes are added
+        self.style = ""
+        # Tells if anything has been added after the last closed section
+        self.pending_section = False
+        # A backslash at the end of a chunk may escape the next chunk's first char
+        self.pending_backslash = False
+
+    @abstractmethod
+    def _code(self, code: str) -> AnyStr:
+        """Turns an ansi code into the type of the text"""
+
+    @abstractmethod
+    def _flags(self, flags: AnyStr) -> str:
+        """Turns the flags found in the text into a str"""
+
+    def _get_section_flags(self) -> str:
+        """Returns the flags of the current section, once they're known"""
+        flags = self._flags(self.empty.join(self.section_flags)) or self.predefined
+        self.section_flags = []
+        return flags
+
+    def _open_section(self, output: list[AnyStr]) -> None:
+        """Adds the ansi code to change to the style of the current section"""
+        self.section_open = True
+        if not self.clean:
+            flags = self._get_section_flags()
+            if flags != self.style:
+                transition = Flags.get_transition(self.style, flags)
+                if transition:
+                    output.append(self._code(transition))
+                self.style = flags
+
+    def _add_text(self, output: list[AnyStr], text: AnyStr) -> None:
+        """Adds text to the current section, or to its flags"""
+        if not text:
+            return
+        self.pending_section = True
+        if self.in_flags:
+            if not self.clean:
+                self.section_flags.append(text)
+        else:
+            if not self.section_open:
+                self._open_section(output)
+            output.append(text)
+
+    def _close_section(self, output: list[AnyStr]) -> None:
+        if not self.section_open and not self.clean:
+            # An empty section changes nothing, but its flags must be valid
+            Flags.get_transition(self.style, self._get_section_flags())
+        self.section_flags = []
+        self.section_open = False
+        self.pending_section = False
+
+    def feed(self, chunk: AnyStr) -> AnyStr:
+        """Returns the formatted text that can already be given for the chunk"""
+        output: list[AnyStr] = []
+        if not self.started:
+            self.started = True
+            output.append(self.prefix)
+
+        backslash = self.backslash
+        text = backslash + chunk if self.pending_backslash else chunk
+        self.pending_backslash = text.endswith(backslash)
+        if self.pending_backslash:
+            text = text[:-1]
+
+        end_format_char = self.end_format_char
+        open_flag_char = self.open_flag_char
+        close_flag_char = self.close_flag_char
+        start = 0
+        for match in self.special_chars_regex.finditer(text):
+            position = match.start()
+            char = match.group()
+
+            if position and text[position - 1 : position] == backslash:
+                # Escaped, the backslash is removed from the text
+                if not self.in_flags:
+                    self._add_text(output, text[start : position - 1])
+                    start = position
+                continue
+
+            # Same rules as in 'Printy._tokenize'
+            last_special_char = self.last_special_char
+            if char == open_flag_char:
+                if last_special_char != end_format_char and last_special_char:
+                    continue
+            elif char == close_flag_char:
+                if last_special_char != open_flag_char:
+                    continue
+            elif last_special_char != close_flag_char:
+                continue
+
+            self._add_text(output, text[start:position])
+            start = position + 1
+            self.last_special_char = char
+            if char == close_flag_char:
+                self.in_flags = False
+                self.pending_section = True
+                continue
+            self._close_section(output)
+            self.in_flags = char == open_flag_char
+
+        self._add_text(output, text[start:])
+        return self.empty.join(output)
+
+    def close(self) -> AnyStr:
+        """Returns the formatted text that was still pending, once no more chunks come"""
+        output = [self.feed(self.empty)]
+        if self.pending_backslash:
+            # Nothing left to escape, so it's just a backslash
+            self.pending_backslash = False
+            self._add_text(output, self.backslash)
+        if self.pending_section:
+            self._close_section(output)
+        if self.style:
+            output.append(self._code(Flags.get_transition(self.style, "")))
+            self.style = ""
+        if self.prefix:
+            output.append(self.end_of_line)
+        return self.empty.join(output)
+
+
+class StreamFormatter(_BaseStreamFormatter[str]):
+    """
+    Formats a text that is received in chunks, like
+    >>> formatter = StreamFormatter(predefined='y')
+    >>> formatter.feed('[rB]Some') + formatter.feed('@ text') + formatter.close()
+    """
+
+    empty = ""
+    backslash = "\\"
+    end_format_char = Printy.end_format_char
+    open_flag_char = Printy.open_flag_char
+    close_flag_char = Printy.close_flag_char
+    special_chars_regex = Printy.special_chars_regex
+
+    def _code(self, code: str) -> str:
+        return code
+
+    def _flags(self, flags: str) -> str:
+        return flags
+
+
+class BinaryStreamFormatter(_BaseStreamFormatter[bytes]):
+    """
+    Formats an utf-8 encoded text (or any ascii compatible encoding) that is
+    received in chunks of bytes. The text is never decoded, the special
+    characters are searched in the bytes directly.
+    """
+
+    empty = b""
+    backslash = b"\\"
+    end_format_char = Printy.end_format_char.encode()
+    open_flag_char = Printy.open_flag_char.encode()
+    close_flag_char = Printy.close_flag_char.encode()
+    special_chars_regex = re.compile(Printy.special_chars_regex.pattern.encode())
+
+    def _code(self, code: str) -> bytes:
+        return code.encode()
+
+    def _flags(self, flags: bytes) -> str:
+        return flags.decode()
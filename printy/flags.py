@@ -1,10 +1,40 @@
 from __future__ import annotations
 
 import re
-from typing import cast
+from collections.abc import Callable
+from functools import lru_cache
+from typing import TYPE_CHECKING, cast
 
+from .colors import (
+    TRUECOLOR,
+    color_depths,
+    get_color_depth,
+    get_nearest_16,
+    get_nearest_256,
+    parse_color,
+)
 from .exceptions import InvalidFlag
 
+if TYPE_CHECKING:
+    from functools import _CacheInfo
+
+# Max number of flag strings whose final ansi prefix is kept in memory
+PREFIX_CACHE_SIZE = 1024
+
+# Max number of truecolor flags whose nearest palette color is kept
+COLOR_CACHE_SIZE = 4096
+
+# Functions that empty the caches of other modules that depend on the flags,
+# called by 'Flags.cache_clear'
+dependent_caches: list[Callable[[], None]] = []
+
+# New in 2.2
+# Extract the background, the chars on brackets {}
+# New in 3.1: the truecolors, '#rrggbb' and 'rgb(r,g,b)', can be backgrounds
+bg_regex = re.compile(
+    "[a-zA-Z0-9<>#(),]{0,}(?P<background>{[a-zA-Z0-9<>#(),]{0,}})[a-zA-Z0-9<>#(),]{0,}"
+)
+
 
 class Flags:
     escape_ansi_code = "\x1b["
@@ -13,6 +43,20 @@ class Flags:
     start_foreground = "38;5;"
     start_background = "48;5;"
 
+    # The truecolor flags ('#rrggbb' and 'rgb(r,g,b)') are shown as they are
+    # or as the nearest color the terminal has, see 'printy.colors'
+    start_truecolor_foreground = "38;2;"
+    start_truecolor_background = "48;2;"
+    # The codes of the 16 basic colors (0 to 7, then 8 to 15)
+    basic_foregrounds = tuple(map(str, [*range(30, 38), *range(90, 98)]))
+    basic_backgrounds = tuple(map(str, [*range(40, 48), *range(100, 108)]))
+    # The number of colors of the terminal (see 'set_color_depth'), by
+    # default according to the environment
+    color_depth: int | None = None
+    # The one of the environment, read when it's first needed, and again
+    # after 'cache_clear' (which 'set_color_depth' calls)
+    _environment_depth: int | None = None
+
     #### COLORS
 
     # Gray Scale
@@ -71,6 +115,21 @@ class Flags:
     #### END OF LINE
     reset = "0"
 
+    # Codes to go back to the default colors, without resetting the formats
+    default_foreground = "39"
+    default_background = "49"
+
+    # Flags added at runtime (see 'printy.themes'): colors, as their 256 color
+    # codes by flag, and aliases of other flags, by flag, the ones of the
+    # theme in use included. Both are replaced instead of modified, and the
+    # lookup tables are built again
+    custom_colors: dict[str, str] = {}
+    aliases: dict[str, str] = {}
+
+    # Built on demand by 'get_flag_table' and 'get_alias_table'
+    _flag_table: dict[str, tuple[str, str]]
+    _alias_table: dict[str, tuple[tuple[str, ...], tuple[str, ...]]]
+
     @classmethod
     def get_end_of_line(cls) -> str:
         """Defined method to get the 'reset' code"""
@@ -96,88 +155,346 @@ class Flags:
     @classmethod
     def get_fg_value(cls, flags: dict[str, str], flag: str) -> str:
         """
-        Return the flag as fg ansi code
+        Return the flag as fg ansi code, from the lookup table ('flags' is no
+        longer needed, it's kept for compatibility)
         """
-        # The name of the attribute in the class
-        flag_name = flags[flag]
-        if flag_name.startswith("FORMAT_"):
-            return cast(tuple[str, str], getattr(cls, flag_name))[1]
-        return cls.start_foreground + cast(tuple[str, str], getattr(cls, flag_name))[1]
+        return cls.get_flag_table()[flag][0]
 
     @classmethod
     def get_bg_value(cls, flags: dict[str, str], flag: str) -> str:
         """
-        Truns a flag ansi code from doreground to background code
+        Return the flag as bg ansi code, from the lookup table ('flags' is no
+        longer needed, it's kept for compatibility)
         """
-        # The name of the attribute in the class
-        flag_name = flags[flag]
-        if flag_name.startswith("FORMAT_"):
-            return cast(tuple[str, str], getattr(cls, flag_name))[1]
-        return cls.start_background + cast(tuple[str, str], getattr(cls, flag_name))[1]
+        return cls.get_flag_table()[flag][1]
 
     @classmethod
-    def get_flag_values(cls, flags: str) -> list[str]:
-        """returns a list of the escaped values for the flag labels"""
-        available_flags = cls.get_flags()
-        flags_values: list[str] = []
+    def get_flag_table(cls) -> dict[str, tuple[str, str]]:
+        """
+        returns the lookup table of the class, where the flag is the key and
+        the value is a tuple with its foreground and background ansi codes.
+
+        The table is built only once per class (subclasses get their own), call
+        'cache_clear' if the flags are modified at runtime.
+        """
+        table: dict[str, tuple[str, str]] | None = cls.__dict__.get("_flag_table")
+        if table is None:
+            table = {}
+            for flag, flag_name in cls.get_flags().items():
+                value = cast(tuple[str, str], getattr(cls, flag_name))[1]
+                if flag_name.startswith("FORMAT_"):
+                    table[flag] = (value, value)
+                else:
+                    table[flag] = (
+                        cls.start_foreground + value,
+                        cls.start_background + value,
+                    )
+            for flag, value in cls.custom_colors.items():
+                table[flag] = (
+                    cls.start_foreground + value,
+                    cls.start_background + value,
+                )
+            cls._flag_table = table
+        return table
+
+    @classmethod
+    def get_color_depth(cls) -> int:
+        """
+        Returns the color depth set with 'set_color_depth', or the one of the
+        environment, which is read only once, as it's needed for every
+        truecolor flag
+        """
+        if cls.color_depth is not None:
+            return cls.color_depth
+        depth = Flags._environment_depth
+        if depth is None:
+            depth = Flags._environment_depth = get_color_depth()
+        return depth
 
+    @classmethod
+    def get_color_values(cls, flag: str) -> tuple[str, str] | None:
+        """
+        Returns the foreground and background ansi codes of a truecolor flag,
+        or of its nearest color if the terminal doesn't have it, or None if
+        it's not a truecolor flag
+        """
+        depth = cls.get_color_depth()
+        # mypy does not take classes as hashable for the lru_cache
+        return _get_cached_color(cls, flag, depth)  # type: ignore[arg-type]
+
+    @classmethod
+    def get_alias_table(cls) -> dict[str, tuple[tuple[str, ...], tuple[str, ...]]]:
+        """
+        Returns the lookup table of the aliases, where the alias is the key
+        and the value has the ansi codes of its flags, as a foreground and as
+        a background. Built only once, like 'get_flag_table'.
+        """
+        table: dict[str, tuple[tuple[str, ...], tuple[str, ...]]] | None = (
+            cls.__dict__.get("_alias_table")
+        )
+        if table is None:
+            table = {alias: cls._resolve_alias(alias, ()) for alias in cls.aliases}
+            cls._alias_table = table
+        return table
+
+    @classmethod
+    def _resolve_alias(
+        cls, alias: str, resolving: tuple[str, ...]
+    ) -> tuple[tuple[str, ...], tuple[str, ...]]:
+        """
+        Returns the ansi codes of the flags of an alias, as a foreground and
+        as a background. 'resolving' are the aliases that use it, which it
+        can't use in turn.
+        """
+        if alias in resolving:
+            raise InvalidFlag(alias)
+        foreground: list[str] = []
+        background: list[str] = []
+        bg, flags = cls.split_flags(cls.aliases[alias])
+        # Its own background goes first, and is the same either way
+        if bg:
+            values = cls._resolve_flag(bg, (*resolving, alias))
+            foreground.extend(values[1])
+            background.extend(values[1])
+        for flag in flags:
+            values = cls._resolve_flag(flag, (*resolving, alias))
+            foreground.extend(values[0])
+            background.extend(values[1])
+        return tuple(foreground), tuple(background)
+
+    @classmethod
+    def _resolve_flag(
+        cls, flag: str, resolving: tuple[str, ...]
+    ) -> tuple[tuple[str, ...], tuple[str, ...]]:
+        """Returns the ansi codes of a flag of an alias, like '_resolve_alias'"""
+        available_flags = cls.get_flag_table()
+        if flag in available_flags:
+            return (available_flags[flag][0],), (available_flags[flag][1],)
+        if flag in cls.aliases:
+            return cls._resolve_alias(flag, resolving)
+        color = cls.get_color_values(flag)
+        if color is None:
+            raise InvalidFlag(flag)
+        return (color[0],), (color[1],)
+
+    @classmethod
+    def _get_other_values(cls, flag: str) -> tuple[tuple[str, ...], tuple[str, ...]]:
+        """
+        Returns the ansi codes of a flag that's not in the lookup table, a
+        truecolor or an alias, as a foreground and as a background
+        """
+        color = cls.get_color_values(flag)
+        if color is not None:
+            return (color[0],), (color[1],)
+        alias = cls.get_alias_table().get(flag)
+        if alias is None:
+            raise InvalidFlag(flag)
+        return alias
+
+    @staticmethod
+    def split_flags(flags: str) -> tuple[str, list[str]]:
+        """
+        Splits the flags in the background one (empty if there's none) and the
+        rest of them, without checking they exist, i.e. 'rB{y}' gives
+        ('y', ['r', 'B'])
+        """
         # New in v1.3.0
         # flags can get a dark or a light intensity through the '<' and '>'
         # characters respectively. Dark colors have the form: <color, i.e. <b
         # light colors have the form color>, i.e. b>
-        potential_flag: list[str] = []
         flags = flags.replace(" ", "")  # remove white-spaces
-        # We use inspect so we can check the following character also
-
-        # New in 2.2
-        # Extract the background, teh chars on brackets {}
-        bg_regex = "[a-zA-Z<>]{0,}(?P<background>{[a-zA-Z<>]{0,}})[a-zA-Z<>]{0,}"
-        matched_bg = re.match(bg_regex, flags)
 
+        bg = ""
+        matched_bg = bg_regex.match(flags)
         if matched_bg is not None:
-            bg = matched_bg.groupdict().get("background")
-            if bg:
-                # Remove the background from the flags, so we end up
-                # with the foreground flasg only
-                flags = flags.replace(bg, "")
-                # remove brackets from background
-                bg = bg[1:-1]
-                # bg now can be an empty string if there's nothing between the brackets {}
-                if bg:
-                    if bg not in available_flags:
-                        raise InvalidFlag(bg)
-                    if hasattr(cls, available_flags[bg]):
-                        flags_values.append(cls.get_bg_value(available_flags, bg))
-
-        for f in range(len(flags)):
-            flag = flags[f]
+            bg = matched_bg.group("background")
+            # Remove the background from the flags, so we end up
+            # with the foreground flasg only
+            flags = flags.replace(bg, "")
+            # remove brackets from background, it can be an empty string if
+            # there's nothing between the brackets {}
+            bg = bg[1:-1]
 
-            if flag == "<":
-                potential_flag.append(flag)
+        foreground: list[str] = []
+        start = 0
+        length = len(flags)
+        f = 0
+        while f < length:
+            flag = flags[f]
+            f += 1
+            if flag == "#":
+                # A truecolor, '#rrggbb'
+                f += 6
+            elif flag == "r" and flags.startswith("gb(", f):
+                # Or 'rgb(r,g,b)', up to the parenthesis
+                f = flags.find(")", f) + 1 or length
+            elif flag == "<" or (flag != ">" and f < length and flags[f] == ">"):
+                # A '<' always waits for the next character, and any other
+                # character waits for a '>' right after it
                 continue
-            elif flag == ">":
-                potential_flag.append(flag)
-                flag = "".join(potential_flag)
-                potential_flag.clear()
+            foreground.append(flags[start:f])
+            start = f
+        return bg, foreground
+
+    @classmethod
+    def get_flag_values(cls, flags: str) -> list[str]:
+        """returns a list of the escaped values for the flag labels"""
+        available_flags = cls.get_flag_table()
+        flags_values: list[str] = []
+
+        bg, foreground = cls.split_flags(flags)
+        if bg:
+            if bg in available_flags:
+                flags_values.append(available_flags[bg][1])
             else:
-                try:
-                    next_flag = flags[f + 1]
-                except IndexError:
-                    # the last one
-                    next_flag = None
-
-                if next_flag == ">":
-                    potential_flag.append(flag)
-                    continue
-                else:
-                    potential_flag.append(flag)
-                    flag = "".join(potential_flag)
-                    potential_flag.clear()
+                # Truecolors and aliases are only looked up if it's not a flag
+                flags_values.extend(cls._get_other_values(bg)[1])
 
-            if flag not in available_flags:
-                raise InvalidFlag(flag)
+        for flag in foreground:
+            if flag in available_flags:
+                flags_values.append(available_flags[flag][0])
             else:
-                if hasattr(cls, available_flags[flag]):
-                    flags_values.append(cls.get_fg_value(available_flags, flag))
+                flags_values.extend(cls._get_other_values(flag)[0])
 
         return flags_values
+
+    @classmethod
+    def get_prefix(cls, flags: str) -> str:
+        """
+        Returns the final ansi code (the one returned by 'join_flags') for a
+        set of flags. Results are memoized, so resolving the same flags
+        again is a single lookup.
+        """
+        # mypy does not take classes as hashable for the lru_cache
+        return _get_cached_prefix(cls, flags)  # type: ignore[arg-type]
+
+    @classmethod
+    def get_style(cls, flags: str) -> tuple[str | None, str | None, tuple[str, ...]]:
+        """
+        Returns the style that the flags give to the text, as a tuple of
+        (foreground, background, formats) codes. If there are many colors,
+        the last one is taken, as a terminal does.
+        """
+        foreground: str | None = None
+        background: str | None = None
+        formats: list[str] = []
+        foregrounds = (cls.start_foreground, cls.start_truecolor_foreground)
+        backgrounds = (cls.start_background, cls.start_truecolor_background)
+        for value in cls.get_flag_values(flags) if flags else []:
+            if value.startswith(foregrounds) or value in cls.basic_foregrounds:
+                foreground = value
+            elif value.startswith(backgrounds) or value in cls.basic_backgrounds:
+                background = value
+            elif value not in formats:
+                formats.append(value)
+        return foreground, background, tuple(formats)
+
+    @classmethod
+    def get_transition(cls, previous: str, flags: str) -> str:
+        """
+        Returns the shortest ansi code to change the style of the 'previous'
+        flags for the style of 'flags' (an empty string for no style at all),
+        so a text with many sections doesn't need to reset the style after
+        each one. It's empty if both styles are the same. Results are memoized,
+        like 'get_prefix' does.
+        """
+        # mypy does not take classes as hashable for the lru_cache
+        return _get_cached_transition(cls, previous, flags)  # type: ignore[arg-type]
+
+    @classmethod
+    def cache_info(cls) -> _CacheInfo:
+        """Returns the hits, misses and size of the flags prefix cache"""
+        return _get_cached_prefix.cache_info()
+
+    @classmethod
+    def cache_clear(cls) -> None:
+        """
+        Empties the prefix cache (and the other caches that depend on the
+        flags) and drops the lookup tables of the class and of its subclasses,
+        which may have been built from its flags, so all of them get rebuilt
+        with the current flags. The color depth of the environment is read
+        again too
+        """
+        Flags._environment_depth = None
+        _get_cached_prefix.cache_clear()
+        _get_cached_transition.cache_clear()
+        _get_cached_color.cache_clear()
+        for clear in dependent_caches:
+            clear()
+        classes = [cls]
+        while classes:
+            klass = classes.pop()
+            if "_flag_table" in klass.__dict__:
+                del klass._flag_table
+            if "_alias_table" in klass.__dict__:
+                del klass._alias_table
+            classes.extend(klass.__subclasses__())
+
+
+@lru_cache(maxsize=PREFIX_CACHE_SIZE)
+def _get_cached_prefix(cls: type[Flags], flags: str) -> str:
+    return cls.join_flags(cls.get_flag_values(flags))
+
+
+@lru_cache(maxsize=PREFIX_CACHE_SIZE)
+def _get_cached_transition(cls: type[Flags], previous: str, flags: str) -> str:
+    if not previous:
+        return cls.get_prefix(flags) if flags else ""
+    foreground, background, formats = cls.get_style(flags)
+    previous_foreground, previous_background, previous_formats = cls.get_style(previous)
+    if (
+        foreground == previous_foreground
+        and background == previous_background
+        and set(formats) == set(previous_formats)
+    ):
+        return ""
+    if not (foreground or background or formats):
+        return cls.get_end_of_line()
+
+    # Resetting the style and setting the new one
+    codes = [cls.reset, *cls.get_flag_values(flags)]
+    # Or, if no format has to be removed, setting only what changes
+    if set(previous_formats) <= set(formats):
+        changes = [value for value in formats if value not in previous_formats]
+        if foreground != previous_foreground:
+            changes.append(foreground or cls.default_foreground)
+        if background != previous_background:
+            changes.append(background or cls.default_background)
+        if len(";".join(changes)) < len(";".join(codes)):
+            codes = changes
+    return cls.join_flags(codes)
+
+
+@lru_cache(maxsize=COLOR_CACHE_SIZE)
+def _get_cached_color(
+    cls: type[Flags], flag: str, depth: int
+) -> tuple[str, str] | None:
+    rgb = parse_color(flag)
+    if rgb is None:
+        return None
+    if depth == TRUECOLOR:
+        value = "%d;%d;%d" % rgb
+        return (
+            cls.start_truecolor_foreground + value,
+            cls.start_truecolor_background + value,
+        )
+    if depth == 256:
+        value = str(get_nearest_256(*rgb))
+        return cls.start_foreground + value, cls.start_background + value
+    index = get_nearest_16(*rgb)
+    return cls.basic_foregrounds[index], cls.basic_backgrounds[index]
+
+
+def set_color_depth(depth: int | None) -> None:
+    """
+    Sets the number of colors of the terminal (16, 256 or TRUECOLOR), so the
+    truecolor flags are shown as the nearest color it has, or with None, lets
+    it depend on the environment again (see 'printy.colors.get_color_depth')
+    """
+    if depth is not None and depth not in color_depths:
+        raise ValueError(
+            "The color depth must be one of %s"
+            % ", ".join(str(depth) for depth in color_depths)
+        )
+    Flags.color_depth = depth
+    Flags.cache_clear()
@@ -0,0 +1,253 @@
+"""
+Opt-in instrumentation, counting the calls to each stage of formatting and
+writing a text, and the time spent in them, i.e.
+
+>>> import printy
+>>> printy.enable_stats()
+>>> printy.printy('[rB]Some@ text')
+>>> printy.stats().stages['parse']
+StageStats(calls=1, seconds=1.2e-05)
+
+The stages are:
+- parse: the inline formats of a text are parsed, or removed
+- flags: some flags are resolved to their ansi codes, the ones already
+  resolved are cached (see 'Flags.cache_info')
+- pretty: an object is pretty printed
+- escape: the special characters of a value are escaped
+- write: the formatted text is written by printy(), 'Printy.write_file' or a
+  PrintyWriter
+
+The time of a stage includes the time of the stages called by it, i.e. the
+values escaped while pretty printing an object.
+
+While enabled, the functions of each stage are replaced by the ones that count
+them, and they're restored when disabled, so when disabled, printy runs the
+same code as if this module didn't exist.
+"""
+
+from __future__ import annotations
+
+import builtins
+from collections.abc import Callable, Iterator
+from functools import wraps
+from time import perf_counter
+from typing import Any, BinaryIO, NamedTuple
+
+from . import _bind_instance_methods, core
+from .core import Printy, _BaseStreamFormatter
+from .flags import Flags
+from .writer import PrintyWriter
+
+stages = ("parse", "flags", "pretty", "escape", "write")
+
+
+class StageStats(NamedTuple):
+    """The number of calls to a stage, and the seconds spent in them"""
+
+    calls: int
+    seconds: float
+
+
+class Stats(NamedTuple):
+    """
+    The stats of each stage, and the bytes of the texts parsed (bytes_in) and
+    written (bytes_out), texts are counted as encoded in utf-8
+    """
+
+    enabled: bool
+    stages: dict[str, StageStats]
+    bytes_in: int
+    bytes_out: int
+
+
+_calls = dict.fromkeys(stages, 0)
+_seconds = dict.fromkeys(stages, 0.0)
+_bytes = {"in": 0, "out": 0}
+
+# The attributes replaced while enabled, with their original value, if any
+_originals: list[tuple[Any, str, Any]] = []
+_missing = object()
+
+
+def _size(text: str | bytes) -> int:
+    """The number of bytes of the text, encoded in utf-8 if it's a str"""
+    if isinstance(text, str) and not text.isascii():
+        return len(text.encode())
+    return len(text)
+
+
+def _text_size(owner: Any, text: str | bytes, *args: Any, **kwargs: Any) -> int:
+    """The size of the text passed to a method"""
+    return _size(text)
+
+
+def _printed_size(
+    *values: Any, sep: str | None = " ", end: str | None = "\n", **kwargs: Any
+) -> int:
+    """The size of the text written by print()"""
+    text = (" " if sep is None else sep).join(map(str, values))
+    return _size(text + ("\n" if end is None else end))
+
+
+def _buffer_size(writer: PrintyWriter) -> int:
+    """The size of the text written when a writer is flushed"""
+    return sum(map(_size, writer._buffer))
+
+
+def _timed(
+    stage: str,
+    function: Callable[..., Any],
+    size_in: Callable[..., int] | None = None,
+    size_out: Callable[..., int] | None = None,
+) -> Callable[..., Any]:
+    """Returns the function counted in the stage, and the size of its texts"""
+
+    @wraps(function)
+    def _function(*args: Any, **kwargs: Any) -> Any:
+        if size_in is not None:
+            _bytes["in"] += size_in(*args, **kwargs)
+        if size_out is not None:
+            _bytes["out"] += size_out(*args, **kwargs)
+        start = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _seconds[stage] += perf_counter() - start
+            _calls[stage] += 1
+
+    return _function
+
+
+def _timed_iterator(
+    stage: str, function: Callable[..., Iterator[Any]]
+) -> Callable[..., Iterator[Any]]:
+    """
+    Returns the generator function counted in the stage, the time is the one
+    spent getting each item
+    """
+
+    @wraps(function)
+    def _function(*args: Any, **kwargs: Any) -> Iterator[Any]:
+        _calls[stage] += 1
+        iterator = function(*args, **kwargs)
+        while True:
+            start = perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                _seconds[stage] += perf_counter() - start
+            yield item
+
+    return _function
+
+
+class _TimedOutput:
+    """A binary stream whose writes are counted in the write stage"""
+
+    def __init__(self, output: BinaryIO) -> None:
+        self.output = output
+
+    def _write(self, data: bytes) -> int:
+        return self.output.write(data)
+
+    write = _timed("write", _write, size_out=_text_size)
+
+
+def _timed_write_file(function: Callable[..., None]) -> Callable[..., None]:
+    """Returns 'Printy.write_file', counting the writes to its output"""
+
+    @wraps(function)
+    def write_file(
+        self: Printy, file: str, output: BinaryIO, *args: Any, **kwargs: Any
+    ) -> None:
+        function(self, file, _TimedOutput(output), *args, **kwargs)
+
+    return write_file
+
+
+def _stage(
+    stage: str,
+    size_in: Callable[..., int] | None = None,
+    size_out: Callable[..., int] | None = None,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Returns a function that counts the functions passed to it in the stage"""
+    return lambda function: _timed(stage, function, size_in, size_out)
+
+
+def _replace(
+    owner: Any, name: str, get_replacement: Callable[[Callable[..., Any]], Any]
+) -> None:
+    """
+    Replaces an attribute of the owner by the one returned for its function,
+    keeping the classmethods as such
+    """
+    original = vars(owner).get(name, _missing)
+    replacement: Any
+    if isinstance(original, classmethod):
+        replacement = classmethod(get_replacement(original.__func__))
+    elif original is _missing:
+        replacement = get_replacement(getattr(builtins, name))
+    else:
+        replacement = get_replacement(original)
+    _originals.append((owner, name, original))
+    setattr(owner, name, replacement)
+
+
+def enable() -> None:
+    """Starts counting the calls to each stage, if not counting them already"""
+    if _originals:
+        return
+    parse = _stage("parse", size_in=_text_size)
+    _replace(Printy, "_tokenize", parse)
+    _replace(Printy, "strip", parse)
+    _replace(_BaseStreamFormatter, "feed", parse)
+    _replace(Flags, "get_flag_values", _stage("flags"))
+    _replace(Printy, "_pretty_print_object", _stage("pretty"))
+    _replace(
+        Printy,
+        "_iter_formatted_object",
+        lambda function: _timed_iterator("pretty", function),
+    )
+    _replace(Printy, "escape", _stage("escape"))
+    _replace(Printy, "_escape_special_chars", _stage("escape"))
+    # The print() of the core module, which is the builtin one until replaced
+    _replace(core, "print", _stage("write", size_out=_printed_size))
+    _replace(Printy, "write_file", _timed_write_file)
+    _replace(PrintyWriter, "_flush", _stage("write", size_out=_buffer_size))
+    # The functions of the package already used are bound to the old methods
+    _bind_instance_methods()
+
+
+def disable() -> None:
+    """Stops counting the calls, restoring the original functions"""
+    while _originals:
+        owner, name, original = _originals.pop()
+        if original is _missing:
+            delattr(owner, name)
+        else:
+            setattr(owner, name, original)
+    _bind_instance_methods()
+
+
+def is_enabled() -> bool:
+    return bool(_originals)
+
+
+def reset() -> None:
+    """Sets all the counters back to zero"""
+    for stage in stages:
+        _calls[stage] = 0
+        _seconds[stage] = 0.0
+    _bytes["in"] = _bytes["out"] = 0
+
+
+def get_stats() -> Stats:
+    """Returns the counters of each stage, and the bytes in and out"""
+    return Stats(
+        enabled=is_enabled(),
+        stages={stage: StageStats(_calls[stage], _seconds[stage]) for stage in stages},
+        bytes_in=_bytes["in"],
+        bytes_out=_bytes["out"],
+    )
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from types import TracebackType
+from typing import IO, Any
+
+from .core import Printy
+from .flags import Flags
+from .widths import get_char_width
+
+# Max number of times per second a live region is redrawn
+default_fps = 10.0
+
+# Unchanged cells in between two changed ones are written again if there are
+# fewer than these, as moving the cursor over them takes more bytes
+max_gap = 4
+
+# Ansi codes to move the cursor and erase the screen
+cursor_up = "\x1b[%dA"
+cursor_to_column = "\x1b[%dG"
+erase_line_end = "\x1b[K"
+erase_screen_end = "\x1b[J"
+
+# A line of the region, as the text and the flags of each cell of the
+# terminal, a wide character is followed by an empty cell, and characters
+# that take no cells are part of the previous one
+_Line = tuple[tuple[str, ...], tuple[str, ...]]
+
+
+class LiveRegion:
+    """
+    A block of lines at the bottom of the terminal, i.e. a status line or a
+    progress display, that is redrawn in place every time it's updated.
+
+    >>> with LiveRegion() as region:
+    ...     for i, file in enumerate(files):
+    ...         region.update('[y]Copying@ %s\\n[n]%d@/%d' % (file, i, len(files)))
+
+    Only the characters that changed since the last frame are written, by
+    moving the cursor to them and changing the style only where it's
+    different. The region is redrawn at most 'fps' times per second (every
+    time if None), updates made in between replace each other, and the last
+    one is drawn once the interval has passed, so updating it from many
+    threads never floods the terminal.
+
+    The lines should be shorter than the terminal's width (wide characters
+    take two cells, see 'printy.widths'), otherwise the terminal breaks them
+    and the cursor ends up in the wrong line.
+
+    Whether the ansi codes are added is checked once for the stream (see
+    'Printy.supports_color'), unless 'color' forces or disables them. Without
+    them, the cursor can't be moved either, so only the last frame is
+    written, with no formats, when the region is closed.
+    """
+
+    def __init__(
+        self,
+        stream: IO[str] | None = None,
+        fps: float | None = default_fps,
+        printy: Printy | None = None,
+        color: bool | None = None,
+    ) -> None:
+        if fps is not None and fps <= 0:
+            raise ValueError("fps must be greater than 0")
+        self.stream: IO[str] = stream if stream is not None else sys.stdout
+        self.interval = 1 / fps if fps is not None else 0.0
+        self.printy = printy if printy is not None else Printy()
+        self.color = self.printy.supports_color(self.stream) if color is None else color
+        self.closed = False
+
+        # The lines drawn in the terminal, and the ones to draw next, if any
+        self._frame: list[_Line] = []
+        self._pending: list[_Line] | None = None
+        self._last_render = float("-inf")
+        self._timer: threading.Timer | None = None
+        self._lock = threading.Lock()
+
+    def _get_lines(self, value: Any, flags: str, predefined: str) -> list[_Line]:
+        """Splits the formatted value in lines of cells, with their flags"""
+        text = self.printy._repr_value(value)
+        if flags:
+            sections: list[tuple[str, str | None]] = [(self.printy.strip(text), flags)]
+        else:
+            sections = self.printy._tokenize(text, unescape=True)
+        lines: list[_Line] = []
+        cells: list[str] = []
+        styles: list[str] = []
+        # Characters that take no cells at the start of a line
+        pending = ""
+        for section_text, flags_or_none in sections:
+            section_flags = flags_or_none or predefined
+            # The flags must be valid even if they're not used
+            if section_flags:
+                Flags.get_prefix(section_flags)
+            for char in section_text:
+                if char == "\n":
+                    lines.append((tuple(cells), tuple(styles)))
+                    cells = []
+                    styles = []
+                    pending = ""
+                    continue
+                width = get_char_width(char)
+                if not width:
+                    if cells:
+                        cells[-1] += char
+                    else:
+                        pending += char
+                    continue
+                cells.append(pending + char)
+                styles.append(section_flags)
+                pending = ""
+                if width == 2:
+                    cells.append("")
+                    styles.append(section_flags)
+        lines.append((tuple(cells), tuple(styles)))
+        return lines
+
+    def update(self, value: Any, flags: str = "", predefined: str = "") -> None:
+        """
+        Replaces the lines of the region by the value, formatted like
+        printy() does, with a line for each '\\n' in it
+        """
+        lines = self._get_lines(value, flags, predefined)
+        with self._lock:
+            if self.closed:
+                raise ValueError("I/O operation on closed LiveRegion")
+            self._pending = lines
+            if not self.color:
+                # Only the last update is written, when closed
+                return
+            wait = self._last_render + self.interval - time.monotonic()
+            if wait <= 0:
+                self._render()
+            elif self._timer is None:
+                # The last update is drawn once the interval has passed
+                self._timer = threading.Timer(wait, self.refresh)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def refresh(self) -> None:
+        """Draws the last update right away, if it's not drawn yet"""
+        with self._lock:
+            if not self.closed:
+                self._render()
+
+    @staticmethod
+    def _diff_line(previous: _Line, line: _Line, output: list[str]) -> None:
+        """
+        Adds to the output the codes to turn the previous line into the new
+        one, with the cursor at the start of it
+        """
+        if line == previous:
+            return
+        cells, styles = line
+        previous_cells, previous_styles = previous
+        size = len(cells)
+        previous_size = len(previous_cells)
+        get_transition = Flags.get_transition
+
+        def changed(index: int) -> bool:
+            return (
+                index >= previous_size
+                or cells[index] != previous_cells[index]
+                or styles[index] != previous_styles[index]
+            )
+
+        style = ""
+        column = 0
+        index = 0
+        while index < size:
+            if not changed(index):
+                index += 1
+                continue
+            # A run of changed cells, with the short gaps of unchanged ones,
+            # that ends with whole wide characters (it always starts with one,
+            # as their empty cell changes only if they do)
+            last = end = index
+            while end < size and end - last <= max_gap:
+                if changed(end):
+                    last = end
+                end += 1
+            while last + 1 < size and not cells[last + 1]:
+                last += 1
+            if column != index:
+                output.append(cursor_to_column % (index + 1))
+            for position in range(index, last + 1):
+                transition = get_transition(style, styles[position])
+                if transition:
+                    output.append(transition)
+                style = styles[position]
+                output.append(cells[position])
+            column = index = last + 1
+        if style:
+            output.append(get_transition(style, ""))
+        if previous_size > size:
+            if column != size:
+                output.append(cursor_to_column % (size + 1))
+            output.append(erase_line_end)
+
+    def _render(self) -> None:
+        """Draws the pending lines, must be called with the lock"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        lines = self._pending
+        if lines is None or not self.color:
+            return
+        self._pending = None
+        self._last_render = time.monotonic()
+        previous = self._frame
+        if lines == previous:
+            return
+
+        # The cursor is kept at the start of the line below the region, and
+        # each line ends moving it to the start of the next one
+        output: list[str] = []
+        if previous:
+            output.append(cursor_up % len(previous))
+        empty: _Line = ((), ())
+        for row, line in enumerate(lines):
+            self._diff_line(
+                previous[row] if row < len(previous) else empty, line, output
+            )
+            output.append("\n")
+        if len(previous) > len(lines):
+            output.append(erase_screen_end)
+        self._frame = lines
+        self.stream.write("".join(output))
+        self.stream.flush()
+
+    def clear(self) -> None:
+        """Erases the region from the terminal, the next update draws it again"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._pending = None
+            if self._frame:
+                self.stream.write(cursor_up % len(self._frame) + erase_screen_end)
+                self.stream.flush()
+                self._frame = []
+
+    def close(self) -> None:
+        """
+        Draws the last update, leaving the region in the terminal, with the
+        cursor below it
+        """
+        with self._lock:
+            if self.closed:
+                return
+            if not self.color and self._pending is not None:
+                self.stream.write(
+                    "".join("".join(cells) + "\n" for cells, _ in self._pending)
+                )
+                self.stream.flush()
+            self._render()
+            self.closed = True
+
+    def __enter__(self) -> LiveRegion:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
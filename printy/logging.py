@@ -0,0 +1,199 @@
+"""
+Integration with the logging module, i.e.
+
+>>> import logging
+>>> from printy.logging import PrintyHandler
+>>> logging.basicConfig(level=logging.INFO, handlers=[PrintyHandler()])
+>>> logging.getLogger(__name__).info('[nB]Connected@ to %s', host)
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import sys
+from collections.abc import Mapping
+from typing import Any, Literal
+
+from .core import Printy
+from .flags import Flags
+from .writer import PrintyWriter
+
+# Flags applied to the level name of each level
+default_level_flags = {
+    logging.DEBUG: "g",
+    logging.INFO: "c",
+    logging.WARNING: "y",
+    logging.ERROR: "r",
+    logging.CRITICAL: "rB",
+}
+
+# Max number of messages kept already parsed
+default_cache_size = 1024
+
+# The ways the level name can be found in the format of each style
+levelname_regexes = {
+    "%": re.compile(r"%\(levelname\)(?P<spec>[#0+ -]*\d*(?:\.\d+)?)s"),
+    "{": re.compile(r"{levelname(?:!(?P<conversion>[rsa]))?(?::(?P<spec>[^{}]*))?}"),
+    "$": re.compile(r"\$(?:{levelname}|levelname\b)"),
+}
+
+styles: dict[str, type[logging.PercentStyle]] = {
+    "%": logging.PercentStyle,
+    "{": logging.StrFormatStyle,
+    "$": logging.StringTemplateStyle,
+}
+
+
+class PrintyFormatter(logging.Formatter):
+    """
+    A logging formatter that accepts printy's inline formats, both in its
+    format and in the messages.
+
+    The format is parsed only once, and so are the level names, styled with
+    the flags in 'level_flags' and resolved to their ansi codes when the
+    formatter is created. The messages are parsed once too (the last
+    'cache_size' messages are kept), and the arguments are added after that,
+    so they're never parsed, as if they were escaped.
+
+    The special characters of the format are inline formats as well, so a
+    format like '[%(levelname)s] %(message)s' raises an InvalidFlag when the
+    formatter is created, the brackets must be escaped:
+    '\\[%(levelname)s\\] %(message)s'.
+
+    If 'parse_messages' is False, the messages are printed out as they are.
+
+    'color' forces (or disables) the ansi codes, by default they're added
+    unless disabled for 'printy' (see 'Printy.supports_color').
+    """
+
+    def __init__(
+        self,
+        fmt: str | None = None,
+        datefmt: str | None = None,
+        style: Literal["%", "{", "$"] = "%",
+        validate: bool = True,
+        *,
+        defaults: Mapping[str, Any] | None = None,
+        level_flags: Mapping[int, str] | None = None,
+        parse_messages: bool = True,
+        cache_size: int = default_cache_size,
+        printy: Printy | None = None,
+        color: bool | None = None,
+    ) -> None:
+        self.printy = printy if printy is not None else Printy()
+        self.color = self.printy.supports_color() if color is None else color
+        self.parse_messages = parse_messages
+        self.cache_size = cache_size
+        self._messages: dict[str, str] = {}
+
+        if fmt is None:
+            fmt = {
+                "%": logging.BASIC_FORMAT,
+                "{": "{levelname}:{name}:{message}",
+                "$": "${levelname}:${name}:${message}",
+            }[style]
+        compiled = self.printy.get_formatted_text(fmt, color=self.color)
+        super().__init__(compiled, datefmt, style, validate, defaults=defaults)
+
+        # A format for each level, with its level name already formatted
+        if level_flags is None:
+            level_flags = default_level_flags
+        self._level_styles: dict[int, logging.PercentStyle] = {}
+        for level, flags in level_flags.items():
+            level_fmt = self._format_levelname(
+                compiled, style, logging.getLevelName(level), flags
+            )
+            self._level_styles[level] = styles[style](level_fmt, defaults=defaults)
+
+    def _format_levelname(
+        self, fmt: str, style: str, levelname: str, flags: str
+    ) -> str:
+        """Replaces the level name fields in the format by the formatted name"""
+        prefix = Flags.get_prefix(flags) if flags and self.color else ""
+        end = Flags.get_end_of_line() if prefix else ""
+
+        def _replace(match: re.Match[str]) -> str:
+            groups = match.groupdict()
+            spec = groups.get("spec") or ""
+            if style == "%":
+                name = ("%" + spec + "s") % levelname
+                return prefix + name.replace("%", "%%") + end
+            if style == "{":
+                value = {"r": repr, "a": ascii}.get(groups["conversion"], str)(
+                    levelname
+                )
+                name = format(value, spec)
+                return prefix + name.replace("{", "{{").replace("}", "}}") + end
+            return prefix + levelname.replace("$", "$$") + end
+
+        return levelname_regexes[style].sub(_replace, fmt)
+
+    def _get_message(self, record: logging.LogRecord) -> str:
+        """Returns the message with its inline formats, and the args added"""
+        msg = record.msg
+        if not isinstance(msg, str):
+            return record.getMessage()
+        formatted = self._messages.get(msg)
+        if formatted is None:
+            if len(self._messages) >= self.cache_size:
+                # Removes the oldest one
+                del self._messages[next(iter(self._messages))]
+            formatted = self._messages[msg] = self.printy.get_formatted_text(
+                msg, color=self.color
+            )
+        if record.args:
+            formatted = formatted % record.args
+        return formatted
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        if self.parse_messages:
+            record.message = self._get_message(record)
+        return self._level_styles.get(record.levelno, self._style).format(record)
+
+
+class PrintyHandler(logging.Handler):
+    """
+    A logging handler that writes the records with a PrintyWriter (or an
+    AsyncPrintyWriter), so they can be buffered or written in a background
+    thread. By default, each record is written right away to stderr.
+
+    The records are formatted with a PrintyFormatter, with the ansi codes
+    only if the writer's stream supports them, unless another formatter is
+    set.
+    """
+
+    terminator = "\n"
+
+    def __init__(
+        self, writer: PrintyWriter | None = None, level: int = logging.NOTSET
+    ) -> None:
+        super().__init__(level)
+        # The writer is only closed with the handler if it was created here
+        self._owns_writer = writer is None
+        self.writer = writer if writer is not None else PrintyWriter(sys.stderr, 0)
+        self.setFormatter(
+            PrintyFormatter(printy=self.writer.printy, color=self.writer.color)
+        )
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.writer.write(self.format(record) + self.terminator)
+        except RecursionError:  # pragma: no cover
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        with self.lock:  # type: ignore[union-attr]
+            self.writer.flush()
+
+    def close(self) -> None:
+        with self.lock:  # type: ignore[union-attr]
+            try:
+                if self._owns_writer:
+                    self.writer.close()
+                else:
+                    self.writer.flush()
+            finally:
+                super().close()
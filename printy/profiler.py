@@ -0,0 +1,308 @@
+"""
+Opt-in profiler of the calls to printy, attributing the time spent formatting
+the text, the bytes written and the peak of memory allocated to the line that
+called printy() or raw(), i.e.
+
+>>> import printy
+>>> printy.enable_profiler()
+>>> printy.printy(huge_dict)
+>>> print(printy.profiler_report())
+calls    seconds   per call   bytes out  peak memory  call site
+    1   0.012000   12.00 ms     95.3 KB     210.4 KB  app/views.py:42 (render)
+
+It can also be enabled with the environment variable PRINTY_PROFILE, set to
+the number of calls per sample (1 profiles them all, 0 or anything that is
+not a number doesn't enable it), and the report is written to stderr at exit.
+
+Only a call every 'every' calls is profiled (it's a sampling profiler), and
+the calls made by printy itself (i.e. printy() formatting its text with
+raw()) are part of the call that made them.
+
+While enabled, the entry points of 'Printy' (format, get_formatted_text,
+their batch versions and fmt) are replaced by the ones that profile them, the
+functions of the package are bound again to them, but any function imported
+before enabling it, as in
+>>> from printy import printy
+is not profiled, unless it's enabled with the environment variable.
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import sys
+import threading
+import tracemalloc
+from collections.abc import Callable, Iterator
+from functools import wraps
+from time import perf_counter
+from typing import Any, NamedTuple
+
+from . import _bind_instance_methods
+from .core import Printy
+
+# The environment variable that enables the profiler
+environment_variable = "PRINTY_PROFILE"
+
+# The calls made from the files of the package belong to their callers
+package_dir = os.path.dirname(__file__) + os.sep
+
+
+class CallSite(NamedTuple):
+    """The stats of the calls profiled from a line"""
+
+    filename: str
+    lineno: int
+    function: str
+    calls: int
+    seconds: float
+    bytes_out: int
+    peak_memory: int
+
+
+class _Profile:
+    """The options of the profiler while enabled"""
+
+    def __init__(self, every: int, allocations: bool) -> None:
+        self.every = every
+        self.allocations = allocations
+        # The calls not made by printy itself, only one every 'every' is profiled
+        self.calls = 0
+
+
+class _Call:
+    """A call being profiled, counting the bytes written by it"""
+
+    __slots__ = ("bytes_out",)
+
+    def __init__(self) -> None:
+        self.bytes_out = 0
+
+
+_profile: _Profile | None = None
+# The stats of each line: (filename, lineno, function): [calls, seconds,
+# bytes_out, peak_memory], kept once disabled until reset
+_sites: dict[tuple[str, int, str], list[Any]] = {}
+_lock = threading.Lock()
+# The call being profiled on each thread, or None while one is not profiled
+_local = threading.local()
+# The attributes replaced while enabled, with their original value
+_originals: list[tuple[Any, str, Any]] = []
+# Whether tracemalloc was started by the profiler, and has to be stopped
+_started_tracemalloc = False
+_registered_at_exit = False
+
+
+def _size(text: Any) -> int:
+    """The number of bytes of the text (or list of texts), encoded in utf-8"""
+    if isinstance(text, str):
+        return len(text) if text.isascii() else len(text.encode())
+    if isinstance(text, list):
+        return sum(map(_size, text))
+    return 0
+
+
+def _get_call_site() -> tuple[str, int, str]:
+    """The file, line and function of the first caller outside the package"""
+    frame = sys._getframe(2)
+    while frame.f_back is not None and frame.f_code.co_filename.startswith(package_dir):
+        frame = frame.f_back
+    return frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name
+
+
+def _profiled(function: Callable[..., Any]) -> Callable[..., Any]:
+    """Returns an entry point of printy, profiling one call every 'every' calls"""
+
+    @wraps(function)
+    def _function(*args: Any, **kwargs: Any) -> Any:
+        call = getattr(_local, "call", False)
+        profile = _profile
+        if call is not False or profile is None:
+            # Made by printy itself, it's part of the call that made it
+            result = function(*args, **kwargs)
+            if isinstance(call, _Call):
+                call.bytes_out += _size(result)
+            return result
+
+        profile.calls += 1
+        if profile.calls % profile.every:
+            _local.call = None
+            try:
+                return function(*args, **kwargs)
+            finally:
+                del _local.call
+
+        site = _get_call_site()
+        call = _local.call = _Call()
+        memory = 0
+        if profile.allocations:
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        result = None
+        start = perf_counter()
+        try:
+            result = function(*args, **kwargs)
+            return result
+        finally:
+            # The calls that fail are counted too
+            seconds = perf_counter() - start
+            del _local.call
+            peak_memory = 0
+            if profile.allocations:
+                peak_memory = tracemalloc.get_traced_memory()[1] - memory
+            # The texts returned, or the ones written by the calls made by it
+            bytes_out = call.bytes_out if result is None else _size(result)
+            with _lock:
+                stats = _sites.setdefault(site, [0, 0.0, 0, 0])
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] += bytes_out
+                stats[3] = max(stats[3], peak_memory)
+
+    return _function
+
+
+def _counted(function: Callable[..., Iterator[str]]) -> Callable[..., Iterator[str]]:
+    """Returns a generator of printy, counting the bytes of the chunks it yields"""
+
+    @wraps(function)
+    def _function(*args: Any, **kwargs: Any) -> Iterator[str]:
+        for chunk in function(*args, **kwargs):
+            call = getattr(_local, "call", None)
+            if isinstance(call, _Call):
+                call.bytes_out += _size(chunk)
+            yield chunk
+
+    return _function
+
+
+def enable(every: int = 1, allocations: bool = True, at_exit: bool = False) -> None:
+    """
+    Starts profiling a call every 'every' calls, with the peak of memory
+    allocated by them if 'allocations' is True (with tracemalloc, which makes
+    every allocation slower while enabled). If 'at_exit' is True, the report
+    is written to stderr at exit.
+
+    If already enabled, it's enabled again with these values. The stats of
+    the calls profiled so far are kept until reset.
+    """
+    global _profile, _started_tracemalloc, _registered_at_exit
+    if every < 1:
+        raise ValueError("every must be 1 or greater")
+    if allocations and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracemalloc = True
+    _profile = _Profile(every, allocations)
+    if at_exit and not _registered_at_exit:
+        atexit.register(_write_report)
+        _registered_at_exit = True
+    if _originals:
+        return
+    for name, replace in (
+        ("format", _profiled),
+        ("get_formatted_text", _profiled),
+        ("format_many", _profiled),
+        ("get_formatted_texts", _profiled),
+        ("fmt", _profiled),
+        ("iter_formatted", _counted),
+        ("stream", _counted),
+    ):
+        original = vars(Printy)[name]
+        _originals.append((Printy, name, original))
+        setattr(Printy, name, replace(original))
+    _bind_instance_methods()
+
+
+def enable_from_environment() -> None:
+    """
+    Enables the profiler if the environment variable is set to the number of
+    calls per sample, writing the report at exit. Any other value, 0 included,
+    leaves it disabled
+    """
+    value = os.environ.get(environment_variable, "")
+    if value.isdigit() and int(value):
+        enable(int(value), at_exit=True)
+
+
+def disable() -> None:
+    """Stops profiling the calls, keeping the stats profiled so far"""
+    global _profile, _started_tracemalloc
+    _profile = None
+    while _originals:
+        owner, name, original = _originals.pop()
+        setattr(owner, name, original)
+    _bind_instance_methods()
+    if _started_tracemalloc:
+        tracemalloc.stop()
+        _started_tracemalloc = False
+
+
+def reset() -> None:
+    """Removes the stats of the calls profiled so far"""
+    with _lock:
+        _sites.clear()
+    if _profile is not None:
+        _profile.calls = 0
+
+
+def get_call_sites(sort: str = "seconds") -> list[CallSite]:
+    """
+    Returns the stats of each line that called printy, from the highest to
+    the lowest value of 'sort' (seconds, calls, bytes_out or peak_memory)
+    """
+    if sort not in ("seconds", "calls", "bytes_out", "peak_memory"):
+        raise ValueError("Can't sort the call sites by %r" % sort)
+    with _lock:
+        sites = [CallSite(*site, *stats) for site, stats in _sites.items()]
+    return sorted(sites, key=lambda site: getattr(site, sort), reverse=True)
+
+
+def _format_size(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return "%.1f %s" % (size, unit) if unit != "B" else "%d B" % size
+        size /= 1024
+    return "%.1f GB" % size
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds >= 1:
+        return "%.2f s" % seconds
+    if seconds >= 1e-3:
+        return "%.2f ms" % (seconds * 1e3)
+    return "%.2f us" % (seconds * 1e6)
+
+
+def report(limit: int | None = 20, sort: str = "seconds") -> str:
+    """
+    Returns a report of the first 'limit' lines that called printy (all of
+    them if None), sorted by 'sort' (see 'get_call_sites')
+    """
+    sites = get_call_sites(sort)
+    lines = [
+        "%5s %10s %10s %11s %12s  %s"
+        % ("calls", "seconds", "per call", "bytes out", "peak memory", "call site")
+    ]
+    for site in sites[:limit]:
+        lines.append(
+            "%5d %10.6f %10s %11s %12s  %s:%d (%s)"
+            % (
+                site.calls,
+                site.seconds,
+                _format_seconds(site.seconds / site.calls),
+                _format_size(site.bytes_out),
+                _format_size(site.peak_memory),
+                site.filename,
+                site.lineno,
+                site.function,
+            )
+        )
+    if len(sites) > len(lines) - 1:
+        lines.append("... %d more call sites" % (len(sites) - len(lines) + 1))
+    return "\n".join(lines)
+
+
+def _write_report() -> None:
+    """Writes the report to stderr, if anything was profiled"""
+    if get_call_sites():
+        sys.stderr.write("printy profile\n%s\n" % report())
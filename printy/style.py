@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from typing import Any
+
+from .flags import PREFIX_CACHE_SIZE, Flags, dependent_caches
+
+# The styles already created, by the flags they were created with, so the
+# same flags always give the same (already checked) style
+_styles: dict[str, Style] = {}
+
+# Flags added or changed at runtime may change them
+dependent_caches.append(_styles.clear)
+
+
+class Style(str):
+    """
+    A set of flags checked once, when it's created, so any invalid flag raises
+    an InvalidFlag right away instead of when a text is printed, i.e.
+    >>> error = Style('rB')
+    >>> printy.printy('Something failed', error)
+    >>> printy.printy('[c]Connected@', predefined=Style('{y}') + 'U')
+
+    It's a str with the flags (so it can be passed as the flags of any
+    function of printy, and inside the inline formats as '[%s]' % style),
+    with the foreground color first, then the formats and then the
+    background, i.e. Style('B{y}r') == 'rB{y}'. Joining ('|') a style with
+    another one or with some flags gives the style with both, with the colors
+    of the one on the right, if any. Adding ('+') two styles does the same,
+    but adding a style and a plain str joins their text, as for any str, i.e.
+    '[%s]' % style == '[' + style + ']'.
+
+    Styles are immutable, and the same flags always give the same object,
+    whose ansi code ('prefix') is already resolved.
+    """
+
+    # The flags of each part of the style, i.e. 'r', ('B', 'U') and 'y'
+    foreground: str
+    formats: tuple[str, ...]
+    background: str
+    # The ansi code that sets the style
+    prefix: str
+
+    def __new__(cls, flags: str = "") -> Style:
+        style = _styles.get(flags)
+        if style is not None:
+            return style
+        # Any invalid flag raises an InvalidFlag
+        Flags.get_prefix(flags)
+        # The foreground, the formats and the background
+        parts: tuple[list[str], list[str], list[str]] = ([], [], [])
+        cls._add_flags(flags, parts, False)
+        foreground, formats, background = parts
+        style = _styles[flags] = cls._create(
+            foreground[-1] if foreground else "",
+            tuple(formats),
+            background[-1] if background else "",
+        )
+        return style
+
+    @staticmethod
+    def _add_flags(
+        flags: str, parts: tuple[list[str], list[str], list[str]], as_background: bool
+    ) -> None:
+        """
+        Adds each (valid) flag to its part of the style, the aliases (see
+        'printy.themes') are replaced by their flags, so changing them later
+        doesn't change the style
+        """
+        table = Flags.get_flag_table()
+        background, labels = Flags.split_flags(flags)
+        if background:
+            Style._add_flags(background, parts, True)
+        for label in labels:
+            values = table.get(label)
+            if values is None and label in Flags.aliases:
+                Style._add_flags(Flags.aliases[label], parts, as_background)
+            elif values is not None and values[0] == values[1]:
+                # Only formats have the same code for both
+                if label not in parts[1]:
+                    parts[1].append(label)
+            else:
+                # As in a terminal, the last color (truecolors included) is
+                # the one that's applied
+                parts[2 if as_background else 0].append(label)
+
+    @classmethod
+    def _create(
+        cls, foreground: str, formats: tuple[str, ...], background: str
+    ) -> Style:
+        """Returns the style with these parts, created only the first time"""
+        value = (
+            foreground + "".join(formats) + ("{%s}" % background if background else "")
+        )
+        style = _styles.get(value)
+        if style is None:
+            if len(_styles) >= PREFIX_CACHE_SIZE:
+                _styles.clear()
+            style = _styles[value] = str.__new__(cls, value)
+            # Set without '__setattr__', which doesn't allow it
+            for name, attribute in (
+                ("foreground", foreground),
+                ("formats", formats),
+                ("background", background),
+                ("prefix", Flags.get_prefix(value) if value else ""),
+            ):
+                object.__setattr__(style, name, attribute)
+        return style
+
+    def __or__(self, other: str) -> Style:
+        if not isinstance(other, str):
+            return NotImplemented
+        other = Style(other)
+        return self._create(
+            other.foreground or self.foreground,
+            self.formats + tuple(f for f in other.formats if f not in self.formats),
+            other.background or self.background,
+        )
+
+    def __ror__(self, other: str) -> Style:
+        if not isinstance(other, str):
+            return NotImplemented
+        return Style(other) | self
+
+    def __add__(self, other: str) -> Any:
+        if isinstance(other, Style):
+            return self | other
+        return str.__add__(self, other)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Style objects are immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Style objects are immutable")
+
+    def __reduce__(self) -> tuple[type[Style], tuple[str]]:
+        return Style, (str(self),)
+
+    def __repr__(self) -> str:
+        return "Style(%s)" % str.__repr__(self)
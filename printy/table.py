@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import sys
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import islice
+from typing import Any
+
+from .core import Printy
+from .flags import Flags
+from .widths import get_char_width, get_text_width
+
+# Number of rows whose cells give the width of the columns, unless given
+default_sample_size = 100
+
+# Max number of different cells whose formatted text is kept, so the same
+# values (i.e. a status column) are parsed only once
+cell_cache_size = 4096
+
+# Number of lines written at once by 'Table.print'
+default_lines_per_write = 1000
+
+# Added at the end of the cells cut to the width of their column
+ellipsis = "…"
+
+alignments = ("<", ">", "^")
+
+# A cell of the table: its formatted text, the number of cells of the
+# terminal it takes (see 'printy.widths'), and its sections of (text, flags)
+_Cell = tuple[str, int, list[tuple[str, str]]]
+
+
+class Table:
+    """
+    Renders rows of values as a table, whose cells can have inline formats,
+    like printy() does, i.e.
+    >>> table = Table(['Name', 'Status'], align=['<', '^'])
+    >>> table.print([['api', '[n]up@'], ['db', '[r]down@']])
+
+    Each cell is parsed once, which gives both its formatted text and the
+    number of cells of the terminal it takes (wide characters take two, see
+    'printy.widths'), used to pad it to the width of its column.
+    The formatted text of the last 'cell_cache_size' different cells is kept,
+    so repeated values are parsed only once.
+
+    The width of the columns is given by 'widths', or is the widest cell of
+    the header and the first 'sample_size' rows (all of them if None). Only
+    those rows are kept in memory, the rest are rendered one by one, so huge
+    tables use a constant amount of memory. Cells wider than their column
+    are cut, ending with an ellipsis.
+
+    The header ('columns') has the 'header_flags' unless its cells have their
+    own, and 'align' has the alignment of each column, either '<' (left), '>'
+    (right) or '^' (center), left by default.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[Any] | None = None,
+        widths: Sequence[int] | None = None,
+        align: Sequence[str] | None = None,
+        sample_size: int | None = default_sample_size,
+        separator: str = "  ",
+        header_flags: str = "B",
+        printy: Printy | None = None,
+    ) -> None:
+        if widths is not None and columns is not None and len(widths) != len(columns):
+            raise ValueError("There must be a width for each column")
+        if widths is not None and any(width < 1 for width in widths):
+            raise ValueError("The widths must be 1 or greater")
+        for alignment in align or ():
+            if alignment not in alignments:
+                raise ValueError(
+                    "'%s' is not a valid alignment, use one of %s"
+                    % (alignment, ", ".join(alignments))
+                )
+        self.columns = columns
+        self.widths = widths
+        self.align = align or ()
+        self.sample_size = sample_size
+        self.separator = separator
+        self.header_flags = header_flags
+        self.printy = printy if printy is not None else Printy()
+
+        # The parsed cells, if they were formatted with the ansi codes, and
+        # the lookup table of the flags they were formatted with, which is
+        # built again when the flags change (see 'printy.themes')
+        self._cells: dict[str, _Cell] = {}
+        self._cells_color = True
+        self._cells_flags = Flags.get_flag_table()
+
+    @staticmethod
+    def _join(sections: list[tuple[str, str]], color: bool) -> str:
+        """Formats the sections of a cell"""
+        if color:
+            return Printy._join_sections(sections)
+        for _, flags in sections:
+            # The flags must be valid even if they're not used
+            if flags:
+                Flags.get_prefix(flags)
+        return "".join(text for text, _ in sections)
+
+    def _parse_cell(self, value: Any, predefined: str, color: bool) -> _Cell:
+        """Parses a cell, the sections with no flags take the 'predefined' ones"""
+        # The str subclasses too, as printy() shows them as str() gives them
+        if type(value) is not str:
+            value = self.printy._repr_value(value, pretty=False)
+        sections = [
+            (text, flags or predefined)
+            for text, flags in self.printy._tokenize(value, unescape=True)
+        ]
+        width = sum(get_text_width(text) for text, _ in sections)
+        return self._join(sections, color), width, sections
+
+    def _get_cells(self, row: Iterable[Any], color: bool) -> list[_Cell]:
+        """Returns the parsed cells of a row, parsing only the new ones"""
+        cells = self._cells
+        flag_table = Flags.get_flag_table()
+        if color != self._cells_color or flag_table is not self._cells_flags:
+            cells.clear()
+            self._cells_color = color
+            self._cells_flags = flag_table
+        parsed: list[_Cell] = []
+        for value in row:
+            key = value if type(value) is str else None
+            cell = cells.get(key) if key is not None else None
+            if cell is None:
+                cell = self._parse_cell(value, "", color)
+                if key is not None:
+                    if len(cells) >= cell_cache_size:
+                        cells.clear()
+                    cells[key] = cell
+            parsed.append(cell)
+        return parsed
+
+    def _cut(self, cell: _Cell, width: int, color: bool) -> _Cell:
+        """Returns the cell cut to 'width' cells, ending with an ellipsis"""
+        sections: list[tuple[str, str]] = []
+        left = width - get_text_width(ellipsis)
+        for text, flags in cell[2]:
+            text_width = get_text_width(text)
+            if text_width >= left:
+                # A wide character that doesn't fit is left out
+                end = 0
+                while end < len(text) and get_char_width(text[end]) <= left:
+                    left -= get_char_width(text[end])
+                    end += 1
+                sections.append((text[:end] + ellipsis, flags))
+                break
+            sections.append((text, flags))
+            left -= text_width
+        return self._join(sections, color), width - left, sections
+
+    def _get_line(self, cells: list[_Cell], widths: Sequence[int], color: bool) -> str:
+        """Pads (or cuts) the cells to the width of their columns"""
+        if len(cells) > len(widths):
+            raise ValueError(
+                "A row has %d cells, but the table has %d columns"
+                % (len(cells), len(widths))
+            )
+        # The missing cells at the end of the row are not padded either
+        last = len(cells) - 1
+        pieces: list[str] = []
+        for index, cell in enumerate(cells):
+            text, size, _ = cell
+            width = widths[index]
+            if size > width:
+                text, size, _ = self._cut(cell, width, color)
+            alignment = self.align[index] if index < len(self.align) else "<"
+            padding = width - size
+            if alignment == ">":
+                pieces.append(" " * padding + text)
+            elif alignment == "^":
+                pieces.append(" " * (padding // 2) + text)
+                if index != last:
+                    pieces.append(" " * (padding - padding // 2))
+            else:
+                pieces.append(text)
+                # The last column is not padded
+                if index != last:
+                    pieces.append(" " * padding)
+            if index != last:
+                pieces.append(self.separator)
+        return "".join(pieces)
+
+    def iter_lines(
+        self, rows: Iterable[Iterable[Any]], color: bool | None = None
+    ) -> Iterator[str]:
+        """
+        Yields each line of the table, the header first, if any. 'color'
+        forces (or disables) the ansi codes, by default they're added unless
+        disabled for the instance of printy (see 'Printy.supports_color')
+        """
+        color = self.printy.supports_color() if color is None else color
+        rows = iter(rows)
+        header = None
+        if self.columns is not None:
+            header = [
+                self._parse_cell(c, self.header_flags, color) for c in self.columns
+            ]
+
+        widths = self.widths
+        sampled: list[list[_Cell]] = []
+        if widths is None:
+            sampled = [
+                self._get_cells(row, color) for row in islice(rows, self.sample_size)
+            ]
+            # With a header, it has all the columns, otherwise the longest row
+            count = max(map(len, sampled), default=0) if header is None else len(header)
+            measured = [0] * count
+            for cells in [header, *sampled] if header is not None else sampled:
+                for index, cell in enumerate(cells[:count]):
+                    measured[index] = max(measured[index], cell[1])
+            widths = measured
+
+        if header is not None:
+            yield self._get_line(header, widths, color)
+        for cells in sampled:
+            yield self._get_line(cells, widths, color)
+        # The sampled rows are not needed anymore
+        del sampled
+        for row in rows:
+            yield self._get_line(self._get_cells(row, color), widths, color)
+
+    def render(self, rows: Iterable[Iterable[Any]], color: bool | None = None) -> str:
+        """Returns the whole table, with a line for each row"""
+        return "\n".join(self.iter_lines(rows, color))
+
+    def print(
+        self,
+        rows: Iterable[Iterable[Any]],
+        lines_per_write: int = default_lines_per_write,
+    ) -> None:
+        """
+        Prints out the table, writing 'lines_per_write' lines at once, with
+        the ansi codes only if the stdout supports them
+        """
+        lines: list[str] = []
+        color = self.printy.supports_color(sys.stdout)
+        for line in self.iter_lines(rows, color):
+            lines.append(line)
+            if len(lines) >= lines_per_write:
+                print("\n".join(lines))
+                lines.clear()
+        if lines:
+            print("\n".join(lines))
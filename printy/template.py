@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import sys
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .core import Printy
+
+
+class Template:
+    """
+    A printy format that has already been parsed, with every flag resolved
+    to its ansi code, so rendering it only substitutes the values.
+
+    The values are replaced with the str.format() syntax, like
+    >>> template = printy.compile('[rB]{level}@ [c]{msg}@')
+    >>> template.print(level='ERROR', msg='Something went wrong')
+
+    Being substituted after the parsing, the values are never treated as
+    inline formats, and literal braces in the format must be doubled: {{ }}
+
+    Like printy() does, 'print' writes the text without the ansi codes
+    ('plain') if the instance of printy doesn't add them to the stdout (see
+    'Printy.supports_color'), i.e. when it's piped or NO_COLOR is set.
+    """
+
+    __slots__ = ("formatted", "end", "plain", "printy")
+
+    def __init__(
+        self,
+        formatted: str,
+        end: str = "\n",
+        plain: str | None = None,
+        printy: Printy | None = None,
+    ) -> None:
+        # The text with the ansi escape sequences already applied, and without
+        self.formatted = formatted
+        self.end = end
+        self.plain = formatted if plain is None else plain
+        self.printy = printy
+
+    def render(self, *args: Any, **kwargs: Any) -> str:
+        """Returns the formatted text with the values replaced"""
+        return self.formatted.format(*args, **kwargs)
+
+    def print(self, *args: Any, **kwargs: Any) -> None:
+        """Prints out the formatted text with the values replaced"""
+        formatted = self.formatted
+        if self.printy is not None and not self.printy.supports_color(sys.stdout):
+            formatted = self.plain
+        print(formatted.format(*args, **kwargs), end=self.end)
+
+    def __repr__(self) -> str:
+        return "Template(%r)" % self.formatted
@@ -0,0 +1,153 @@
+"""
+Flags added at runtime: colors, aliases of other flags, and themes, which are
+sets of aliases that can be switched all at once, i.e.
+
+>>> printy.add_flag('a', 214)  # an amber color, from the 256 color palette
+>>> printy.add_alias('E', 'rB')
+>>> printy.add_theme('light', {'E': '<rB', 'W': '<o'})
+>>> printy.add_theme('dark', {'E': 'r>B', 'W': 'o>'})
+>>> printy.use_theme('dark')
+>>> printy.printy('[E]Failed@, [W]retrying@ in [a]5s@')
+
+A flag is a letter, with a '<' before it or a '>' after it if it's a dark or
+a light variant, and the ones of printy can't be replaced. The aliases of the
+theme in use replace the ones added with 'add_alias'.
+
+Changes are checked before they're applied, so an invalid flag in an alias
+(or an alias that uses itself) raises an InvalidFlag and changes nothing.
+Applying them replaces the flags of 'Flags' at once and empties every cache
+that depends on them, so their lookup tables are built again, only once.
+Styles created before keep the flags the aliases had (see 'printy.style').
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections.abc import Mapping
+
+from .flags import Flags
+
+# A letter, or its dark ('<' before it) or light ('>' after it) variant
+label_regex = re.compile(r"<?[a-zA-Z]|[a-zA-Z]>")
+
+# The colors and the aliases added, by flag, the themes, by name, and the
+# theme in use
+_colors: dict[str, str] = {}
+_aliases: dict[str, str] = {}
+_themes: dict[str, dict[str, str]] = {}
+_theme: str | None = None
+
+# Changes from many threads are applied one at a time
+_lock = threading.Lock()
+
+
+def _check_label(label: str) -> None:
+    if not isinstance(label, str) or label_regex.fullmatch(label) is None:
+        raise ValueError(
+            "'%s' is not a valid flag, it must be a letter, with an optional "
+            "'<' before it or '>' after it" % label
+        )
+    if label in Flags.get_flags():
+        raise ValueError("'%s' is a flag of printy, it can't be replaced" % label)
+
+
+def _apply(
+    colors: dict[str, str],
+    aliases: dict[str, str],
+    themes: dict[str, dict[str, str]],
+    theme: str | None,
+) -> None:
+    """
+    Checks the flags on a subclass of 'Flags', and only if they're valid,
+    replaces the ones of 'Flags' with them. Must be called with the lock
+    """
+    global _colors, _aliases, _themes, _theme
+    all_aliases = {**aliases, **themes[theme]} if theme is not None else aliases
+    for label in all_aliases:
+        if label in colors:
+            raise ValueError("'%s' is already a color, it can't be an alias" % label)
+
+    # The table of the flags of printy and the new colors, as 'get_flags'
+    # only finds the flags of the class itself, not the ones of 'Flags'
+    flag_table = {
+        flag: values
+        for flag, values in Flags.get_flag_table().items()
+        if flag not in Flags.custom_colors
+    }
+    for label, color in colors.items():
+        flag_table[label] = (
+            Flags.start_foreground + color,
+            Flags.start_background + color,
+        )
+
+    class Checked(Flags):
+        custom_colors = colors
+        aliases = all_aliases
+        _flag_table = flag_table
+
+    # Any invalid flag raises an InvalidFlag
+    Checked.get_alias_table()
+
+    _colors, _aliases, _themes, _theme = colors, aliases, themes, theme
+    Flags.custom_colors = colors
+    Flags.aliases = all_aliases
+    Flags.cache_clear()
+
+
+def add_flag(label: str, color: int) -> None:
+    """
+    Adds a color flag, given as its number in the 256 color palette, or
+    replaces the color or the alias with that flag
+    """
+    _check_label(label)
+    if not isinstance(color, int) or not 0 <= color <= 255:
+        raise ValueError("The color must be a number from 0 to 255")
+    with _lock:
+        aliases = {k: v for k, v in _aliases.items() if k != label}
+        _apply({**_colors, label: str(color)}, aliases, _themes, _theme)
+
+
+def add_alias(label: str, flags: str) -> None:
+    """
+    Adds a flag that's the same as some others, i.e. add_alias('E', 'rB'), or
+    replaces the color or the alias with that flag
+    """
+    _check_label(label)
+    with _lock:
+        colors = {k: v for k, v in _colors.items() if k != label}
+        _apply(colors, {**_aliases, label: flags}, _themes, _theme)
+
+
+def remove_flag(label: str) -> None:
+    """Removes a color or an alias added before"""
+    with _lock:
+        if label not in _colors and label not in _aliases:
+            raise ValueError("'%s' is not a flag added before" % label)
+        colors = {k: v for k, v in _colors.items() if k != label}
+        aliases = {k: v for k, v in _aliases.items() if k != label}
+        _apply(colors, aliases, _themes, _theme)
+
+
+def add_theme(name: str, flags: Mapping[str, str]) -> None:
+    """
+    Adds a theme with these aliases, by flag, or replaces the one with that
+    name, which is applied right away if it's the one in use
+    """
+    for label in flags:
+        _check_label(label)
+    with _lock:
+        _apply(_colors, _aliases, {**_themes, name: dict(flags)}, _theme)
+
+
+def use_theme(name: str | None) -> None:
+    """Switches to the theme with that name, or to none of them if None"""
+    with _lock:
+        if name is not None and name not in _themes:
+            raise ValueError("There's no theme '%s'" % name)
+        _apply(_colors, _aliases, _themes, name)
+
+
+def get_theme() -> str | None:
+    """Returns the name of the theme in use, if any"""
+    return _theme
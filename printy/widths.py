@@ -0,0 +1,92 @@
+"""
+The number of cells of the terminal that a text takes once printed, i.e. to
+align texts with inline formats, which don't take any, and with characters
+that take two cells (East Asian wide ones, like '漢') or none (combining
+accents, zero width spaces and joiners)
+
+>>> printy.width('[rB]漢字@ ok')
+7
+>>> printy.ljust('[r]error@', 8) + '|'
+'[r]error@   |'
+"""
+
+from __future__ import annotations
+
+import unicodedata
+from functools import lru_cache
+
+from .core import Printy
+
+# Max number of different texts whose width is kept
+width_cache_size = 1024
+
+# Longer texts are measured every time, so the cache never keeps big ones
+max_cached_length = 256
+
+# Categories of the characters that take no cells: combining marks, format
+# characters (like the zero width joiner) and control characters
+zero_width_categories = {"Mn", "Me", "Cf", "Cc"}
+
+
+@lru_cache(maxsize=4096)
+def get_char_width(char: str) -> int:
+    """Returns the number of cells a character takes: 0, 1 or 2"""
+    if unicodedata.category(char) in zero_width_categories:
+        return 0
+    if unicodedata.east_asian_width(char) in ("W", "F"):
+        return 2
+    return 1
+
+
+def get_text_width(text: str) -> int:
+    """Returns the number of cells a text with no inline formats takes"""
+    if text.isascii():
+        return len(text)
+    return sum(map(get_char_width, text))
+
+
+@lru_cache(maxsize=width_cache_size)
+def _get_cached_width(text: str) -> int:
+    return sum(
+        get_text_width(section_text)
+        for section_text, _ in Printy._tokenize(text, unescape=True)
+    )
+
+
+def get_width(text: str) -> int:
+    """
+    Returns the number of cells the text takes once printed, counting the
+    text of each section of the inline formats, without removing them
+    """
+    if Printy.special_chars_regex.search(text) is None:
+        return get_text_width(text)
+    if len(text) > max_cached_length:
+        return _get_cached_width.__wrapped__(text)
+    return _get_cached_width(text)
+
+
+def _get_padding(text: str, width: int, fillchar: str) -> tuple[str, int]:
+    """Returns the fill character, escaped, and the number of them needed"""
+    if get_text_width(fillchar) != 1:
+        raise TypeError("The fill character must take exactly one cell")
+    if fillchar in Printy.special_chars:
+        fillchar = "\\" + fillchar
+    return fillchar, max(width - get_width(text), 0)
+
+
+def ljust(text: str, width: int, fillchar: str = " ") -> str:
+    """Pads the text on the right, until it takes 'width' cells once printed"""
+    fillchar, padding = _get_padding(text, width, fillchar)
+    return text + fillchar * padding
+
+
+def rjust(text: str, width: int, fillchar: str = " ") -> str:
+    """Pads the text on the left, until it takes 'width' cells once printed"""
+    fillchar, padding = _get_padding(text, width, fillchar)
+    return fillchar * padding + text
+
+
+def center(text: str, width: int, fillchar: str = " ") -> str:
+    """Pads the text on both sides, until it takes 'width' cells once printed"""
+    fillchar, padding = _get_padding(text, width, fillchar)
+    return fillchar * (padding // 2) + text + fillchar * (padding - padding // 2)
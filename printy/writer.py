@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import atexit
+import io
+import sys
+import threading
+import time
+import weakref
+from collections import deque
+from types import TracebackType
+from typing import IO, Any
+
+from .core import Printy
+
+# Max number of characters kept in the buffer before writing them
+default_buffer_size = 64 * 1024
+
+# Max number of messages waiting to be written by the background thread
+default_queue_size = 10000
+
+# The async writers not closed yet, closed when the interpreter exits. It
+# keeps weak references, so it's not one more strong reference to them (their
+# thread keeps them alive until they're closed anyway)
+_open_writers: weakref.WeakSet[AsyncPrintyWriter] = weakref.WeakSet()
+
+
+def _close_writers() -> None:
+    """Writes the pending messages of the async writers still open"""
+    for writer in list(_open_writers):
+        writer.close()
+
+
+atexit.register(_close_writers)
+
+
+class PrintyWriter:
+    """
+    Writes the formatted text to a stream, keeping it in a buffer instead of
+    writing it on every call, so a lot of lines can be printed with a few
+    writes. The buffer is flushed when it gets more than 'buffer_size'
+    characters, when 'flush_interval' seconds have passed since the last
+    flush (checked on each write), when flush() is called, or when the
+    writer is closed.
+
+    >>> with PrintyWriter(sys.stderr) as writer:
+    ...     for i in range(1000):
+    ...         writer.format('[n]Done@ %d' % i)
+
+    The stream can be a text stream (stdout by default) or a binary one, in
+    which case the text is encoded with 'encoding'.
+
+    Whether the ansi codes are added is checked once for the stream (see
+    'Printy.supports_color'), unless 'color' forces or disables them.
+    """
+
+    def __init__(
+        self,
+        stream: IO[Any] | None = None,
+        buffer_size: int = default_buffer_size,
+        flush_interval: float | None = None,
+        encoding: str = "utf-8",
+        printy: Printy | None = None,
+        color: bool | None = None,
+    ) -> None:
+        self.stream: IO[Any] = stream if stream is not None else sys.stdout
+        self.binary = isinstance(self.stream, (io.RawIOBase, io.BufferedIOBase))
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.encoding = encoding
+        self.printy = printy if printy is not None else Printy()
+        self.color = self.printy.supports_color(self.stream) if color is None else color
+        self.closed = False
+
+        self._buffer: list[str] = []
+        self._buffered = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> None:
+        """Adds text (already formatted) to the buffer"""
+        if self.closed:
+            raise ValueError("I/O operation on closed PrintyWriter")
+        with self._lock:
+            self._buffer.append(text)
+            self._buffered += len(text)
+            if self._buffered >= self.buffer_size or (
+                self.flush_interval is not None
+                and time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self._flush()
+
+    def format(
+        self,
+        value: Any = "",
+        flags: str = "",
+        predefined: str = "",
+        end: str = "\n",
+        pretty: bool = True,
+        indentation: int = 4,
+    ) -> None:
+        """Formats the value like printy() does, and adds it to the buffer"""
+        self.write(
+            self.printy.get_formatted_text(
+                value, flags, predefined, pretty, indentation, color=self.color
+            )
+            + end
+        )
+
+    def _flush(self) -> None:
+        """Writes the buffer to the stream, must be called with the lock"""
+        if self._buffer:
+            text = "".join(self._buffer)
+            self._buffer.clear()
+            self._buffered = 0
+            if self.binary:
+                self.stream.write(text.encode(self.encoding))
+            else:
+                self.stream.write(text)
+            self.stream.flush()
+        self._last_flush = time.monotonic()
+
+    def flush(self) -> None:
+        """Writes everything in the buffer to the stream"""
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        """Flushes the buffer, the stream is not closed"""
+        if not self.closed:
+            self.flush()
+            self.closed = True
+
+    def __enter__(self) -> PrintyWriter:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class AsyncPrintyWriter(PrintyWriter):
+    """
+    A PrintyWriter that writes in a background thread, so a slow terminal or
+    a full pipe never blocks the caller, which only adds the message to a
+    bounded queue. The thread takes all the queued messages at once and
+    writes them with a single write.
+
+    When the queue is full, 'overflow' decides what to do:
+        - 'block': waits until there is room in the queue
+        - 'drop_oldest': removes the oldest message in the queue
+        - 'drop_newest': discards the new message
+    Discarded messages are counted in 'dropped'.
+
+    If 'format_in_thread' is True, the values given to format() are also
+    formatted in the background thread, so they should not be modified
+    after passing them.
+
+    The pending messages are written when the writer is closed, which
+    happens at the latest when the interpreter exits.
+    """
+
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    overflow_policies = [BLOCK, DROP_OLDEST, DROP_NEWEST]
+
+    def __init__(
+        self,
+        stream: IO[Any] | None = None,
+        max_queue_size: int = default_queue_size,
+        overflow: str = BLOCK,
+        format_in_thread: bool = False,
+        buffer_size: int = default_buffer_size,
+        flush_interval: float | None = None,
+        encoding: str = "utf-8",
+        printy: Printy | None = None,
+        color: bool | None = None,
+    ) -> None:
+        if overflow not in self.overflow_policies:
+            raise ValueError(
+                "'%s' is not a valid overflow policy, use one of %s"
+                % (overflow, ", ".join(self.overflow_policies))
+            )
+        # With no room at all, the 'block' policy would wait forever
+        if max_queue_size < 1:
+            raise ValueError("max_queue_size must be 1 or greater")
+        super().__init__(stream, buffer_size, flush_interval, encoding, printy, color)
+        self.max_queue_size = max_queue_size
+        self.overflow = overflow
+        self.format_in_thread = format_in_thread
+        # Number of discarded messages, and of messages that couldn't be written
+        self.dropped = 0
+        self.errors = 0
+
+        self._queue: deque[str | tuple[Any, ...]] = deque()
+        # Messages queued but not written yet
+        self._unfinished = 0
+        self._closing = False
+        self._queue_lock = threading.Lock()
+        self._not_empty = threading.Condition(self._queue_lock)
+        self._not_full = threading.Condition(self._queue_lock)
+        self._all_written = threading.Condition(self._queue_lock)
+
+        self._thread = threading.Thread(
+            target=self._run, name="printy-writer", daemon=True
+        )
+        self._thread.start()
+        _open_writers.add(self)
+
+    def _put(self, message: str | tuple[Any, ...]) -> None:
+        """Adds the message to the queue, following the overflow policy"""
+        with self._queue_lock:
+            while True:
+                if self._closing:
+                    raise ValueError("I/O operation on closed PrintyWriter")
+                if len(self._queue) < self.max_queue_size:
+                    break
+                if self.overflow == self.DROP_NEWEST:
+                    self.dropped += 1
+                    return
+                if self.overflow == self.DROP_OLDEST:
+                    self._queue.popleft()
+                    self._unfinished -= 1
+                    self.dropped += 1
+                    break
+                self._not_full.wait()
+            self._queue.append(message)
+            self._unfinished += 1
+            self._not_empty.notify()
+
+    def write(self, text: str) -> None:
+        """Queues text (already formatted) to be written"""
+        self._put(text)
+
+    def format(
+        self,
+        value: Any = "",
+        flags: str = "",
+        predefined: str = "",
+        end: str = "\n",
+        pretty: bool = True,
+        indentation: int = 4,
+    ) -> None:
+        """Formats the value like printy() does, and queues it to be written"""
+        if self.format_in_thread:
+            self._put((value, flags, predefined, end, pretty, indentation))
+        else:
+            super().format(value, flags, predefined, end, pretty, indentation)
+
+    def _run(self) -> None:
+        """Writes the queued messages, until the writer is closed"""
+        while True:
+            with self._queue_lock:
+                while not self._queue and not self._closing:
+                    self._not_empty.wait()
+                messages = list(self._queue)
+                self._queue.clear()
+                self._not_full.notify_all()
+                closing = self._closing
+
+            for message in messages:
+                try:
+                    if not isinstance(message, str):
+                        value, flags, predefined, end, pretty, indentation = message
+                        message = (
+                            self.printy.get_formatted_text(
+                                value,
+                                flags,
+                                predefined,
+                                pretty,
+                                indentation,
+                                color=self.color,
+                            )
+                            + end
+                        )
+                    PrintyWriter.write(self, message)
+                except Exception:
+                    self.errors += 1
+            try:
+                PrintyWriter.flush(self)
+            except Exception:
+                self.errors += 1
+
+            with self._queue_lock:
+                self._unfinished -= len(messages)
+                self._all_written.notify_all()
+
+            if closing:
+                return
+
+    def flush(self) -> None:
+        """Waits until all the queued messages are written"""
+        with self._queue_lock:
+            while self._unfinished > 0 and self._thread.is_alive():
+                self._all_written.wait()
+
+    def close(self, timeout: float | None = None) -> None:
+        """
+        Writes the pending messages and stops the background thread, waiting
+        at most 'timeout' seconds for it
+        """
+        if self.closed:
+            return
+        with self._queue_lock:
+            self._closing = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+        self._thread.join(timeout)
+        self.closed = True
+        _open_writers.discard(self)
@@ -0,0 +1,202 @@
+import os
+import unittest
+from unittest import mock
+
+import printy
+from printy import colors
+from printy.colors import (
+    TRUECOLOR,
+    cube_levels,
+    get_color_depth,
+    get_nearest_16,
+    get_nearest_256,
+    parse_color,
+)
+from printy.core import Printy
+from printy.exceptions import InvalidFlag
+from printy.flags import Flags, set_color_depth
+from printy.style import Style
+
+
+def get_256_color(index):
+    """The (red, green, blue) of a color of the cube or of the grays"""
+    if index >= 232:
+        return (8 + 10 * (index - 232),) * 3
+    index -= 16
+    return cube_levels[index // 36], cube_levels[index // 6 % 6], cube_levels[index % 6]
+
+
+def get_distance(a, b):
+    return sum((x - y) ** 2 for x, y in zip(a, b))
+
+
+class TestColors(unittest.TestCase):
+    """Test case for the truecolors and their nearest palette colors"""
+
+    def test_parse_color(self):
+        """Tests that the valid truecolors are parsed, and the rest are None"""
+        self.assertEqual(parse_color("#ff8800"), (255, 136, 0))
+        self.assertEqual(parse_color("#FF8800"), (255, 136, 0))
+        self.assertEqual(parse_color("rgb(255,136,0)"), (255, 136, 0))
+        for flag in ("#ff880", "#ff88000", "#gg8800", "rgb(256,0,0)", "rgb(1,2)", "r"):
+            with self.subTest(flag=flag):
+                self.assertIsNone(parse_color(flag))
+
+    def test_nearest_256(self):
+        """Tests that it's the same color a search through all of them finds"""
+        for rgb in [
+            (0, 0, 0),
+            (255, 255, 255),
+            (128, 128, 128),
+            (255, 136, 0),
+            (47, 48, 114),
+            (115, 95, 94),
+            (10, 200, 30),
+            (238, 238, 240),
+        ]:
+            with self.subTest(rgb=rgb):
+                nearest = min(
+                    range(16, 256),
+                    key=lambda index: get_distance(rgb, get_256_color(index)),
+                )
+                self.assertEqual(
+                    get_distance(rgb, get_256_color(get_nearest_256(*rgb))),
+                    get_distance(rgb, get_256_color(nearest)),
+                )
+        self.assertEqual(get_nearest_256(255, 136, 0), 208)
+        self.assertEqual(get_nearest_256(128, 128, 128), 244)
+
+    def test_nearest_16(self):
+        """Tests that the nearest of the 16 colors is found"""
+        self.assertEqual(get_nearest_16(0, 0, 0), 0)
+        self.assertEqual(get_nearest_16(250, 10, 10), 9)
+        self.assertEqual(get_nearest_16(255, 136, 0), 3)
+        self.assertEqual(get_nearest_16(120, 120, 130), 8)
+
+    def test_color_depth_from_environment(self):
+        """Tests the depth found for each environment"""
+        env = {"COLORTERM": "", "WT_SESSION": "", "TERM": "xterm-256color"}
+        for changes, depth in (
+            ({}, 256),
+            ({"COLORTERM": "truecolor"}, TRUECOLOR),
+            ({"COLORTERM": "24bit"}, TRUECOLOR),
+            ({"WT_SESSION": "1"}, TRUECOLOR),
+            ({"TERM": "linux"}, 16),
+        ):
+            with self.subTest(changes=changes):
+                with mock.patch.dict(os.environ, {**env, **changes}):
+                    self.assertEqual(get_color_depth(), depth)
+
+
+class TestTruecolorFlags(unittest.TestCase):
+    """Test case for the '#rrggbb' and 'rgb(r,g,b)' flags"""
+
+    def setUp(self):
+        set_color_depth(TRUECOLOR)
+        self.addCleanup(set_color_depth, None)
+
+    def test_split(self):
+        """Tests that the truecolors are split as single flags"""
+        self.assertEqual(
+            Flags.split_flags("#ff8800Brgb(1,2,3)r>{#000000}"),
+            ("#000000", ["#ff8800", "B", "rgb(1,2,3)", "r>"]),
+        )
+        self.assertEqual(
+            Flags.split_flags("rgb{rgb(0,0,0)}"), ("rgb(0,0,0)", ["r", "g", "b"])
+        )
+        self.assertEqual(Flags.split_flags("rgb(1,2,"), ("", ["rgb(1,2,"]))
+
+    def test_codes_for_each_depth(self):
+        """Tests the codes for the truecolors at each depth"""
+        flags = "#ff8800B{rgb(0,0,40)}"
+        self.assertEqual(Flags.get_prefix(flags), "\x1b[48;2;0;0;40;38;2;255;136;0;1m")
+        set_color_depth(256)
+        self.assertEqual(Flags.get_prefix(flags), "\x1b[48;5;233;38;5;208;1m")
+        set_color_depth(16)
+        self.assertEqual(Flags.get_prefix(flags), "\x1b[40;33;1m")
+        self.assertEqual(Flags.get_prefix("#ff0000{#ffffff}"), "\x1b[107;91m")
+
+        with mock.patch.dict(os.environ, {"COLORTERM": "truecolor"}):
+            set_color_depth(None)
+            self.assertEqual(Flags.get_prefix("#ff8800"), "\x1b[38;2;255;136;0m")
+        with self.assertRaises(ValueError):
+            set_color_depth(8)
+
+    def test_depth_from_the_environment(self):
+        """Tests that the environment's depth is read again with no depth set"""
+        formatter = Printy(color=True)
+        raw_text = formatter.get_formatted_text
+        env = {"COLORTERM": "", "WT_SESSION": "", "TERM": "xterm-256color"}
+        for changes, code in (
+            ({"COLORTERM": "truecolor"}, "38;2;255;136;0"),
+            ({}, "38;5;208"),
+            ({"TERM": "linux"}, "33"),
+        ):
+            with self.subTest(changes=changes):
+                with mock.patch.dict(os.environ, {**env, **changes}):
+                    set_color_depth(None)
+                    self.assertEqual(Flags.get_prefix("#ff8800"), "\x1b[%sm" % code)
+                    self.assertEqual(
+                        Flags.get_transition("r", "#ff8800"), "\x1b[%sm" % code
+                    )
+                    self.assertEqual(
+                        formatter.fmt("[#ff8800]{}@", "a"), raw_text("[#ff8800]a@")
+                    )
+                    self.assertIn(code, raw_text("[#ff8800]a@"))
+
+    def test_depth_from_the_environment_read_once(self):
+        """Tests that the environment is not read again on every lookup"""
+        set_color_depth(None)
+        with mock.patch("printy.flags.get_color_depth", return_value=16) as depth:
+            Flags.get_prefix("#ff8800")
+            Flags.get_prefix("#ff0000")
+            Flags.get_transition("#ff8800", "#ff0000")
+        depth.assert_called_once_with()
+        self.assertEqual(Flags.get_prefix("#ff8800"), "\x1b[33m")
+
+    def test_invalid_colors(self):
+        """Tests that invalid truecolors raise InvalidFlag"""
+        for flags in ("#ff880", "#ff880g", "rgb(256,0,0)", "r{#00}", "rgb(1,2"):
+            with self.subTest(flags=flags), self.assertRaises(InvalidFlag):
+                Flags.get_prefix(flags)
+
+    def test_transitions(self):
+        """Tests that the truecolors are colors, not formats, for every depth"""
+        for depth in (TRUECOLOR, 256, 16):
+            set_color_depth(depth)
+            with self.subTest(depth=depth):
+                self.assertEqual(Flags.get_transition("#ff8800", "#ff8800U"), "\x1b[4m")
+                self.assertEqual(
+                    Flags.get_transition("#ff8800B", "B{#ff8800}"),
+                    "\x1b[%s;%s%s"
+                    % (
+                        Flags.default_foreground,
+                        Flags.get_color_values("#ff8800")[1],
+                        Flags.escape_ansi_end,
+                    ),
+                )
+
+    def test_texts_styles_and_aliases(self):
+        """Tests that the truecolors work in texts, styles and aliases"""
+        raw_text = Printy(color=True).get_formatted_text
+        self.assertEqual(
+            raw_text("[#ff8800B]a@ [rgb(0,0,40)]b@"),
+            "\x1b[38;2;255;136;0;1ma\x1b[0m \x1b[38;2;0;0;40mb\x1b[0m",
+        )
+        style = Style("B{#000000}#ff8800")
+        self.assertEqual(style, "#ff8800B{#000000}")
+        self.assertEqual(style | "r", "rB{#000000}")
+        self.assertEqual(style.prefix, Flags.get_prefix("#ff8800B{#000000}"))
+
+        printy.add_alias("E", "#ff0000B")
+        self.addCleanup(printy.remove_flag, "E")
+        self.assertEqual(Flags.get_prefix("E"), "\x1b[38;2;255;0;0;1m")
+
+    def test_package_attributes(self):
+        """Tests that the depth is available from the package"""
+        self.assertIs(printy.set_color_depth, set_color_depth)
+        self.assertEqual(printy.TRUECOLOR, colors.TRUECOLOR)
+
+
+if __name__ == "__main__":
+    unittest.main()
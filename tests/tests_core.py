@@ -1,15 +1,41 @@
+import enum
+import io
+import logging
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
 import unittest
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import partial
 from unittest import mock
 
-from printy.core import WINDOWS, Printy
+from printy import themes
+from printy.core import (
+    LINUX,
+    OSX,
+    WINDOWS,
+    BinaryStreamFormatter,
+    Printy,
+    StreamFormatter,
+    get_platform,
+)
 from printy.exceptions import InvalidFlag
-from printy.flags import Flags
+from printy.flags import Flags, set_color_depth
+
+# Neither disables nor forces the ansi codes, whatever the environment is
+color_env = {"NO_COLOR": "", "FORCE_COLOR": "", "TERM": ""}
 
 
 class TestGlobalFlagsPrinty(unittest.TestCase):
     """Test case for formatting with a global set of flags specified"""
 
     def setUp(self):
+        patcher = mock.patch.dict(os.environ, color_env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
         self.sample_text = "Some Text To Print Out"
         self.printy = Printy()
         self.raw_text = self.printy.get_formatted_text
@@ -177,6 +203,9 @@ class TestInlineFlagsPrinty(unittest.TestCase):
     """Test case for inline formatting"""
 
     def setUp(self):
+        patcher = mock.patch.dict(os.environ, color_env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
         self.printy = Printy()
         self.raw_text = self.printy.get_formatted_text
         self.esc = self.printy.escape
@@ -388,6 +417,32 @@ class TestInlineFlagsPrinty(unittest.TestCase):
 
         self.assertEqual(expected_result, pretty_dict)
 
+    def test_pretty_str_subclasses(self):
+        """Tests that str subclasses are shown as str() gives them, as before"""
+
+        class Color(str, enum.Enum):
+            RED = "red"
+
+        class Shout(str):
+            def __str__(self):
+                return self.upper() + "!"
+
+        obj = {
+            "color": Color.RED,
+            "items": [Shout("hi"), "[x]"],
+            Color.RED: (Shout("a"),),
+        }
+        # The text the recursive pretty printer gave
+        expected_result = (
+            "{\n    [n>]'color'@: [c>]'%(red)s'@[<oB],@\n"
+            "    [n>]'items'@: \\[\n        [c>]'HI!'@[<oB],@ [c>]'\\[x\\]'@\n"
+            "    \\][<oB],@\n"
+            "    [n>]'%(red)s'@: (\n        [c>]'A!'@\n    )[<oB],@\n}"
+        ) % {"red": str(Color.RED)}
+
+        self.assertEqual(expected_result, Printy._repr_value(obj))
+        self.assertEqual(expected_result, Printy._pretty_print_object(obj, 4))
+
     def test_print_number(self):
         integer_to_print = 123
         float_to_print = 123.45
@@ -566,6 +621,78 @@ class TestWindowsConsoleMode(unittest.TestCase):
         # Should return False after catching ImportError
         self.assertFalse(result)
 
+    def test_platform(self):
+        """Tests the names of the os, the same as platform.system()"""
+        for name, expected in (("win32", WINDOWS), ("darwin", OSX), ("linux", LINUX)):
+            with mock.patch.object(sys, "platform", name):
+                self.assertEqual(get_platform(), expected)
+
+
+class TestLazyImport(unittest.TestCase):
+    """Test case for the attributes of the package resolved on first use"""
+
+    def test_import_does_not_load_the_parser(self):
+        """Tests that importing printy doesn't import its modules, nor the metadata"""
+        code = (
+            "import sys, printy; "
+            "print(' '.join(sorted(m for m in sys.modules if m.startswith('printy.')"
+            " or m in ('importlib.metadata', 'platform', 're', 'typing'))))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        self.assertEqual(result.stdout.split(), [])
+
+    def test_package_attributes(self):
+        """Tests that the attributes are resolved on first access, and unknown ones raise"""
+        import printy
+        from printy.template import Template
+        from printy.writer import PrintyWriter
+
+        self.assertIsInstance(printy.printy_instance, Printy)
+        self.assertEqual(printy.raw("[r]a@", color=True), "\x1b[38;5;196ma\x1b[0m")
+        self.assertIs(printy.Printy, Printy)
+        self.assertIs(printy.Flags, Flags)
+        self.assertIs(printy.Template, Template)
+        self.assertIs(printy.PrintyWriter, PrintyWriter)
+        self.assertIn("r", printy.COLORS)
+        self.assertIn("B", printy.FORMATS)
+        self.assertIn("r", printy.available_flags)
+        self.assertIsInstance(printy.__version__, str)
+        self.assertIn("raw", dir(printy))
+        self.assertIn("COLORS", dir(printy))
+        with self.assertRaises(AttributeError):
+            _ = printy.missing
+
+    def test_star_import(self):
+        """Tests that a star import gives the public names only"""
+        namespace: dict = {}
+        exec("from printy import *", namespace)
+        self.assertIn("printy", namespace)
+        self.assertIn("COLORS", namespace)
+        self.assertNotIn("compile", namespace)
+
+    def test_windows_console_set_up_on_first_use(self):
+        """Tests that the console is set up when the ansi codes are first needed"""
+        with mock.patch.dict(os.environ, color_env):
+            printy = Printy()
+        printy.platform = WINDOWS
+        with mock.patch.object(
+            Printy, "set_windows_console_mode", return_value=True
+        ) as console_mode:
+            self.assertTrue(printy.supports_color())
+            self.assertTrue(printy.supports_color())
+        console_mode.assert_called_once_with()
+
+        # Even if the ansi codes are forced
+        printy = Printy(color=True)
+        printy.platform = WINDOWS
+        with mock.patch.object(
+            Printy, "set_windows_console_mode", return_value=False
+        ) as console_mode:
+            self.assertTrue(printy.supports_color())
+        console_mode.assert_called_once_with()
+
 
 class TestEdgeCases(unittest.TestCase):
     """Test case for edge cases in parsing"""
@@ -622,3 +749,857 @@ class TestEdgeCases(unittest.TestCase):
         # Should format boolean and None with special formatting
         self.assertIn("True", result)
         self.assertIn("None", result)
+
+
+class TestTokenizer(unittest.TestCase):
+    """Test case for the sections returned by the inline formats tokenizer"""
+
+    def test_sections(self):
+        """Tests the sections of a text with multiple formats"""
+        result = Printy._get_inline_format_as_tuple("[rB]Some@ Te[H]xt@")
+        expected = [("", None), ("Some", "rB"), (" Te", None), ("xt", "H")]
+
+        self.assertEqual(result, expected)
+
+    def test_empty_text(self):
+        """Tests that an empty text has no sections"""
+        self.assertEqual(Printy._get_inline_format_as_tuple(""), [])
+
+    def test_misplaced_special_chars(self):
+        """Tests that misplaced special characters are kept in the section"""
+        self.assertEqual(
+            Printy._get_inline_format_as_tuple("[r]]t@ x@@"),
+            [("", None), ("]t", "r"), (" x@@", None)],
+        )
+        self.assertEqual(
+            Printy._get_inline_format_as_tuple("[r[]a@"),
+            [("", None), ("a", "r[")],
+        )
+
+    def test_escaped_chars_are_kept(self):
+        """Tests that escaped characters are not unescaped by default"""
+        self.assertEqual(
+            Printy._get_inline_format_as_tuple(r"[y]a\@b@ \[c\]"),
+            [("", None), (r"a\@b", "y"), (r" \[c\]", None)],
+        )
+
+    def test_unescape(self):
+        """Tests that escaped characters are replaced when 'unescape' is True"""
+        text = r"[y]a\@b@ \[c\] \\@"
+        expected = [
+            (Printy._replace_escaped(section), flags)
+            for section, flags in Printy._get_inline_format_as_tuple(text)
+        ]
+
+        self.assertEqual(Printy._tokenize(text, unescape=True), expected)
+        self.assertEqual(expected[-1], (r" [c] \@", None))
+
+    def test_escaped_chars_in_flags_are_not_unescaped(self):
+        """Tests that only the text of the sections is unescaped"""
+        self.assertEqual(
+            Printy._tokenize(r"[r\@]x@", unescape=True),
+            [("", None), ("x", r"r\@")],
+        )
+
+
+class TestStreamFormatting(unittest.TestCase):
+    """Test case for formatting texts that come in chunks"""
+
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, color_env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.printy = Printy()
+        self.raw_text = self.printy.get_formatted_text
+
+    def assertStreamEqual(self, chunks, flags="", predefined=""):
+        expected = self.raw_text("".join(chunks), flags, predefined)
+        result = "".join(self.printy.stream(chunks, flags, predefined))
+        self.assertEqual(result, expected)
+
+    def test_sections_split_between_chunks(self):
+        """Tests flags and texts of a section in different chunks"""
+        self.assertStreamEqual(["[r", "B]So", "me@ Te[H", "]xt@"])
+        self.assertStreamEqual(["[rB]Some", "@", " text"], predefined="y")
+
+    def test_escaped_char_split_between_chunks(self):
+        """Tests a backslash at the end of a chunk escaping the next one"""
+        self.assertStreamEqual(["[y]me\\", "@mail.com@"])
+        self.assertStreamEqual(["trailing backslash\\"])
+        self.assertStreamEqual(["[r]a\\", "\\"])
+
+    def test_misplaced_special_chars(self):
+        """Tests misplaced special characters in different chunks"""
+        self.assertStreamEqual(["]x@", "[r]]t@ x@", "@ [y[", "]a\\@", "@"], "c")
+        self.assertStreamEqual(["[r\\]", "x]z@"], "c")
+
+    def test_global_flags(self):
+        """Tests that global flags wrap the whole cleaned text"""
+        self.assertStreamEqual(["[y]Hey", " you@"], flags="rB")
+        self.assertStreamEqual([], flags="rB")
+
+    def test_empty_chunks(self):
+        """Tests that empty chunks and empty streams give nothing"""
+        self.assertStreamEqual(["", "[r]x@", ""])
+        self.assertEqual(list(self.printy.stream([])), [])
+
+    def test_yields_before_the_end(self):
+        """Tests that formatted text is given for each chunk as soon as possible"""
+        formatter = StreamFormatter()
+
+        self.assertEqual(formatter.feed("[r]Hello"), "\x1b[38;5;196mHello")
+        self.assertEqual(formatter.feed(" world"), " world")
+        self.assertEqual(formatter.close(), "\x1b[0m")
+
+    def test_file_object_read_in_chunks(self):
+        """Tests that a file object is read with the given chunk size"""
+        text = "[rB]Some@ text [y]with\\@ formats@ " * 10
+        source = io.StringIO(text)
+        with mock.patch.object(source, "read", wraps=source.read) as read:
+            result = "".join(self.printy.stream(source, chunk_size=7))
+
+        self.assertEqual(result, self.raw_text(text))
+        read.assert_called_with(7)
+
+    def test_plain_stream_on_unconfigured_windows(self):
+        """Tests that no ansi codes are streamed if windows is not configured"""
+        self.printy.platform = WINDOWS
+        self.printy.virtual_terminal_processing = False
+
+        result = "".join(self.printy.stream(["[r]He", "llo@"]))
+        self.assertEqual(result, "Hello")
+
+    def test_format_file_is_streamed(self):
+        """Tests that printing a file gives the same output as its text"""
+        text = "[c]Some@ text\n[rB]from a file@"
+        with tempfile.NamedTemporaryFile("w", delete=False) as f:
+            f.write(text)
+        self.addCleanup(os.remove, f.name)
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.printy.format(file=f.name, predefined="y", end="!")
+
+        self.assertEqual(output.getvalue(), self.raw_text(text, predefined="y") + "!")
+
+
+class TestMemoryMappedFiles(unittest.TestCase):
+    """Test case for formatting files mapped in memory"""
+
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, color_env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.printy = Printy()
+        self.raw_text = self.printy.get_formatted_text
+
+    def create_file(self, text):
+        with tempfile.NamedTemporaryFile("wb", delete=False) as f:
+            f.write(text.encode())
+        self.addCleanup(os.remove, f.name)
+        return f.name
+
+    def test_write_file_in_blocks(self):
+        """Tests that the blocks written are the same as formatting the text"""
+        text = "[rB]Sóme@ text [y]wïth\\@ formats@ \\[not a flag\\] " * 20
+        file_name = self.create_file(text)
+        for block_size in [1, 7, 1024]:
+            output = io.BytesIO()
+            self.printy.write_file(
+                file_name, output, predefined="c", block_size=block_size
+            )
+
+            self.assertEqual(
+                output.getvalue(), self.raw_text(text, predefined="c").encode()
+            )
+
+    def test_write_file_global_flags(self):
+        """Tests that global flags wrap the whole cleaned file"""
+        file_name = self.create_file("[y]Hey@ you")
+        output = io.BytesIO()
+        self.printy.write_file(file_name, output, flags="rB")
+
+        self.assertEqual(output.getvalue(), self.raw_text("Hey you", "rB").encode())
+
+    def test_write_empty_file(self):
+        """Tests that an empty file is written with only the global flags"""
+        file_name = self.create_file("")
+        output = io.BytesIO()
+        self.printy.write_file(file_name, output, flags="r")
+
+        self.assertEqual(output.getvalue(), self.raw_text("", "r").encode())
+
+    def test_binary_stream_formatter(self):
+        """Tests the formatter of bytes with an escape between two chunks"""
+        formatter = BinaryStreamFormatter()
+        result = (
+            formatter.feed(b"[n]me\\") + formatter.feed(b"@mail@") + formatter.close()
+        )
+
+        self.assertEqual(result, self.raw_text("[n]me\\@mail@").encode())
+
+    def test_format_file_with_mmap(self):
+        """Tests printing a file mapped in memory to the stdout's buffer"""
+        text = "[c]Some@ text\n[rB]from a file@"
+        file_name = self.create_file(text)
+        output = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+        with redirect_stdout(output):
+            print("before", end=" ")
+            self.printy.format(file=file_name, use_mmap=True)
+        output.flush()
+
+        self.assertEqual(
+            output.buffer.getvalue().decode(), "before " + self.raw_text(text) + "\n"
+        )
+
+    def test_format_file_with_mmap_without_buffer(self):
+        """Tests that the text file is streamed if stdout has no binary buffer"""
+        text = "[c]Some@ text"
+        file_name = self.create_file(text)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.printy.format(file=file_name, use_mmap=True)
+
+        self.assertEqual(output.getvalue(), self.raw_text(text) + "\n")
+
+
+class TestFormattedObjects(unittest.TestCase):
+    """
+    Test case for pretty printing objects without parsing the inline formats,
+    the result must be the same as parsing the text from '_repr_value'
+    """
+
+    def setUp(self):
+        self.printy = Printy()
+
+    def assertSameAsParsing(self, obj, flags="", predefined="", indentation=4):
+        expected = self.printy.get_formatted_text(
+            Printy._repr_value(obj, indentation=indentation), flags, predefined
+        )
+        result = self.printy.get_formatted_text(
+            obj, flags, predefined, indentation=indentation
+        )
+        self.assertEqual(result, expected)
+
+    def test_nested_objects(self):
+        """Tests that nested objects give the same text as parsing their repr"""
+
+        class Person:
+            def __str__(self):
+                return "a person"
+
+        class Number(float):
+            pass
+
+        obj = {
+            "name": "John [Doe] @home\\",
+            "age": 34,
+            "scores": [1.5, None, True, ("a", {}), [], {"b"}],
+            1: {"person": Person(), "empty": ()},
+            "number": [Number(7), Number(0.5)],
+        }
+        self.assertSameAsParsing(obj)
+        self.assertSameAsParsing(obj, indentation=2)
+        self.assertSameAsParsing(obj, predefined="y")
+        self.assertSameAsParsing(obj, flags="rB")
+
+    def test_not_parsed(self):
+        """Tests that the text of a plain object is not parsed"""
+        with mock.patch.object(Printy, "_tokenize") as tokenize:
+            self.printy.get_formatted_text({"a": ["b", 1]})
+
+        tokenize.assert_not_called()
+
+    def test_special_chars_in_keys_and_objects(self):
+        """Tests the keys and objects whose text has to be parsed"""
+
+        class CustomStr:
+            def __str__(self):
+                return "[rBU]Red Bold Underlined@ and [y]Yellow@"
+
+        self.assertSameAsParsing({"[c]k@": 1, "str": CustomStr()})
+        self.assertSameAsParsing({"back\\": [CustomStr()]}, predefined="y")
+        self.assertSameAsParsing({"a": 1, "k": CustomStr(), "b": [2, "c"]})
+        self.assertSameAsParsing(["a", CustomStr(), {"b": None}], predefined="y")
+        self.assertSameAsParsing({"k": "v", "[y": "@"}, flags="r")
+
+    def test_str_subclasses(self):
+        """
+        Tests that str enums and str subclasses with their own __str__ are
+        shown as str() gives them, the same as parsing the text the recursive
+        pretty printer gave
+        """
+
+        class Color(str, enum.Enum):
+            RED = "red"
+
+        class Shout(str):
+            def __str__(self):
+                return self.upper() + "!"
+
+        red = str(Color.RED)
+        for obj, text in (
+            ({"c": Color.RED}, "{\n    [n>]'c'@: [c>]'%s'@[<oB],@\n}" % red),
+            ({Color.RED: Shout("a")}, "{\n    [n>]'%s'@: [c>]'A!'@[<oB],@\n}" % red),
+            (
+                [Color.RED, Shout("[b]")],
+                "\\[\n    [c>]'%s'@[<oB],@ [c>]'\\[B\\]!'@\n\\]" % red,
+            ),
+            (
+                {"k": [Shout("x"), {"e": Color.RED}]},
+                "{\n    [n>]'k'@: \\[\n        [c>]'X!'@[<oB],@ {\n"
+                "            [n>]'e'@: [c>]'%s'@[<oB],@\n        }\n    \\][<oB],@\n}"
+                % red,
+            ),
+        ):
+            with self.subTest(obj=obj):
+                for printy in (self.printy, Printy(color=True), Printy(color=False)):
+                    self.assertEqual(
+                        printy.get_formatted_text(obj), printy.get_formatted_text(text)
+                    )
+
+    def test_unconfigured_windows(self):
+        """Tests that no ansi codes are added if windows is not configured"""
+        self.printy.platform = WINDOWS
+        self.printy.virtual_terminal_processing = False
+
+        self.assertSameAsParsing({"a": [1, "b"]}, flags="r")
+        self.assertSameAsParsing({"a": [1, "b"]}, predefined="y")
+
+
+class TestBoundedObjects(unittest.TestCase):
+    """
+    Test case for pretty printing huge or recursive objects, and limiting how
+    much of them is shown
+    """
+
+    def setUp(self):
+        self.printy = Printy()
+        self.printy.platform = WINDOWS
+        self.printy.virtual_terminal_processing = False
+
+    def test_deeply_nested_objects(self):
+        """Tests objects deeper than the recursion limit"""
+        obj = []
+        for _ in range(10000):
+            obj = [obj]
+
+        text = self.printy.get_formatted_text(obj, indentation=0)
+
+        self.assertEqual(text, "[\n" * 10001 + "\n]" * 10001)
+
+    def test_objects_that_contain_themselves(self):
+        """Tests that an object inside itself is shown as [...] or {...}"""
+        items = [1]
+        items.append(items)
+        obj = {"items": items, "set": {2}}
+        obj["self"] = obj
+
+        text = self.printy.get_formatted_text(obj, indentation=2)
+
+        self.assertEqual(
+            text,
+            "{\n  'items': [\n    1, [...]\n  ],\n"
+            "  'set': {\n    2\n  },\n  'self': {...},\n}",
+        )
+
+    def test_repeated_objects_are_not_cycles(self):
+        """Tests that the same object twice is shown both times"""
+        shared = [1]
+        text = self.printy.get_formatted_text([shared, shared], indentation=0)
+
+        self.assertEqual(text, "[\n[\n1\n], [\n1\n]\n]")
+
+    def test_max_depth(self):
+        """Tests that the items deeper than max_depth are left out"""
+        obj = {"a": [1, (2, 3)], "b": {}, "c": []}
+
+        self.assertEqual(
+            self.printy.get_formatted_text(obj, indentation=0, max_depth=1),
+            "{\n'a': [… 2 more],\n'b': {\n},\n'c': [\n\n],\n}",
+        )
+        self.assertEqual(
+            self.printy.get_formatted_text(obj, indentation=0, max_depth=2),
+            "{\n'a': [\n1, (… 2 more)\n],\n'b': {\n},\n'c': [\n\n],\n}",
+        )
+
+    def test_max_items(self):
+        """Tests that the items after max_items are left out"""
+        self.assertEqual(
+            self.printy.get_formatted_text(list(range(10)), indentation=0, max_items=3),
+            "[\n0, 1, 2, … 7 more\n]",
+        )
+        self.assertEqual(
+            self.printy.get_formatted_text(
+                {"a": 1, "b": 2, "c": 3}, indentation=0, max_items=1
+            ),
+            "{\n'a': 1,\n… 2 more\n}",
+        )
+        self.assertEqual(
+            self.printy.get_formatted_text((1, 2), indentation=0, max_items=0),
+            "(\n… 2 more\n)",
+        )
+
+    def test_max_string_length(self):
+        """Tests that the strings are cut at max_string_length"""
+        text = self.printy.get_formatted_text(
+            ["abcdef", "abc"], indentation=0, max_string_length=3
+        )
+
+        self.assertEqual(text, "[\n'abc… 3 more', 'abc'\n]")
+
+    def test_limits_with_inline_formats(self):
+        """Tests the markers when the text of the object has to be parsed"""
+        self.printy.platform = "Linux"
+        obj = {"[r]k@": "a" * 10, "b": list(range(5))}
+
+        expected = self.printy.get_formatted_text(
+            Printy._pretty_print_object(obj, 4, max_items=3, max_string_length=5)
+        )
+
+        self.assertEqual(
+            self.printy.get_formatted_text(obj, max_items=3, max_string_length=5),
+            expected,
+        )
+
+        self.printy.platform = WINDOWS
+        text = self.printy.get_formatted_text(
+            {"back\\": "a" * 10, "b": list(range(5))}, max_items=3, max_string_length=5
+        )
+        self.assertIn("'back\\': 'aaaaa… 5 more'", text)
+        self.assertIn("0, 1, 2, … 2 more", text)
+
+    def test_iter_formatted(self):
+        """Tests that big objects are given in chunks"""
+        self.printy.platform = "Linux"
+        obj = {"k%d" % i: [i, str(i), None] for i in range(2000)}
+
+        chunks = list(self.printy.iter_formatted(obj, predefined="y"))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(
+            "".join(chunks),
+            self.printy.get_formatted_text(Printy._repr_value(obj), predefined="y"),
+        )
+        self.assertEqual(
+            list(self.printy.iter_formatted("[r]a@")),
+            [self.printy.get_formatted_text("[r]a@")],
+        )
+
+    def test_format_limits(self):
+        """Tests that format() takes the limits too"""
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.printy.format({"a": list(range(5))}, max_items=2, indentation=2)
+
+        self.assertEqual(
+            output.getvalue(), "{\n  'a': [\n    0, 1, … 3 more\n  ],\n}\n"
+        )
+
+
+class TestStrip(unittest.TestCase):
+    """Test case for removing the inline formats of a text"""
+
+    def test_strip(self):
+        """Tests that the text left is the same the tokenizer gives"""
+        cases = {
+            "": "",
+            "plain text": "plain text",
+            "[rB]Some@ [y]text@": "Some text",
+            "[r]a\\@b@ and \\[c\\]": "a@b and [c]",
+            "email@example.com [n]x@": "email@example.com x",
+            "[r\\]x]y@ z": "y z",
+            "a] b[c]d": "a] bd",
+            "unclosed [rB]text": "unclosed text",
+            "flags left [rB": "flags left ",
+            "ends with \\": "ends with \\",
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(Printy.strip(text), expected)
+                self.assertEqual(
+                    Printy.strip(text),
+                    "".join(x[0] for x in Printy._tokenize(text, unescape=True)),
+                )
+
+    def test_plain_text_is_not_copied(self):
+        """Tests that a text without special characters is given back as is"""
+        text = "x" * 1000
+        self.assertIs(Printy.strip(text), text)
+
+    def test_strip_many(self):
+        """Tests that the same texts are stripped only once"""
+        texts = ["[r]a@", "b", "[r]a@", "\\@c"]
+        with mock.patch.object(Printy, "strip", wraps=Printy.strip) as strip:
+            self.assertEqual(Printy.strip_many(texts), ["a", "b", "a", "@c"])
+
+        self.assertEqual(strip.call_count, 3)
+        self.assertEqual(Printy.strip_many(iter([])), [])
+
+    def test_global_flags_use_strip(self):
+        """Tests that the text is not tokenized with global flags"""
+        printy = Printy(color=True)
+        with mock.patch.object(Printy, "_tokenize") as tokenize:
+            text = printy.get_formatted_text("[y]a@ b", "r")
+
+        tokenize.assert_not_called()
+        self.assertEqual(text, Flags.get_prefix("r") + "a b" + Flags.get_end_of_line())
+
+
+class TestColorSupport(unittest.TestCase):
+    """Test case for adding the ansi codes only if the output supports them"""
+
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, color_env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.printy = Printy()
+        self.printy.platform = "Linux"
+
+    def open_file(self):
+        f = tempfile.TemporaryFile("w+")
+        self.addCleanup(f.close)
+        return f
+
+    def test_terminals(self):
+        """Tests that terminals support the ansi codes and files don't"""
+        master, slave = os.openpty()
+        self.addCleanup(os.close, master)
+        self.addCleanup(os.close, slave)
+        with open(slave, "w", closefd=False) as terminal:
+            self.assertTrue(self.printy.supports_color(terminal))
+
+        self.assertFalse(self.printy.supports_color(self.open_file()))
+
+    def test_streams_in_memory_keep_ansi_codes(self):
+        """Tests that streams without a file descriptor keep the ansi codes"""
+        self.assertTrue(self.printy.supports_color(io.StringIO()))
+        self.assertTrue(self.printy.supports_color(object()))
+        self.assertTrue(self.printy.supports_color())
+
+    def test_environment_variables(self):
+        """Tests that NO_COLOR, FORCE_COLOR and TERM are followed"""
+        cases = [
+            ({"NO_COLOR": "1"}, False),
+            ({"FORCE_COLOR": "1"}, True),
+            ({"TERM": "dumb"}, False),
+            ({"NO_COLOR": "1", "FORCE_COLOR": "1"}, False),
+            ({"TERM": "dumb", "FORCE_COLOR": "1"}, True),
+        ]
+        stream = self.open_file()
+        for env, expected in cases:
+            with self.subTest(env=env), mock.patch.dict(os.environ, env):
+                self.printy.set_color(None)
+                self.assertEqual(self.printy.supports_color(stream), expected)
+                self.assertEqual(
+                    self.printy.supports_color(io.StringIO()), expected is not False
+                )
+                # Texts with no stream follow the environment, but no terminal
+                self.assertEqual(self.printy.supports_color(), expected is not False)
+
+    def test_texts_without_a_stream(self):
+        """Tests that the environment disables the codes of texts not printed"""
+        from printy.logging import PrintyFormatter
+        from printy.table import Table
+
+        with mock.patch.dict(os.environ, {"NO_COLOR": "1"}):
+            printy = Printy()
+        self.assertEqual(printy.get_formatted_text("[r]x@"), "x")
+        self.assertEqual(printy.fmt("[r]{}@", "x"), "x")
+        self.assertEqual(printy.compile("[r]{}@").render("x"), "x")
+        self.assertEqual(Table(widths=[1], printy=printy).render([["[r]x@"]]), "x")
+        formatter = PrintyFormatter("[r]%(message)s@", printy=printy)
+        self.assertEqual(formatter.format(logging.makeLogRecord({"msg": "x"})), "x")
+
+    def test_environment_is_read_once(self):
+        """Tests that the environment is read when the formatter is created"""
+        with mock.patch.dict(os.environ, {"NO_COLOR": "1"}):
+            printy = Printy()
+        self.assertFalse(printy.supports_color(io.StringIO()))
+
+    def test_override(self):
+        """Tests that set_color() overrides the output, and None goes back to it"""
+        self.assertFalse(Printy(color=False).supports_color())
+        self.assertTrue(Printy(color=True).supports_color(self.open_file()))
+
+        self.printy.set_color(False)
+        self.assertEqual(self.printy.get_formatted_text("[r]a@ b"), "a b")
+        self.printy.set_color(None)
+        self.assertEqual(
+            self.printy.get_formatted_text("[r]a@ b"),
+            Flags.get_prefix("r") + "a" + Flags.get_end_of_line() + " b",
+        )
+
+    def test_unconfigured_windows(self):
+        """Tests that windows without ansi codes only supports them if forced"""
+        self.printy.platform = WINDOWS
+        self.printy.virtual_terminal_processing = False
+
+        self.assertFalse(self.printy.supports_color(io.StringIO()))
+        self.assertTrue(Printy(color=True).supports_color())
+
+    def test_terminal_checked_once_per_stream(self):
+        """Tests that each stream is checked only once"""
+        stream = self.open_file()
+        with mock.patch("os.isatty", return_value=False) as isatty:
+            for _ in range(3):
+                self.assertFalse(self.printy.supports_color(stream))
+            self.assertTrue(self.printy.supports_color(io.StringIO()))
+
+        isatty.assert_called_once()
+
+    def test_color_argument(self):
+        """Tests that the color argument overrides the formatter's"""
+        text = "[r]a@ b"
+        self.assertEqual(self.printy.get_formatted_text(text, color=False), "a b")
+        self.assertEqual(
+            "".join(self.printy.stream([text], predefined="y", color=False)), "a b"
+        )
+        self.assertEqual(
+            self.printy.get_formatted_text({"a": 1}, "y", color=False),
+            "{\n    'a': 1,\n}",
+        )
+        self.printy.set_color(False)
+        self.assertEqual(
+            self.printy.get_formatted_text(text, color=True),
+            Flags.get_prefix("r") + "a" + Flags.get_end_of_line() + " b",
+        )
+
+    def test_invalid_flags_without_color(self):
+        """Tests that invalid flags raise, even without the ansi codes"""
+        with self.assertRaises(InvalidFlag):
+            self.printy.get_formatted_text("text", "P", color=False)
+        with self.assertRaises(InvalidFlag):
+            self.printy.get_formatted_text({"a": 1}, "P", color=False)
+
+    def test_printing_to_a_file(self):
+        """Tests that nothing but the text is printed out to a file"""
+        stdout = self.open_file()
+        with redirect_stdout(stdout):
+            self.printy.format("[r]Some@ text", predefined="y")
+            self.printy.format({"a": None})
+        stdout.seek(0)
+
+        self.assertEqual(stdout.read(), "Some text\n{\n    'a': None,\n}\n")
+
+    def test_printing_a_file_to_a_file(self):
+        """Tests that nothing but the text of a file is printed out to a file"""
+        with tempfile.NamedTemporaryFile("w", delete=False) as f:
+            f.write("[c]Some@ text")
+        self.addCleanup(os.remove, f.name)
+        stdout = self.open_file()
+        with redirect_stdout(stdout):
+            self.printy.format(file=f.name, use_mmap=True)
+            self.printy.format(file=f.name)
+        stdout.seek(0)
+
+        self.assertEqual(stdout.read(), "Some text\nSome text\n")
+
+
+class TestMinimalOutput(unittest.TestCase):
+    """Test case for adding only the changes of style between sections"""
+
+    def setUp(self):
+        self.printy = Printy(color=True)
+        self.end = Flags.get_end_of_line()
+
+    def test_same_flags_are_merged(self):
+        """Tests that sections with the same flags share their codes"""
+        self.assertEqual(
+            self.printy.get_formatted_text("[r]Some@[r] text@"),
+            Flags.get_prefix("r") + "Some text" + self.end,
+        )
+
+    def test_only_changes_are_added(self):
+        """Tests that only the codes that change are added between sections"""
+        self.assertEqual(
+            self.printy.get_formatted_text("[r]a@[rB]b@[yB]c@ d"),
+            Flags.get_prefix("r") + "a\x1b[1mb\x1b[38;5;11mc" + self.end + " d",
+        )
+
+    def test_predefined(self):
+        """Tests that the predefined flags are changed only where they have to"""
+        self.assertEqual(
+            self.printy.get_formatted_text("a [y]b@ [r]c@", predefined="y"),
+            Flags.get_prefix("y") + "a b " + "\x1b[38;5;196mc" + self.end,
+        )
+
+    def test_empty_sections(self):
+        """Tests that empty sections add nothing, but their flags are checked"""
+        self.assertEqual(
+            self.printy.get_formatted_text("[r]a@[y]@[r]b@"),
+            Flags.get_prefix("r") + "ab" + self.end,
+        )
+        self.assertEqual(self.printy.get_formatted_text("[r]@", predefined="y"), "")
+        with self.assertRaises(InvalidFlag):
+            self.printy.get_formatted_text("[P]@a")
+
+    def test_stream_with_same_output(self):
+        """Tests that the streams give the same codes as the whole text"""
+        text = "[r]a@[rB]b@ [r]c@[y]@ d"
+        chunks = [text[:4], text[4:9], text[9:]]
+
+        self.assertEqual(
+            "".join(self.printy.stream(chunks, predefined="c")),
+            self.printy.get_formatted_text(text, predefined="c"),
+        )
+        formatter = BinaryStreamFormatter()
+        self.assertEqual(
+            formatter.feed(text.encode()) + formatter.close(),
+            self.printy.get_formatted_text(text).encode(),
+        )
+
+    def test_pretty_printed_objects(self):
+        """Tests that the style is reset only once at the end"""
+        text = self.printy.get_formatted_text([1, 2], predefined="y")
+
+        self.assertEqual(text.count(self.end), 1)
+        self.assertTrue(text.endswith(self.end))
+
+
+class TestBatchFormatting(unittest.TestCase):
+    """Test case for formatting many values with the same flags at once"""
+
+    def setUp(self):
+        self.printy = Printy(color=True)
+        self.values = [
+            "[r]Some@ text",
+            "plain \\@ text é",
+            "",
+            42,
+            None,
+            {"a": [1, "b@"]},
+            ("x", 1.5),
+        ]
+
+    def expected_for(self, values, **kwargs):
+        return [self.printy.get_formatted_text(value, **kwargs) for value in values]
+
+    def expected(self, **kwargs):
+        return self.expected_for(self.values, **kwargs)
+
+    def test_same_texts_as_one_by_one(self):
+        """Tests that the texts are the same as formatting each value"""
+        for kwargs in (
+            {},
+            {"flags": "rB"},
+            {"predefined": "y"},
+            {"pretty": False},
+            {"max_items": 1, "indentation": 2},
+            {"color": False},
+            {"flags": "rB", "color": False},
+        ):
+            with self.subTest(**kwargs):
+                self.assertEqual(
+                    self.printy.get_formatted_texts(iter(self.values), **kwargs),
+                    self.expected(**kwargs),
+                )
+
+    def test_str_subclasses(self):
+        """Tests that the str subclasses are formatted as str() gives them"""
+
+        class Level(str, enum.Enum):
+            ERROR = "[r]a@"
+
+        class Shouting(str):
+            def __str__(self):
+                return self.replace("b", "B")
+
+        values = [Level.ERROR, Shouting("[r]b@"), "[r]c@"]
+        for kwargs in ({}, {"flags": "B"}, {"color": False}):
+            with self.subTest(**kwargs):
+                self.assertEqual(
+                    self.printy.get_formatted_texts(values, **kwargs),
+                    self.expected_for(values, **kwargs),
+                )
+
+    def test_flags_resolved_once(self):
+        """Tests that the flags and the output are checked once for all the values"""
+        with mock.patch.object(Flags, "get_prefix", wraps=Flags.get_prefix) as prefix:
+            self.printy.get_formatted_texts(["a", "b", "c"], "rB")
+        prefix.assert_called_once_with("rB")
+        with mock.patch.object(Printy, "supports_color") as supports_color:
+            Printy().get_formatted_texts(["a", "b", "c"])
+        supports_color.assert_called_once_with()
+
+    def test_invalid_flags(self):
+        """Tests that invalid flags raise, even with no values"""
+        with self.assertRaises(InvalidFlag):
+            self.printy.get_formatted_texts(["a"], "P", color=False)
+        with self.assertRaises(InvalidFlag):
+            self.printy.get_formatted_texts(["[P]a@"])
+        # Even with no values
+        with self.assertRaises(InvalidFlag):
+            self.printy.get_formatted_texts([], "P")
+        self.assertEqual(self.printy.get_formatted_texts([]), [])
+
+    def test_processes(self):
+        """Tests that the texts are the same when formatted in processes"""
+        values = self.values * 5
+        self.assertEqual(
+            self.printy.get_formatted_texts(values, predefined="y", processes=3),
+            [self.printy.get_formatted_text(v, predefined="y") for v in values],
+        )
+        self.assertEqual(self.printy.get_formatted_texts([], processes=2), [])
+        with mock.patch("printy.core._format_in_processes") as format_in_processes:
+            self.printy.get_formatted_texts(values, processes=1)
+        format_in_processes.assert_not_called()
+        with self.assertRaises(ValueError):
+            self.printy.get_formatted_texts(values, processes=0)
+
+    def test_processes_with_the_runtime_flags(self):
+        """Tests that spawned workers, which start from scratch, use them too"""
+        themes.add_flag("a", 214)
+        themes.add_alias("E", "rB{a}")
+        set_color_depth(16)
+        self.addCleanup(set_color_depth, None)
+        self.addCleanup(themes.remove_flag, "a")
+        self.addCleanup(themes.remove_flag, "E")
+        values = ["[E]a@ [#ff8800]b@", "[a]c@", {"d": 1}] * 2
+        spawn = partial(
+            ProcessPoolExecutor, mp_context=multiprocessing.get_context("spawn")
+        )
+        with mock.patch("concurrent.futures.ProcessPoolExecutor", spawn):
+            texts = self.printy.get_formatted_texts(values, predefined="y", processes=2)
+        self.assertEqual(texts, self.expected_for(values, predefined="y"))
+
+    def test_format_many(self):
+        """Tests that all the texts are printed out at once"""
+        values = ["[r]a@", 1, [1, 2]]
+        output = io.StringIO()
+        with redirect_stdout(output), mock.patch("builtins.print", wraps=print) as p:
+            self.printy.format_many(values, end=";\n")
+            self.printy.format_many([])
+
+        # The whole batch is written at once
+        p.assert_called_once()
+        self.assertEqual(
+            output.getvalue(),
+            "".join(text + ";\n" for text in self.expected_for(values)),
+        )
+
+    def test_format_many_removes_the_ansi_codes(self):
+        """Tests that the texts printed out follow the environment"""
+        output = io.StringIO()
+        with mock.patch.dict(os.environ, {"NO_COLOR": "1"}), redirect_stdout(output):
+            Printy().format_many(["[r]a@", [1, 2]], "y")
+        self.assertEqual(output.getvalue(), "a\n[\n    1, 2\n]\n")
+
+    def test_package_functions(self):
+        """Tests that the functions are available from the package"""
+        import printy
+
+        # The package's instance reads the environment again, once restored
+        self.addCleanup(printy.set_color, None)
+        patcher = mock.patch.dict(os.environ, color_env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        printy.set_color(None)
+
+        self.assertEqual(printy.raw_many(["[r]a@", "b"], color=False), ["a", "b"])
+        output = io.StringIO()
+        with redirect_stdout(output):
+            printy.printy_many(["[r]a@", "b"], "y")
+        self.assertEqual(
+            output.getvalue(), printy.raw("a", "y") + "\n" + printy.raw("b", "y") + "\n"
+        )
@@ -0,0 +1,154 @@
+import unittest
+
+from printy.exceptions import InvalidFlag
+from printy.flags import Flags
+
+
+class TestFlagsLookupTable(unittest.TestCase):
+    """Test case for the precomputed flags table and the prefix cache"""
+
+    def setUp(self):
+        Flags.cache_clear()
+
+    def test_table_contains_every_flag(self):
+        """Tests that the table has an entry for each flag in 'get_flags'"""
+        table = Flags.get_flag_table()
+
+        self.assertEqual(set(table), set(Flags.get_flags()))
+        self.assertEqual(table["r"], ("38;5;196", "48;5;196"))
+        self.assertEqual(table["B"], ("1", "1"))
+
+    def test_table_is_built_once(self):
+        """Tests that the same table is returned on consecutive calls"""
+        self.assertIs(Flags.get_flag_table(), Flags.get_flag_table())
+
+    def test_subclasses_get_their_own_table(self):
+        """Tests that a subclass does not share the table of its parent"""
+
+        class CustomFlags(Flags):
+            COLOR_ERROR = "E", "160"
+
+        self.assertIn("E", CustomFlags.get_flag_table())
+        self.assertNotIn("E", Flags.get_flag_table())
+        self.assertEqual(CustomFlags.get_prefix("E"), "\x1b[38;5;160m")
+        with self.assertRaises(InvalidFlag):
+            Flags.get_prefix("E")
+
+    def test_prefix_is_the_joined_flags(self):
+        """Tests that 'get_prefix' returns the same as joining the flag values"""
+        for flags in ["rB", "<y", "n{k}", "c>U", "{B}"]:
+            self.assertEqual(
+                Flags.get_prefix(flags),
+                Flags.join_flags(Flags.get_flag_values(flags)),
+            )
+
+    def test_prefix_cache_stats(self):
+        """Tests that resolving the same flags twice is a cache hit"""
+        Flags.get_prefix("rB")
+        Flags.get_prefix("rB")
+        info = Flags.cache_info()
+
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 1)
+        self.assertEqual(info.currsize, 1)
+
+    def test_invalid_flags_are_not_cached(self):
+        """Tests that an invalid flag raises on every call"""
+        for _ in range(2):
+            with self.assertRaises(InvalidFlag):
+                Flags.get_prefix("rP")
+        self.assertEqual(Flags.cache_info().currsize, 0)
+
+    def test_cache_clear_rebuilds_the_table(self):
+        """Tests that 'cache_clear' picks up flags modified at runtime"""
+
+        class CustomFlags(Flags):
+            COLOR_ERROR = "E", "160"
+
+        self.assertEqual(CustomFlags.get_prefix("E"), "\x1b[38;5;160m")
+        CustomFlags.COLOR_ERROR = "E", "161"
+        CustomFlags.cache_clear()
+
+        self.assertEqual(CustomFlags.get_prefix("E"), "\x1b[38;5;161m")
+
+    def test_cache_clear_rebuilds_the_subclass_tables(self):
+        """Tests that clearing a class also drops the tables of its subclasses"""
+
+        class CustomFlags(Flags):
+            COLOR_ERROR = "E", "160"
+
+        class MoreFlags(CustomFlags):
+            COLOR_WARNING = "W", "214"
+
+        self.assertNotIn("a", MoreFlags.get_flag_table())
+        # The subclasses inherit the colors added at runtime
+        self.addCleanup(Flags.cache_clear)
+        self.addCleanup(setattr, Flags, "custom_colors", Flags.custom_colors)
+        Flags.custom_colors = {"a": "208"}
+        Flags.cache_clear()
+
+        self.assertEqual(MoreFlags.get_prefix("a"), "\x1b[38;5;208m")
+        self.assertIn("a", CustomFlags.get_flag_table())
+
+    def test_trailing_dark_marker_is_ignored(self):
+        """Tests that a '<' with no color after it is dropped, as before"""
+        self.assertEqual(Flags.get_flag_values("r<"), ["38;5;196"])
+
+    def test_fg_and_bg_values(self):
+        """Tests the foreground and background codes of colors and formats"""
+        available_flags = Flags.get_flags()
+
+        self.assertEqual(Flags.get_fg_value(available_flags, "r"), "38;5;196")
+        self.assertEqual(Flags.get_fg_value(available_flags, "B"), "1")
+        self.assertEqual(Flags.get_bg_value(available_flags, "r"), "48;5;196")
+        self.assertEqual(Flags.get_bg_value(available_flags, "B"), "1")
+
+
+class TestStyleTransitions(unittest.TestCase):
+    """Test case for changing from the style of some flags to another one"""
+
+    def setUp(self):
+        Flags.cache_clear()
+
+    def test_style(self):
+        """Tests the colors and formats each set of flags gives"""
+        self.assertEqual(Flags.get_style(""), (None, None, ()))
+        self.assertEqual(Flags.get_style("rB{y}U"), ("38;5;196", "48;5;11", ("1", "4")))
+        # The last color is the one shown, as in a terminal
+        self.assertEqual(Flags.get_style("rc>BB"), ("38;5;51", None, ("1",)))
+
+    def test_from_and_to_no_style(self):
+        """Tests the transitions from and to no flags"""
+        self.assertEqual(Flags.get_transition("", "rB"), Flags.get_prefix("rB"))
+        self.assertEqual(Flags.get_transition("rB", ""), Flags.get_end_of_line())
+        self.assertEqual(Flags.get_transition("", ""), "")
+
+    def test_same_style(self):
+        """Tests that flags with the same style need no codes"""
+        self.assertEqual(Flags.get_transition("rB", "rB"), "")
+        self.assertEqual(Flags.get_transition("rB", "Br"), "")
+        self.assertEqual(Flags.get_transition("yr", "r"), "")
+        self.assertEqual(Flags.get_transition("{}", ""), "")
+
+    def test_only_changes(self):
+        """Tests that only what changes is set, if nothing has to be removed"""
+        self.assertEqual(Flags.get_transition("r", "rB"), "\x1b[1m")
+        self.assertEqual(Flags.get_transition("rB", "yB"), "\x1b[38;5;11m")
+        self.assertEqual(Flags.get_transition("r{y}", "r"), "\x1b[49m")
+        self.assertEqual(Flags.get_transition("rU", "U"), "\x1b[39m")
+
+    def test_removed_formats(self):
+        """Tests that the style is reset if a format has to be removed"""
+        self.assertEqual(Flags.get_transition("rB", "r"), "\x1b[0;38;5;196m")
+        self.assertEqual(Flags.get_transition("BU", "{y}U"), "\x1b[0;48;5;11;4m")
+
+    def test_shortest_code(self):
+        """Tests that resetting is used if it's shorter than the changes"""
+        self.assertEqual(Flags.get_transition("r", "{y}"), "\x1b[0;48;5;11m")
+
+    def test_invalid_flags(self):
+        """Tests that invalid flags on either side raise InvalidFlag"""
+        with self.assertRaises(InvalidFlag):
+            Flags.get_transition("r", "P")
+        with self.assertRaises(InvalidFlag):
+            Flags.get_transition("P", "r")
@@ -0,0 +1,191 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+import printy
+from printy import core, instrumentation
+from printy.core import Printy, StreamFormatter
+from printy.flags import Flags
+from printy.writer import PrintyWriter
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Test case for the opt-in counters of each stage"""
+
+    def setUp(self):
+        self.printy = Printy(color=True)
+        instrumentation.reset()
+        instrumentation.enable()
+        self.addCleanup(instrumentation.disable)
+        self.addCleanup(instrumentation.reset)
+        # The flags must be resolved to be counted
+        Flags.cache_clear()
+
+    def calls(self, stage):
+        return printy.stats().stages[stage].calls
+
+    def test_disabled_by_default(self):
+        """Tests that the original functions are restored when disabled"""
+        instrumentation.disable()
+        self.assertFalse(hasattr(Printy._tokenize, "__wrapped__"))
+        self.assertNotIn("print", vars(core))
+        self.printy.get_formatted_text("[r]Some@ text")
+
+        stats = printy.stats()
+        self.assertFalse(stats.enabled)
+        self.assertEqual(stats.bytes_in, 0)
+        self.assertEqual(stats.stages["parse"], (0, 0.0))
+
+    def test_restores_the_same_functions(self):
+        """Tests that disabling restores the functions replaced by enabling"""
+        instrumentation.disable()
+        functions = dict(vars(Printy)), dict(vars(Flags)), dict(vars(PrintyWriter))
+        instrumentation.enable()
+        instrumentation.enable()
+        self.assertTrue(printy.stats().enabled)
+        self.assertNotEqual(dict(vars(Printy)), functions[0])
+        instrumentation.disable()
+        self.assertEqual(
+            (dict(vars(Printy)), dict(vars(Flags)), dict(vars(PrintyWriter))),
+            functions,
+        )
+
+    def test_parse_and_flags(self):
+        """Tests that the parsing and the flags are timed, and the bytes counted"""
+        self.printy.get_formatted_text("[rB]Some@ [y]text@ é")
+
+        stats = printy.stats()
+        self.assertEqual(stats.stages["parse"].calls, 1)
+        self.assertGreater(stats.stages["parse"].seconds, 0)
+        self.assertGreater(stats.stages["flags"].calls, 0)
+        # The é takes 2 bytes
+        self.assertEqual(stats.bytes_in, len("[rB]Some@ [y]text@ é") + 1)
+
+        # Flags already resolved are not resolved again
+        self.printy.get_formatted_text("[rB]Some@ [y]text@")
+        self.assertEqual(self.calls("parse"), 2)
+        self.assertEqual(self.calls("flags"), stats.stages["flags"].calls)
+
+    def test_removed_formats_are_parsed(self):
+        """Tests that removing the inline formats counts as parsing them"""
+        Printy(color=False).get_formatted_text("[r]Some@ text")
+        self.printy.get_formatted_text("[r]Some@ text", "B")
+        self.assertEqual(self.calls("parse"), 2)
+
+    def test_streams(self):
+        """Tests that each chunk fed to a stream formatter is parsed"""
+        formatter = StreamFormatter()
+        formatter.feed("[r]So")
+        formatter.feed("me@")
+        formatter.close()
+        self.assertEqual(self.calls("parse"), 3)
+        self.assertEqual(printy.stats().bytes_in, 8)
+
+    def test_pretty_and_escape(self):
+        """Tests that pretty printing and escaping are counted"""
+        self.printy.get_formatted_text({"a": [1, "b"]})
+        self.assertEqual(self.calls("pretty"), 1)
+        self.printy._pretty_print_object({"a": "b"}, 4)
+        self.assertEqual(self.calls("pretty"), 2)
+
+        # The values of the markup are escaped
+        escaped = self.calls("escape")
+        self.assertGreater(escaped, 0)
+        self.printy.get_formatted_text({"a": [1, "b@"]}, pretty=False)
+        self.assertEqual(self.calls("escape"), escaped + 1)
+        self.printy.escape("[a]")
+        self.assertEqual(self.calls("escape"), escaped + 2)
+
+    def test_write(self):
+        """Tests that the writes of printy() and their bytes are counted"""
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.printy.format("[r]é@")
+            self.printy.format([1, 2], end="")
+
+        stats = printy.stats()
+        self.assertGreater(stats.stages["write"].calls, 0)
+        self.assertEqual(stats.bytes_out, len(output.getvalue().encode()))
+
+    def test_write_file(self):
+        """Tests that the blocks written from a mapped file are counted"""
+        with tempfile.NamedTemporaryFile("w", delete=False, suffix=".txt") as f:
+            f.write("[r]Some@ text")
+        self.addCleanup(os.unlink, f.name)
+        output = io.BytesIO()
+        self.printy.write_file(f.name, output)
+
+        stats = printy.stats()
+        self.assertEqual(stats.stages["write"].calls, 2)
+        self.assertEqual(stats.bytes_out, len(output.getvalue()))
+        self.assertEqual(stats.bytes_in, len("[r]Some@ text"))
+
+    def test_writer(self):
+        """Tests that the flushes of a PrintyWriter are counted as writes"""
+        stream = io.StringIO()
+        writer = PrintyWriter(stream, printy=self.printy)
+        writer.format("[r]Some@ text")
+        writer.flush()
+
+        stats = printy.stats()
+        self.assertEqual(stats.stages["write"].calls, 1)
+        self.assertEqual(stats.bytes_out, len(stream.getvalue()))
+
+    def test_errors_are_counted(self):
+        """Tests that a call that raises is counted too"""
+        with self.assertRaises(Exception):
+            self.printy.get_formatted_text("[Z]Some@ text")
+        self.assertEqual(self.calls("flags"), 1)
+
+    def test_unfinished_iterator(self):
+        """Tests that an iterator closed before its end is counted once"""
+        chunks = self.printy._iter_formatted_object(list(range(10)), 4, "", False)
+        next(chunks)
+        chunks.close()
+        self.assertEqual(self.calls("pretty"), 1)
+
+    def test_reset(self):
+        """Tests that resetting the stats keeps them enabled"""
+        self.printy.get_formatted_text("[r]Some@ text")
+        printy.reset_stats()
+
+        stats = printy.stats()
+        self.assertTrue(stats.enabled)
+        self.assertEqual(stats.bytes_in, 0)
+        self.assertEqual(stats.stages, dict.fromkeys(instrumentation.stages, (0, 0.0)))
+
+    def test_package_functions_used_before(self):
+        """Tests that the functions kept by the package are counted too"""
+        instrumentation.disable()
+        printy.escape("[a]")
+        printy.strip("[r]a@")
+        instrumentation.enable()
+        printy.escape("[a]")
+        printy.strip("[r]a@")
+        self.assertEqual(self.calls("escape"), 1)
+        self.assertEqual(self.calls("parse"), 1)
+
+    def test_package_functions_not_counted_once_disabled(self):
+        """Tests that the functions kept by the package stop being counted"""
+        printy.escape("[a]")
+        instrumentation.disable()
+        instrumentation.reset()
+        for _ in range(5):
+            printy.escape("[a]")
+            printy.strip("[r]a@")
+        stats = printy.stats()
+        self.assertEqual(stats.stages, dict.fromkeys(instrumentation.stages, (0, 0.0)))
+        self.assertEqual(stats.bytes_in, 0)
+
+    def test_package_functions(self):
+        """Tests that the stats are enabled and disabled from the package"""
+        printy.disable_stats()
+        self.assertFalse(printy.stats().enabled)
+        printy.enable_stats()
+        self.assertTrue(printy.stats().enabled)
+
+
+if __name__ == "__main__":
+    unittest.main()
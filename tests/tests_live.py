@@ -0,0 +1,240 @@
+import io
+import os
+import threading
+import unittest
+from unittest import mock
+
+import printy
+from printy.core import Printy
+from printy.exceptions import InvalidFlag
+from printy.flags import Flags
+from printy.live import LiveRegion
+
+# Neither disables nor forces the ansi codes, whatever the environment is
+color_env = {"NO_COLOR": "", "FORCE_COLOR": "", "TERM": ""}
+
+red = Flags.get_prefix("r")
+green = Flags.get_prefix("n")
+end = Flags.get_end_of_line()
+
+
+class TestLiveRegion(unittest.TestCase):
+    """Test case for the regions redrawn in place"""
+
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.region = LiveRegion(self.stream, fps=None, color=True)
+        self.written = 0
+
+    def frame(self):
+        """The text written since the last time it was checked"""
+        text = self.stream.getvalue()[self.written :]
+        self.written = len(self.stream.getvalue())
+        return text
+
+    def test_first_frame(self):
+        """Tests that the first frame is written as it is"""
+        self.region.update("[r]Copying@ a.txt\n[n]1@/10")
+        self.assertEqual(
+            self.frame(),
+            red + "Copying" + end + " a.txt\n" + green + "1" + end + "/10\n",
+        )
+
+    def test_only_changes_are_written(self):
+        """Tests that only the changed cells of the next frames are written"""
+        self.region.update("[r]Copying@ a.txt\n[n]1@/10")
+        self.frame()
+        self.region.update("[r]Copying@ b.txt\n[n]2@/10")
+        # Back to the top, then to the changed characters
+        self.assertEqual(self.frame(), "\x1b[2A\x1b[9Gb\n" + green + "2" + end + "\n")
+
+        # Unchanged lines are skipped with a line feed
+        self.region.update("[r]Copying@ b.txt\n[n]3@/10")
+        self.assertEqual(self.frame(), "\x1b[2A\n" + green + "3" + end + "\n")
+
+        # Nothing is written for the same lines
+        self.region.update("[r]Copying@ b.txt\n[n]3@/10")
+        self.assertEqual(self.frame(), "")
+
+    def test_style_changes(self):
+        """Tests that a change of style alone is written"""
+        self.region.update("abc")
+        self.frame()
+        self.region.update("a[r]b@c")
+        self.assertEqual(self.frame(), "\x1b[1A\x1b[2G" + red + "b" + end + "\n")
+
+    def test_short_gaps_are_written_again(self):
+        """Tests that a few unchanged cells are written instead of moving over them"""
+        self.region.update("a-b--c------d")
+        self.frame()
+        self.region.update("A-B--C------D")
+        self.assertEqual(self.frame(), "\x1b[1AA-B--C\x1b[13GD\n")
+
+    def test_shorter_lines_and_frames(self):
+        """Tests that what's left of longer lines and frames is erased"""
+        self.region.update("one\ntwo\nthree")
+        self.frame()
+        self.region.update("on")
+        self.assertEqual(self.frame(), "\x1b[3A\x1b[3G\x1b[K\n\x1b[J")
+
+        self.region.update("one\ntwo")
+        self.assertEqual(self.frame(), "\x1b[1A\x1b[3Ge\ntwo\n")
+
+    def test_wide_characters(self):
+        """Tests that the cursor is moved to the cell of each character"""
+        self.region.update("漢字 a\u0301b")
+        self.assertEqual(self.frame(), "漢字 a\u0301b\n")
+        self.region.update("漢子 ab")
+        # The second character starts at the third cell
+        self.assertEqual(self.frame(), "\x1b[1A\x1b[3G子 a\n")
+        self.region.update("漢子 aB")
+        self.assertEqual(self.frame(), "\x1b[1A\x1b[7GB\n")
+        # The changed half of a wide character writes it all
+        self.region.update("漢ab aB")
+        self.assertEqual(self.frame(), "\x1b[1A\x1b[3Gab\n")
+        self.region.update("漢子 aB")
+        self.assertEqual(self.frame(), "\x1b[1A\x1b[3G子\n")
+        self.region.update("\u200b漢")
+        self.assertEqual(self.frame(), "\x1b[1A\u200b漢\x1b[K\n")
+
+    def test_global_flags_and_objects(self):
+        """Tests that the values are formatted like printy() does"""
+        self.region.update("[y]a@ b", "r")
+        self.assertEqual(self.frame(), red + "a b" + end + "\n")
+        region = LiveRegion(self.stream, fps=None, color=True)
+        region.update(42)
+        self.assertEqual(self.frame(), Printy(color=True).get_formatted_text(42) + "\n")
+        region.update("a", predefined="r")
+        self.assertEqual(self.frame(), "\x1b[1A" + red + "a" + end + "\x1b[K\n")
+
+    def test_invalid_flags(self):
+        """Tests that invalid flags and frame rates raise"""
+        with self.assertRaises(InvalidFlag):
+            self.region.update("[P]a@")
+        with self.assertRaises(InvalidFlag):
+            self.region.update("a", "P")
+        with self.assertRaises(ValueError):
+            LiveRegion(self.stream, fps=0)
+
+    def test_clear(self):
+        """Tests that clearing erases the region and starts a new one"""
+        self.region.update("one\ntwo")
+        self.frame()
+        self.region.clear()
+        self.assertEqual(self.frame(), "\x1b[2A\x1b[J")
+        self.region.clear()
+        self.assertEqual(self.frame(), "")
+        self.region.update("one")
+        self.assertEqual(self.frame(), "one\n")
+
+    def test_closed(self):
+        """Tests that a closed region can't be updated"""
+        with self.region:
+            self.region.update("one")
+        self.region.close()
+        with self.assertRaises(ValueError):
+            self.region.update("two")
+        self.region.refresh()
+        self.assertEqual(self.frame(), "one\n")
+
+    def test_no_ansi_codes(self):
+        """Tests that without the ansi codes, only the last frame is written"""
+        with LiveRegion(self.stream, color=False) as region:
+            region.update("[r]one@")
+            region.update("[r]two@\nthre\u0301e")
+            region.refresh()
+            self.assertEqual(self.frame(), "")
+        self.assertEqual(self.frame(), "two\nthre\u0301e\n")
+
+        with (
+            mock.patch.dict(os.environ, color_env),
+            LiveRegion(io.StringIO()) as region,
+        ):
+            self.assertTrue(region.color)
+        with mock.patch.dict(os.environ, {"NO_COLOR": "1"}):
+            self.assertFalse(LiveRegion(self.stream).color)
+
+    def test_package_class(self):
+        """Tests that LiveRegion is available from the package"""
+        self.assertIs(printy.LiveRegion, LiveRegion)
+
+
+class TestLiveRegionRate(unittest.TestCase):
+    """Test case for the max number of redraws per second"""
+
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.now = 100.0
+        patcher = mock.patch("printy.live.time.monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_updates_are_coalesced(self):
+        """Tests that the updates within the interval are drawn once, the last one"""
+        timers = []
+
+        class Timer:
+            def __init__(self, interval, function):
+                self.interval = interval
+                self.function = function
+                self.cancelled = False
+                timers.append(self)
+
+            def start(self):
+                pass
+
+            def cancel(self):
+                self.cancelled = True
+
+        region = LiveRegion(self.stream, fps=4, color=True)
+        with mock.patch("printy.live.threading.Timer", Timer):
+            region.update("1")
+            self.now += 0.1
+            region.update("2")
+            region.update("3")
+            # Only the first one is drawn, a single timer draws the last one
+            self.assertEqual(self.stream.getvalue(), "1\n")
+            self.assertEqual(len(timers), 1)
+            self.assertAlmostEqual(timers[0].interval, 0.15)
+
+            self.now += 0.15
+            timers[0].function()
+            self.assertEqual(self.stream.getvalue(), "1\n\x1b[1A3\n")
+
+            # Drawn right away once the interval has passed
+            self.now += 0.25
+            region.update("4")
+            self.now += 0.1
+            region.update("5")
+            region.clear()
+            self.assertTrue(timers[1].cancelled)
+            region.update("5")
+            region.close()
+        self.assertEqual(
+            self.stream.getvalue(), "1\n\x1b[1A3\n\x1b[1A4\n\x1b[1A\x1b[J5\n"
+        )
+        self.assertEqual(len(timers), 3)
+        self.assertTrue(timers[2].cancelled)
+
+    def test_from_many_threads(self):
+        """Tests that updates from many threads are drawn whole"""
+        region = LiveRegion(self.stream, fps=1, color=True)
+
+        def update(thread):
+            for i in range(100):
+                region.update("thread %d: %d" % (thread, i))
+
+        threads = [threading.Thread(target=update, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        region.close()
+        # Time doesn't pass, so only the first update is drawn until closed
+        self.assertEqual(self.stream.getvalue().count("\n"), 2)
+        # The last update drawn is the last one of a thread
+        self.assertTrue("".join(region._frame[0][0]).endswith(": 99"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,215 @@
+import io
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from printy.core import WINDOWS, Printy
+from printy.exceptions import InvalidFlag
+from printy.logging import PrintyFormatter, PrintyHandler
+from printy.writer import PrintyWriter
+
+# Neither disables nor forces the ansi codes, whatever the environment is
+color_env = {"NO_COLOR": "", "FORCE_COLOR": "", "TERM": ""}
+
+
+def make_record(msg, *args, level=logging.INFO, **extra):
+    return logging.makeLogRecord(
+        {
+            "name": "app",
+            "levelno": level,
+            "levelname": logging.getLevelName(level),
+            "msg": msg,
+            "args": args,
+            **extra,
+        }
+    )
+
+
+class TestPrintyFormatter(unittest.TestCase):
+    """Test case for the logging formatter"""
+
+    def setUp(self):
+        self.raw_text = Printy().get_formatted_text
+
+    def test_format_with_inline_formats(self):
+        """Tests that the format and the messages can have inline formats"""
+        formatter = PrintyFormatter("[g]%(name)s@ %(message)s", level_flags={})
+        result = formatter.format(make_record("[nB]Connected@ to %s", "db"))
+
+        self.assertEqual(result, self.raw_text("[g]app@ [nB]Connected@ to db"))
+
+    def test_arguments_are_not_parsed(self):
+        """Tests that the arguments are printed as if they were escaped"""
+        formatter = PrintyFormatter("%(message)s")
+        result = formatter.format(make_record("[y]User@ %s", "[r]evil@"))
+
+        self.assertEqual(
+            result, self.raw_text("[y]User@ " + Printy().escape("[r]evil@"))
+        )
+
+    def test_level_names_are_formatted(self):
+        """Tests that the level name is formatted with the flags of its level"""
+        formatter = PrintyFormatter("%(levelname)-8s|%(message)s")
+        warning = formatter.format(make_record("text", level=logging.WARNING))
+        error = formatter.format(make_record("text", level=logging.ERROR))
+
+        self.assertEqual(warning, self.raw_text("[y]WARNING @|text"))
+        self.assertEqual(error, self.raw_text("[r]ERROR   @|text"))
+
+    def test_custom_level_flags(self):
+        """Tests levels without flags, and custom flags for a level"""
+        formatter = PrintyFormatter(
+            "%(levelname)s %(message)s", level_flags={logging.INFO: "m>"}
+        )
+
+        self.assertEqual(
+            formatter.format(make_record("text")), self.raw_text("[m>]INFO@ text")
+        )
+        self.assertEqual(
+            formatter.format(make_record("text", level=logging.ERROR)), "ERROR text"
+        )
+
+    def test_brackets_in_the_format(self):
+        """Tests that the brackets of the format are flags, unless escaped"""
+        with self.assertRaises(InvalidFlag):
+            PrintyFormatter("[%(levelname)s] %(message)s", color=True)
+        formatter = PrintyFormatter("\\[%(levelname)s\\] %(message)s", color=False)
+
+        self.assertEqual(formatter.format(make_record("text")), "[INFO] text")
+
+    def test_brace_and_dollar_styles(self):
+        """Tests the level name in the formats of the other styles"""
+        brace = PrintyFormatter("{levelname!r:>8} {message}", style="{")
+        dollar = PrintyFormatter("$levelname ${levelname} $message", style="$")
+        record = make_record("[c]text@")
+
+        self.assertEqual(brace.format(record), self.raw_text("[c]  'INFO'@ [c]text@"))
+        self.assertEqual(
+            dollar.format(record), self.raw_text("[c]INFO@ [c]INFO@ [c]text@")
+        )
+
+    def test_default_formats(self):
+        """Tests the default format for each style"""
+        record = make_record("text")
+        expected = self.raw_text("[c]INFO@:app:text")
+
+        for style in ["%", "{", "$"]:
+            self.assertEqual(PrintyFormatter(style=style).format(record), expected)
+
+    def test_messages_not_parsed(self):
+        """Tests that the messages are left as they are if not parsed"""
+        formatter = PrintyFormatter("%(message)s", parse_messages=False)
+
+        self.assertEqual(formatter.format(make_record("[r]%s@", 1)), "[r]1@")
+
+    def test_messages_that_are_not_strings(self):
+        """Tests that a message that is not a str is not parsed"""
+        formatter = PrintyFormatter("%(message)s")
+
+        self.assertEqual(formatter.format(make_record({"a": "[b]"})), "{'a': '[b]'}")
+
+    def test_message_cache_is_bounded(self):
+        """Tests that the oldest parsed message is removed from the cache"""
+        formatter = PrintyFormatter("%(message)s", cache_size=2)
+        for msg in ["[r]one@", "[r]two@", "[r]three@"]:
+            formatter.format(make_record(msg))
+
+        self.assertEqual(list(formatter._messages), ["[r]two@", "[r]three@"])
+
+    def test_exceptions_are_not_parsed(self):
+        """Tests that only the message is parsed, not the traceback"""
+        formatter = PrintyFormatter("%(message)s")
+        try:
+            raise ValueError("[r]bad@")
+        except ValueError:
+            record = make_record("[y]Failed@", exc_info=sys.exc_info())
+
+        result = formatter.format(record)
+        self.assertTrue(result.startswith(self.raw_text("[y]Failed@") + "\n"))
+        self.assertIn("ValueError: [r]bad@", result)
+
+    def test_unconfigured_windows(self):
+        """Tests that no ansi codes are added if windows is not configured"""
+        printy = Printy()
+        printy.platform = WINDOWS
+        printy.virtual_terminal_processing = False
+        formatter = PrintyFormatter(printy=printy)
+
+        self.assertEqual(formatter.format(make_record("[r]text@")), "INFO:app:text")
+
+
+class TestPrintyHandler(unittest.TestCase):
+    """Test case for the logging handler"""
+
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, color_env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.logger = logging.getLogger("tests.printy")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+
+    def add_handler(self, handler):
+        self.logger.addHandler(handler)
+        self.addCleanup(self.logger.removeHandler, handler)
+
+    def test_records_written_with_the_writer(self):
+        """Tests that the records are buffered by the writer"""
+        stream = io.StringIO()
+        writer = PrintyWriter(stream)
+        handler = PrintyHandler(writer)
+        handler.setFormatter(PrintyFormatter("%(message)s"))
+        self.add_handler(handler)
+        self.logger.info("[r]%s@", "first")
+        self.logger.info("[r]%s@", "second")
+
+        self.assertEqual(stream.getvalue(), "")
+        handler.flush()
+        self.assertEqual(
+            stream.getvalue(),
+            Printy().get_formatted_text("[r]first@\n[r]second@") + "\n",
+        )
+
+    def test_close_does_not_close_the_given_writer(self):
+        """Tests that a writer given to the handler is left open"""
+        writer = PrintyWriter(io.StringIO())
+        PrintyHandler(writer).close()
+
+        self.assertFalse(writer.closed)
+
+    def test_no_ansi_codes_for_files(self):
+        """Tests that the default formatter follows the writer's stream"""
+        with tempfile.TemporaryFile("w+") as stream:
+            handler = PrintyHandler(PrintyWriter(stream, 0))
+            self.add_handler(handler)
+            self.logger.warning("[r]careful@")
+            stream.seek(0)
+
+            self.assertEqual(stream.read(), "WARNING:tests.printy:careful\n")
+
+    def test_default_writer_to_stderr(self):
+        """Tests that by default records are written right away to stderr"""
+        stderr = io.StringIO()
+        with mock.patch("sys.stderr", stderr):
+            handler = PrintyHandler()
+        self.add_handler(handler)
+        self.logger.warning("careful")
+
+        self.assertEqual(
+            stderr.getvalue(),
+            Printy().get_formatted_text("[y]WARNING@:tests.printy:careful\n"),
+        )
+        handler.close()
+        self.assertTrue(handler.writer.closed)
+
+    def test_errors_are_handled(self):
+        """Tests that a record that can't be formatted is handled by logging"""
+        handler = PrintyHandler(PrintyWriter(io.StringIO()))
+        self.add_handler(handler)
+        with mock.patch.object(handler, "handleError") as handle_error:
+            self.logger.info("%d", "not a number")
+
+        handle_error.assert_called_once()
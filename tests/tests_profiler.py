@@ -0,0 +1,252 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import mock
+
+import printy
+from printy import profiler
+from printy.core import Printy
+from printy.writer import PrintyWriter
+
+
+class TestProfiler(unittest.TestCase):
+    """Test case for the profiler of the lines that call printy"""
+
+    def setUp(self):
+        self.printy = Printy(color=True)
+        # The package's instance would enable the profiler when it's created
+        patcher = mock.patch.dict(os.environ)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        os.environ.pop("PRINTY_PROFILE", None)
+        profiler.reset()
+        self.addCleanup(profiler.reset)
+        self.addCleanup(profiler.disable)
+
+    def line(self):
+        """The line that called this method"""
+        return sys._getframe(1).f_lineno
+
+    def test_calls_per_line(self):
+        """Tests that the calls are grouped by the line that made them"""
+        profiler.enable()
+        for _ in range(3):
+            text = self.printy.get_formatted_text("[r]Some@ text")
+            line = self.line() - 1
+        self.printy.get_formatted_text("[y]Other@")
+
+        sites = profiler.get_call_sites("calls")
+        self.assertEqual(len(sites), 2)
+        site = sites[0]
+        self.assertEqual(site.filename, __file__)
+        self.assertEqual(site.lineno, line)
+        self.assertEqual(site.function, "test_calls_per_line")
+        self.assertEqual(site.calls, 3)
+        self.assertEqual(site.bytes_out, 3 * len(text))
+        self.assertGreater(site.seconds, 0)
+        self.assertGreater(site.peak_memory, 0)
+        self.assertEqual(sites[1].calls, 1)
+
+    def test_calls_made_by_printy(self):
+        """Tests that the calls made by printy itself belong to their caller"""
+        with tempfile.NamedTemporaryFile("w", delete=False, suffix=".txt") as f:
+            f.write("[y]Some@ file")
+        self.addCleanup(os.unlink, f.name)
+        profiler.enable()
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.printy.format("[r]Some@ text é")
+            self.printy.format({"a": [1, 2, 3]})
+            self.printy.format(file=f.name)
+        writer = PrintyWriter(io.StringIO(), printy=self.printy)
+        writer.format("[r]Some@ text")
+        line = self.line() - 1
+
+        sites = profiler.get_call_sites()
+        self.assertEqual(sum(site.calls for site in sites), 4)
+        formatted = [site for site in sites if site.lineno != line]
+        self.assertEqual(
+            sum(site.bytes_out for site in formatted),
+            len(output.getvalue().encode()) - 3,  # without the line ends
+        )
+        # The writer is part of printy
+        self.assertIn(line, [site.lineno for site in sites])
+
+    def test_batches(self):
+        """Tests that a batch is profiled as a single call"""
+        profiler.enable(allocations=False)
+        texts = self.printy.get_formatted_texts(["[r]a@", {"b": 1}, "c"])
+        line = self.line() - 1
+
+        (site,) = profiler.get_call_sites()
+        self.assertEqual((site.lineno, site.calls), (line, 1))
+        self.assertEqual(site.bytes_out, sum(map(len, texts)))
+
+    def test_sampling(self):
+        """Tests that only a call every 'every' calls is profiled"""
+        profiler.enable(every=3, allocations=False)
+        for _ in range(7):
+            self.printy.get_formatted_text("[r]Some@ text")
+        (site,) = profiler.get_call_sites()
+        self.assertEqual(site.calls, 2)
+        self.assertEqual(site.peak_memory, 0)
+
+        # Not profiled calls don't profile the calls made by them either
+        with redirect_stdout(io.StringIO()):
+            self.printy.format("[r]Some@ text")
+        (site,) = profiler.get_call_sites()
+        self.assertEqual(site.calls, 2)
+
+    def test_enabled_again(self):
+        """Tests that enabling it again only changes the sampling"""
+        profiler.enable(allocations=False)
+        self.printy.get_formatted_text("[r]Some@ text")
+        profiler.enable(every=2)
+        self.printy.get_formatted_text("[r]Some@ text")
+        self.printy.get_formatted_text("[r]Some@ text")
+        self.assertEqual([site.calls for site in profiler.get_call_sites()], [1, 1])
+
+    def test_disable(self):
+        """Tests that disabling it restores the functions and keeps the stats"""
+        original = vars(Printy)["get_formatted_text"]
+        tracing = tracemalloc.is_tracing()
+        profiler.enable()
+        self.assertIsNot(vars(Printy)["get_formatted_text"], original)
+        self.printy.get_formatted_text("[r]Some@ text")
+        profiler.disable()
+
+        self.assertIs(vars(Printy)["get_formatted_text"], original)
+        self.assertEqual(tracemalloc.is_tracing(), tracing)
+        self.printy.get_formatted_text("[r]Some@ text")
+        # The stats are kept until reset
+        self.assertEqual(profiler.get_call_sites()[0].calls, 1)
+        profiler.reset()
+        self.assertEqual(profiler.get_call_sites(), [])
+
+    def test_errors(self):
+        """Tests the invalid arguments, and that the calls that raise are profiled"""
+        with self.assertRaises(ValueError):
+            profiler.enable(every=0)
+        with self.assertRaises(ValueError):
+            profiler.get_call_sites("name")
+
+        profiler.enable()
+        with self.assertRaises(Exception):
+            self.printy.get_formatted_text("[Z]Some@ text")
+        self.assertEqual(profiler.get_call_sites()[0].calls, 1)
+
+    def test_report(self):
+        """Tests the lines of the report, sorted and limited"""
+        profiler.enable()
+        for i in range(3):
+            self.printy.get_formatted_text("[r]Some@ text")
+            self.printy.get_formatted_text({i: list(range(500))})
+        line = self.line() - 1
+        profiler.disable()
+        # The chunks of the pretty printed objects are not counted twice
+        text = self.printy.get_formatted_text({0: list(range(500))})
+        self.assertEqual(
+            profiler.get_call_sites("bytes_out")[0].bytes_out, 3 * len(text)
+        )
+
+        report = profiler.report(limit=1, sort="bytes_out")
+        lines = report.splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn("call site", lines[0])
+        self.assertTrue(lines[1].startswith("    3 "))
+        self.assertIn("KB", lines[1])
+        self.assertTrue(lines[1].endswith("%s:%d (test_report)" % (__file__, line)))
+        self.assertEqual(lines[2], "... 1 more call sites")
+        self.assertEqual(len(profiler.report(limit=None).splitlines()), 3)
+
+    def test_sizes(self):
+        """Tests the units of the sizes and times of the report"""
+        self.assertEqual(profiler._format_size(10), "10 B")
+        self.assertEqual(profiler._format_size(2048), "2.0 KB")
+        self.assertEqual(profiler._format_size(3 * 1024**2), "3.0 MB")
+        self.assertEqual(profiler._format_size(5 * 1024**3), "5.0 GB")
+        self.assertEqual(profiler._format_seconds(2), "2.00 s")
+        self.assertEqual(profiler._format_seconds(0.002), "2.00 ms")
+        self.assertEqual(profiler._format_seconds(0.000002), "2.00 us")
+
+    def test_report_at_exit(self):
+        """Tests that the report is written at exit, and only if there are stats"""
+        with mock.patch("atexit.register") as register:
+            with mock.patch.object(profiler, "_registered_at_exit", False):
+                profiler.enable(at_exit=True)
+                profiler.enable(at_exit=True)
+        register.assert_called_once_with(profiler._write_report)
+
+        stderr = io.StringIO()
+        with redirect_stderr(stderr):
+            profiler._write_report()
+            self.assertEqual(stderr.getvalue(), "")
+            self.printy.get_formatted_text("[r]Some@ text")
+            profiler._write_report()
+        self.assertTrue(stderr.getvalue().startswith("printy profile\ncalls"))
+
+    def test_package_functions(self):
+        """Tests that the functions of the package are profiled"""
+        printy.raw("[r]Some@ text")
+        printy.enable_profiler(allocations=False)
+        printy.raw("[r]Some@ text")
+        line = self.line() - 1
+        printy.disable_profiler()
+        printy.raw("[r]Some@ text")
+
+        (site,) = profiler.get_call_sites()
+        self.assertEqual((site.lineno, site.calls), (line, 1))
+        self.assertIn("test_package_functions", printy.profiler_report())
+        printy.reset_profiler()
+        self.assertEqual(profiler.get_call_sites(), [])
+
+    def test_environment_variable(self):
+        """Tests that PRINTY_PROFILE profiles a program that doesn't enable it"""
+        code = "from printy import raw\nfor _ in range(4):\n    raw('[r]Some@ text')\n"
+        with tempfile.TemporaryDirectory() as directory:
+            script = os.path.join(directory, "script.py")
+            with open(script, "w") as f:
+                f.write(code)
+            result = subprocess.run(
+                [sys.executable, script],
+                capture_output=True,
+                text=True,
+                check=True,
+                env={
+                    **os.environ,
+                    "PRINTY_PROFILE": "2",
+                    "PYTHONPATH": os.path.dirname(os.path.dirname(printy.__file__)),
+                },
+            )
+        lines = result.stderr.splitlines()
+        self.assertEqual(lines[0], "printy profile")
+        self.assertTrue(lines[2].startswith("    2 "))
+        self.assertTrue(lines[2].endswith("script.py:3 (<module>)"))
+
+    def test_environment_variable_values(self):
+        """Tests that only a number of calls per sample enables it"""
+        for value, every in (
+            ("", None),
+            ("1", 1),
+            ("5", 5),
+            ("yes", None),
+            ("false", None),
+            ("0", None),
+            ("-1", None),
+        ):
+            with mock.patch.dict(os.environ, {"PRINTY_PROFILE": value}):
+                with mock.patch.object(profiler, "enable") as enable:
+                    profiler.enable_from_environment()
+            if every is None:
+                enable.assert_not_called()
+            else:
+                enable.assert_called_once_with(every, at_exit=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
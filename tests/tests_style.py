@@ -0,0 +1,114 @@
+import io
+import pickle
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+import printy
+from printy.core import Printy
+from printy.exceptions import InvalidFlag
+from printy.flags import Flags
+from printy.style import Style
+
+
+class TestStyle(unittest.TestCase):
+    """Test case for the sets of flags checked once"""
+
+    def setUp(self):
+        self.printy = Printy(color=True)
+        self.raw_text = self.printy.get_formatted_text
+
+    def test_parts(self):
+        """Tests that a style is split in its foreground, formats and background"""
+        style = Style("B{y}r<n U")
+        self.assertEqual(style, "<nBU{y}")
+        self.assertEqual(style.foreground, "<n")
+        self.assertEqual(style.formats, ("B", "U"))
+        self.assertEqual(style.background, "y")
+        self.assertEqual(style.prefix, Flags.get_prefix("<nBU{y}"))
+        self.assertEqual(repr(style), "Style('<nBU{y}')")
+
+        self.assertEqual(Style(""), "")
+        self.assertEqual(Style("").prefix, "")
+        self.assertEqual(Style("{}BB"), "B")
+
+    def test_invalid_flags(self):
+        """Tests that invalid flags raise InvalidFlag"""
+        for flags in ("Z", "r{Z}", "r>>"):
+            with self.subTest(flags=flags), self.assertRaises(InvalidFlag):
+                Style(flags)
+
+    def test_same_object(self):
+        """Tests that the same flags give the same style object"""
+        self.assertIs(Style("rB"), Style("rB"))
+        self.assertIs(Style("Br"), Style("rB"))
+        self.assertIs(Style("r") | "B", Style("rB"))
+        self.assertIs(pickle.loads(pickle.dumps(Style("rB"))), Style("rB"))
+
+        # Only the last ones are kept
+        with mock.patch("printy.style.PREFIX_CACHE_SIZE", 2):
+            Style("rBU")
+            Style("nB")
+        self.assertEqual(Style("nB"), "nB")
+
+    def test_hashable_as_its_flags(self):
+        """Tests that a style and its flags are the same key"""
+        self.assertEqual({Style("rB"): 1}["rB"], 1)
+        self.assertEqual({"rB": 1}[Style("Br")], 1)
+
+    def test_immutable(self):
+        """Tests that the attributes of a style can't be changed"""
+        style = Style("r")
+        with self.assertRaises(AttributeError):
+            style.prefix = ""
+        with self.assertRaises(AttributeError):
+            del style.foreground
+
+    def test_composition(self):
+        """Tests that styles are combined with + and |"""
+        self.assertEqual(Style("rB") + Style("{y}U"), "rBU{y}")
+        # The colors on the right are the ones applied
+        self.assertEqual(Style("r{c}") | "nB", "nB{c}")
+        self.assertEqual("B" | Style("r"), "rB")
+        self.assertEqual("{c}" | Style("r{y}"), "r{y}")
+        self.assertIsInstance("B" | Style("r"), Style)
+        self.assertIsInstance(Style("r") + Style("B"), Style)
+        self.assertEqual(Style("rB") | "", "rB")
+        with self.assertRaises(InvalidFlag):
+            Style("r") | "Z"
+        with self.assertRaises(TypeError):
+            Style("r") + 1
+        with self.assertRaises(TypeError):
+            1 | Style("r")
+
+    def test_concatenated_with_plain_strs(self):
+        """Tests that a style and a plain str are joined as any other str"""
+        style = Style("rB")
+        self.assertEqual("[" + style + "]x@", "[rB]x@")
+        self.assertEqual("Error: " + style, "Error: rB")
+        self.assertEqual(style + "]x@", "rB]x@")
+        self.assertNotIsInstance("Error: " + style, Style)
+        self.assertNotIsInstance(style + "U", Style)
+        self.assertEqual(self.raw_text("[" + style + "]a@"), self.raw_text("[rB]a@"))
+
+    def test_as_flags(self):
+        """Tests that a style can be used anywhere flags are"""
+        style = Style("rB")
+        self.assertEqual(self.raw_text("text", style), self.raw_text("text", "rB"))
+        self.assertEqual(
+            self.raw_text("a [y]b@", predefined=style),
+            self.raw_text("a [y]b@", predefined="rB"),
+        )
+        self.assertEqual(self.raw_text("[%s]a@ b" % style), self.raw_text("[rB]a@ b"))
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.printy.format("text", style)
+        self.assertEqual(output.getvalue(), self.raw_text("text", "rB") + "\n")
+
+    def test_package_class(self):
+        """Tests that Style is available from the package"""
+        self.assertIs(printy.Style, Style)
+
+
+if __name__ == "__main__":
+    unittest.main()
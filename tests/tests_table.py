@@ -0,0 +1,193 @@
+import enum
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+import printy
+from printy.core import Printy
+from printy.exceptions import InvalidFlag
+from printy.flags import Flags
+from printy.table import Table
+
+red = Flags.get_prefix("r")
+bold = Flags.get_prefix("B")
+end = Flags.get_end_of_line()
+color_env = {"NO_COLOR": "", "FORCE_COLOR": "", "TERM": ""}
+
+
+class TestTable(unittest.TestCase):
+    """Test case for the tables with inline formats in their cells"""
+
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, color_env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_widths_without_formats(self):
+        """Tests that the columns are as wide as their text, without the formats"""
+        table = Table(["Name", "Status"])
+        lines = table.render([["api", "[r]down@"], ["database", "up"]], color=True)
+        self.assertEqual(
+            lines.splitlines(),
+            [
+                bold + "Name" + end + "      " + bold + "Status" + end,
+                "api       " + red + "down" + end,
+                "database  up",
+            ],
+        )
+
+    def test_no_ansi_codes(self):
+        """Tests that the formats are removed without the ansi codes"""
+        table = Table(["a", "b"], separator=" | ")
+        self.assertEqual(
+            table.render([["[r]x\\@@", "[y]yy@"], ["zzz", 1]], color=False),
+            "a   | b\nx@  | yy\nzzz | 1",
+        )
+        self.assertEqual(
+            Table(printy=Printy(color=False)).render([["[r]a@", "b"]]), "a  b"
+        )
+
+    def test_alignment(self):
+        """Tests that each column is aligned as given"""
+        table = Table(align=["<", ">", "^", "^"], separator="|")
+        self.assertEqual(
+            table.render([["a", "b", "c", "d"], ["aaaa", "bbbb", "cccc", "dddd"]]),
+            "a   |   b| c  | d\naaaa|bbbb|cccc|dddd",
+        )
+        with self.assertRaises(ValueError):
+            Table(align=["<", "="])
+
+    def test_objects_and_missing_cells(self):
+        """Tests that objects are shown as printy() does and missing cells are empty"""
+        table = Table(["a", "b", "c"])
+        self.assertEqual(
+            table.render([[1, None], [[1, "[x]"]]], color=False),
+            "a           b     c\n1           None\n[1, '[x]']",
+        )
+        with self.assertRaises(ValueError):
+            table.render([["a", "b", "c", "d"]])
+
+    def test_str_subclasses(self):
+        """Tests that the str subclasses are shown as printy() shows them"""
+
+        class Level(str, enum.Enum):
+            ERROR = "[r]a@"
+
+        class Shouting(str):
+            def __str__(self):
+                return self.replace("b", "B")
+
+        printy = Printy(color=True)
+        lines = Table(widths=[11, 1]).render(
+            [[Level.ERROR, Shouting("[r]b@")], ["[r]a@", "[r]b@"]], color=True
+        )
+        self.assertEqual(
+            lines.splitlines(),
+            [
+                printy.get_formatted_text(Level.ERROR).ljust(11)
+                + "  "
+                + printy.get_formatted_text(Shouting("[r]b@")),
+                red + "a" + end + " " * 10 + "  " + red + "b" + end,
+            ],
+        )
+
+    def test_given_widths(self):
+        """Tests that the cells longer than their column are cut with an ellipsis"""
+        table = Table(widths=[5, 3])
+        self.assertEqual(
+            table.render([["abcdefgh", "[r]abcd@"], ["ab", "[r]a@[y]bcd@"]]),
+            "abcd…  "
+            + red
+            + "ab…"
+            + end
+            + "\nab     "
+            + red
+            + "a"
+            + Flags.get_transition("r", "y")
+            + "b…"
+            + end,
+        )
+        with self.assertRaises(ValueError):
+            Table(["a"], widths=[1, 2])
+        with self.assertRaises(ValueError):
+            Table(widths=[0])
+
+    def test_wide_characters(self):
+        """Tests that the wide and combining characters take their cells"""
+        table = Table(["名前", "x"], widths=[5, 1])
+        self.assertEqual(
+            table.render(
+                [["漢", "y"], ["a\u0301bcd", "z"], ["漢字漢", "w"]], color=False
+            ),
+            "名前   x\n漢     y\na\u0301bcd   z\n漢字…  w",
+        )
+        self.assertEqual(
+            Table(widths=[4]).render([["漢字漢"]], color=False),
+            "漢…",
+        )
+
+    def test_sampled_widths(self):
+        """Tests that only the first rows give the width of the columns"""
+        rows = iter([["ab", "x"], ["a", "x"], ["abcdef", "x"], ["abc", "x"]])
+        lines = Table(sample_size=2).iter_lines(rows, color=False)
+
+        self.assertEqual(next(lines), "ab  x")
+        # The rest of rows are not read until they're rendered
+        self.assertEqual(next(rows), ["abcdef", "x"])
+        self.assertEqual(list(lines), ["a   x", "a…  x"])
+
+        self.assertEqual(
+            Table(sample_size=None).render(
+                [["a", "x"], ["a", "x"], ["abcdef", "x"]], color=False
+            ),
+            "a       x\na       x\nabcdef  x",
+        )
+        self.assertEqual(Table().render([]), "")
+        self.assertEqual(Table(["a"]).render([]), bold + "a" + end)
+
+    def test_cells_parsed_once(self):
+        """Tests that the cells already parsed are not parsed again"""
+        table = Table()
+        rows = [["[r]up@", "%d" % i] for i in range(3)]
+        with mock.patch.object(Printy, "_tokenize", wraps=Printy._tokenize) as tokenize:
+            table.render(rows, color=True)
+            table.render(rows, color=True)
+        self.assertEqual(tokenize.call_count, 4)
+
+        # Formatted again without the ansi codes
+        self.assertEqual(table.render(rows[:1], color=False), "up  0")
+        with mock.patch("printy.table.cell_cache_size", 2):
+            table.render(rows, color=False)
+        self.assertLessEqual(len(table._cells), 2)
+
+    def test_invalid_flags(self):
+        """Tests that invalid flags raise, even without the ansi codes"""
+        with self.assertRaises(InvalidFlag):
+            Table().render([["[P]a@"]])
+        with self.assertRaises(InvalidFlag):
+            Table().render([["[P]a@"]], color=False)
+        with self.assertRaises(InvalidFlag):
+            Table(["a"], header_flags="P").render([])
+
+    def test_print(self):
+        """Tests that the lines are printed out a few at a time"""
+        rows = [["a", "[r]b@"]] * 5
+        output = io.StringIO()
+        with (
+            mock.patch.dict(os.environ, {"NO_COLOR": "1"}),
+            redirect_stdout(output),
+            mock.patch("builtins.print", wraps=print) as p,
+        ):
+            Table().print(rows, lines_per_write=2)
+        self.assertEqual(output.getvalue(), "a  b\n" * 5)
+        self.assertEqual(p.call_count, 3)
+
+    def test_package_class(self):
+        """Tests that Table is available from the package"""
+        self.assertIs(printy.Table, Table)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from printy import core
+from printy.core import WINDOWS, Printy
+from printy.template import Template
+
+# Neither disables nor forces the ansi codes, whatever the environment is
+color_env = {"NO_COLOR": "", "FORCE_COLOR": "", "TERM": ""}
+
+
+class TestCompiledTemplate(unittest.TestCase):
+    """Test case for the pre-parsed templates returned by compile()"""
+
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, color_env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.printy = Printy()
+        self.raw_text = self.printy.get_formatted_text
+
+    def test_render_equals_formatting_each_time(self):
+        """Tests that rendering is the same as formatting the filled text"""
+        template = self.printy.compile("[rB]{level}@ [c]{msg}@")
+        result = template.render(level="ERROR", msg="Something failed")
+
+        self.assertIsInstance(template, Template)
+        self.assertEqual(result, self.raw_text("[rB]ERROR@ [c]Something failed@"))
+
+    def test_render_positional_values(self):
+        """Tests that positional fields are also replaced"""
+        template = self.printy.compile("[y]{}@ and {}")
+
+        self.assertEqual(template.render(1, 2), self.raw_text("[y]1@ and 2"))
+
+    def test_values_are_not_parsed(self):
+        """Tests that the special characters in the values are kept as they are"""
+        template = self.printy.compile("[n]{email}@")
+        result = template.render(email="[r]me@mail.com")
+
+        self.assertEqual(result, "\x1b[38;5;28m[r]me@mail.com\x1b[0m")
+
+    def test_global_flags_and_predefined(self):
+        """Tests that global and predefined flags are applied on compile"""
+        global_template = self.printy.compile("{}", flags="rB")
+        predefined_template = self.printy.compile("{} [y]{}@", predefined="b")
+
+        self.assertEqual(global_template.render("hi"), self.raw_text("hi", "rB"))
+        self.assertEqual(
+            predefined_template.render("a", "b"),
+            self.raw_text("a [y]b@", predefined="b"),
+        )
+
+    def test_background_flags(self):
+        """Tests that the background brackets are not taken as fields"""
+        template = self.printy.compile("[yB{o}]{}@")
+
+        self.assertEqual(template.render("Hello"), self.raw_text("[yB{o}]Hello@"))
+
+    def test_fields_with_special_characters(self):
+        """Tests that the brackets and '@' of the fields are part of them"""
+        template = self.printy.compile("{0[k]} [y]{1:@>4}@")
+        self.assertEqual(
+            template.render({"k": "a"}, 1), self.raw_text("a [y]\\@\\@\\@1@")
+        )
+        self.assertEqual(template.plain.format({"k": "a"}, 1), "a @@@1")
+
+    def test_print_uses_end(self):
+        """Tests that print writes the rendered text followed by 'end'"""
+        with mock.patch.dict(os.environ, color_env):
+            template = Printy().compile("[r]{}@", end="!")
+        output = io.StringIO()
+        with redirect_stdout(output):
+            template.print("done")
+
+        expected = Printy(color=True).get_formatted_text("[r]done@")
+        self.assertEqual(output.getvalue(), expected + "!")
+
+    def test_print_without_ansi_codes(self):
+        """Tests that the codes are not printed to a file, like printy() does"""
+        with mock.patch.dict(os.environ, color_env):
+            template = Printy().compile("[r]{}@ [y]{x}@")
+            with tempfile.TemporaryFile("w+") as file:
+                with redirect_stdout(file):
+                    template.print("a", x="[b]")
+                file.seek(0)
+                self.assertEqual(file.read(), "a [b]\n")
+
+        with mock.patch.dict(os.environ, {"NO_COLOR": "1"}):
+            template = Printy().compile("[r]{}@")
+        output = io.StringIO()
+        with redirect_stdout(output):
+            template.print("a")
+        self.assertEqual(output.getvalue(), "a\n")
+        # Nor added to the rendered text
+        self.assertEqual(template.render("a"), "a")
+
+    def test_cleaned_template_on_unconfigured_windows(self):
+        """Tests that no ansi codes are compiled if windows is not configured"""
+        self.printy.platform = WINDOWS
+        self.printy.virtual_terminal_processing = False
+        template = self.printy.compile("[r]{}@")
+
+        self.assertEqual(template.render("text"), "text")
+
+    def test_repr(self):
+        """Tests that the repr shows the template"""
+        self.assertEqual(repr(Template("{}")), "Template('{}')")
+
+    def test_module_level_compile(self):
+        """Tests that compile is available from the package"""
+        import printy
+
+        template = printy.compile("[c]{}@")
+        self.assertEqual(template.render(1), printy.raw("[c]1@"))
+
+
+class TestFmt(unittest.TestCase):
+    """Test case for formatting templates with values that are never parsed"""
+
+    def setUp(self):
+        self.printy = Printy(color=True)
+        self.raw_text = self.printy.get_formatted_text
+        core._get_formatted_template.cache_clear()
+
+    def test_same_as_escaping_the_values(self):
+        """Tests that the values are shown as they are, as if escaped"""
+        user = "[r]mallory@"
+        message = "@@ ] [B]{}@"
+        self.assertEqual(
+            self.printy.fmt("[r]{}@ said [c]{msg}@ {{}}", user, msg=message),
+            self.raw_text(
+                "[r]%s@ said [c]%s@ {}"
+                % (self.printy.escape(user), self.printy.escape(message))
+            ),
+        )
+
+    def test_values_ending_with_a_backslash(self):
+        """Tests a value that would escape the special character after it"""
+        self.assertEqual(
+            self.printy.fmt("[r]{}@ b", "a\\"),
+            core.Flags.get_prefix("r") + "a\\" + core.Flags.get_end_of_line() + " b",
+        )
+
+    def test_values_are_not_parsed(self):
+        """Tests that only the template is parsed, not the values"""
+        with mock.patch.object(Printy, "_tokenize", wraps=Printy._tokenize) as tokenize:
+            text = self.printy.fmt("[y]{}@ {:>5}", "[r]a@" * 1000, 12)
+        tokenize.assert_called_once_with("[y]{}@ {:>5}", unescape=True)
+        self.assertTrue(
+            text.endswith("[r]a@" + core.Flags.get_end_of_line() + "    12")
+        )
+
+    def test_fields_with_special_characters(self):
+        """Tests item access and format specs with the special characters"""
+        self.assertEqual(
+            self.printy.fmt("[r]{0[k]}@ {a[0]:@>4} [y]{{@}}@", {"k": 1}, a=[5]),
+            # The doubled braces are not a field, so the '@' ends the format
+            self.raw_text("[r]1@ @@@5 [y]{@}@"),
+        )
+        self.assertEqual(
+            Printy(color=False).fmt("[r]{0[k]}@ {0[j]:[^{1}}", {"k": 1, "j": 2}, 3),
+            "1 [2[",
+        )
+
+    def test_templates_are_cached(self):
+        """Tests that the same template is parsed only once"""
+        with mock.patch.object(Printy, "_tokenize", wraps=Printy._tokenize) as tokenize:
+            for i in range(3):
+                self.printy.fmt("[y]{}@", i)
+        self.assertEqual(tokenize.call_count, 1)
+
+        # A different one without the ansi codes
+        self.assertEqual(Printy(color=False).fmt("[y]{}@", "[r]a@"), "[r]a@")
+
+    def test_module_level_fmt(self):
+        """Tests that fmt is available from the package"""
+        import printy
+
+        self.assertEqual(printy.fmt("{}", "[r]a@"), "[r]a@")
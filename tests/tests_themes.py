@@ -0,0 +1,139 @@
+import unittest
+
+import printy
+from printy import themes
+from printy.core import Printy
+from printy.exceptions import InvalidFlag
+from printy.flags import Flags
+from printy.style import Style
+from printy.table import Table
+
+
+class TestThemes(unittest.TestCase):
+    """Test case for the colors, aliases and themes added at runtime"""
+
+    def setUp(self):
+        self.raw_text = Printy(color=True).get_formatted_text
+
+    def tearDown(self):
+        with themes._lock:
+            themes._apply({}, {}, {}, None)
+
+    def test_colors(self):
+        """Tests that a flag added is a color, and it's gone once removed"""
+        themes.add_flag("a", 214)
+        self.assertEqual(Flags.get_flag_table()["a"], ("38;5;214", "48;5;214"))
+        self.assertEqual(Flags.get_prefix("a{a}B"), "\x1b[48;5;214;38;5;214;1m")
+        themes.add_flag("a", 215)
+        self.assertEqual(Flags.get_prefix("a"), "\x1b[38;5;215m")
+
+        themes.remove_flag("a")
+        with self.assertRaises(InvalidFlag):
+            Flags.get_prefix("a")
+
+    def test_aliases(self):
+        """Tests that an alias is replaced by its flags"""
+        themes.add_alias("E", "rB{y}")
+        themes.add_alias("W", "E<o")
+        self.assertEqual(self.raw_text("[E]a@"), self.raw_text("[rB{y}]a@"))
+        self.assertEqual(self.raw_text("[WU]a@"), self.raw_text("[rB<o{y}U]a@"))
+        # As a background, all its colors are backgrounds
+        self.assertEqual(Flags.get_prefix("n{E}"), "\x1b[48;5;11;48;5;196;1;38;5;28m")
+        # The builtin flags are looked up in a single table
+        self.assertNotIn("E", Flags.get_flag_table())
+        self.assertEqual(
+            Flags.get_alias_table()["E"],
+            (("48;5;11", "38;5;196", "1"), ("48;5;11", "48;5;196", "1")),
+        )
+
+        # An alias as the background of another
+        themes.add_alias("K", "U{E}")
+        self.assertEqual(Flags.get_prefix("K"), "\x1b[48;5;11;48;5;196;1;4m")
+
+        themes.remove_flag("K")
+        themes.add_flag("E", 160)
+        self.assertEqual(Flags.get_prefix("E"), "\x1b[38;5;160m")
+        themes.add_alias("E", "n")
+        self.assertEqual(Flags.get_prefix("E"), Flags.get_prefix("n"))
+
+    def test_themes(self):
+        """Tests that the aliases of the theme in use are applied"""
+        themes.add_alias("E", "r")
+        themes.add_theme("dark", {"E": "r>", "W": "o>"})
+        themes.add_theme("light", {"E": "<r", "W": "<o"})
+        self.assertIsNone(themes.get_theme())
+        with self.assertRaises(InvalidFlag):
+            Flags.get_prefix("W")
+
+        themes.use_theme("dark")
+        self.assertEqual(themes.get_theme(), "dark")
+        self.assertEqual(self.raw_text("[E]a@ [W]b@"), self.raw_text("[r>]a@ [o>]b@"))
+        themes.use_theme("light")
+        self.assertEqual(self.raw_text("[E]a@ [W]b@"), self.raw_text("[<r]a@ [<o]b@"))
+
+        # Replacing the theme in use applies it right away
+        themes.add_theme("light", {"W": "y"})
+        self.assertEqual(self.raw_text("[E]a@ [W]b@"), self.raw_text("[r]a@ [y]b@"))
+        themes.use_theme(None)
+        self.assertEqual(Flags.get_prefix("E"), Flags.get_prefix("r"))
+
+    def test_invalid_changes_change_nothing(self):
+        """Tests that an invalid change raises and leaves the flags as they were"""
+        themes.add_alias("E", "r")
+        themes.add_theme("dark", {"W": "oE"})
+        themes.use_theme("dark")
+        for change, args in (
+            (themes.add_alias, ("X", "Q")),
+            (themes.add_alias, ("X", "r{Q}")),
+            (themes.add_alias, ("E", "W")),
+            (themes.add_theme, ("dark", {"W": "oW"})),
+        ):
+            with self.subTest(args=args), self.assertRaises(InvalidFlag):
+                change(*args)
+        for change, args in (
+            (themes.add_flag, ("r", 1)),
+            (themes.add_flag, ("ab", 1)),
+            (themes.add_flag, ("<a>", 1)),
+            (themes.add_flag, ("a", 256)),
+            (themes.add_alias, ("{", "r")),
+            (themes.add_theme, ("light", {"r": "n"})),
+            # The theme in use has an alias with that flag
+            (themes.add_flag, ("W", 1)),
+            (themes.remove_flag, ("X",)),
+            (themes.use_theme, ("light",)),
+        ):
+            with self.subTest(args=args), self.assertRaises(ValueError):
+                change(*args)
+        self.assertEqual(themes.get_theme(), "dark")
+        self.assertEqual(self.raw_text("[EW]a@"), self.raw_text("[ror]a@"))
+
+    def test_dependent_caches(self):
+        """Tests that nothing formatted with the old flags is used again"""
+        themes.add_alias("E", "r")
+        template = Printy(color=True).fmt("[E]{}@", "a")
+        table = Table(widths=[1])
+        line = table.render([["[E]a@"]], color=True)
+        style = Style("E")
+        self.assertEqual(style, "r")
+
+        themes.add_alias("E", "n")
+        self.assertEqual(Printy(color=True).fmt("[E]{}@", "a"), self.raw_text("[n]a@"))
+        self.assertNotEqual(Printy(color=True).fmt("[E]{}@", "a"), template)
+        self.assertEqual(table.render([["[E]a@"]], color=True), self.raw_text("[n]a@"))
+        self.assertNotEqual(table.render([["[E]a@"]], color=True), line)
+        # Styles already created keep the flags they had
+        self.assertEqual(style, "r")
+        self.assertEqual(Style("E"), "n")
+
+    def test_package_functions(self):
+        """Tests that the functions are available from the package"""
+        self.assertIs(printy.add_flag, themes.add_flag)
+        self.assertIs(printy.add_alias, themes.add_alias)
+        self.assertIs(printy.remove_flag, themes.remove_flag)
+        self.assertIs(printy.add_theme, themes.add_theme)
+        self.assertIs(printy.use_theme, themes.use_theme)
+        self.assertIs(printy.get_theme, themes.get_theme)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+from unittest import mock
+
+import printy
+from printy import widths
+from printy.core import Printy
+from printy.widths import (
+    center,
+    get_char_width,
+    get_text_width,
+    get_width,
+    ljust,
+    rjust,
+)
+
+
+class TestWidths(unittest.TestCase):
+    """Test case for the number of cells of the terminal a text takes"""
+
+    def setUp(self):
+        widths._get_cached_width.cache_clear()
+
+    def test_characters(self):
+        """Tests the number of cells each kind of character takes"""
+        self.assertEqual(get_char_width("a"), 1)
+        self.assertEqual(get_char_width("é"), 1)
+        self.assertEqual(get_char_width("漢"), 2)
+        self.assertEqual(get_char_width("Ｆ"), 2)
+        self.assertEqual(get_char_width("\u0301"), 0)  # combining accent
+        self.assertEqual(get_char_width("\u200b"), 0)  # zero width space
+        self.assertEqual(get_char_width("\u200d"), 0)  # zero width joiner
+        self.assertEqual(get_char_width("\x1b"), 0)
+
+    def test_plain_texts(self):
+        """Tests the width of texts without inline formats"""
+        self.assertEqual(get_text_width("Some text"), 9)
+        self.assertEqual(get_text_width("漢字 ok"), 7)
+        self.assertEqual(get_text_width("é"), 1)
+        self.assertEqual(get_width(""), 0)
+        self.assertEqual(get_width("漢字\\ok"), 7)
+
+    def test_inline_formats(self):
+        """Tests that the inline formats are not counted in the width"""
+        self.assertEqual(get_width("[rB]漢字@ ok"), 7)
+        self.assertEqual(get_width("[r]Some@ [y]text@"), 9)
+        self.assertEqual(get_width("\\[r\\]a\\@"), 5)
+        self.assertEqual(get_width("[r]unclosed"), len(Printy.strip("[r]unclosed")))
+        # Not parsed, so the flags are not checked
+        self.assertEqual(get_width("[Z]a@"), 1)
+
+    def test_cache(self):
+        """Tests that the widths of short texts are cached, and long ones are not"""
+        with mock.patch.object(Printy, "_tokenize", wraps=Printy._tokenize) as tokenize:
+            for _ in range(3):
+                get_width("[r]a@")
+            get_width("b")
+            self.assertEqual(tokenize.call_count, 1)
+
+            # Long texts are not cached
+            text = "[r]a@" * widths.max_cached_length
+            self.assertEqual(get_width(text), widths.max_cached_length)
+            self.assertEqual(get_width(text), widths.max_cached_length)
+            self.assertEqual(tokenize.call_count, 3)
+        self.assertEqual(widths._get_cached_width.cache_info().currsize, 1)
+
+    def test_justify(self):
+        """Tests that the texts are padded by their width, not their length"""
+        self.assertEqual(ljust("[r]漢@", 5), "[r]漢@   ")
+        self.assertEqual(rjust("[r]漢@", 5, "."), "...[r]漢@")
+        self.assertEqual(center("[r]漢@", 5), " [r]漢@  ")
+        self.assertEqual(center("abc", 2), "abc")
+        # The special characters are escaped
+        self.assertEqual(ljust("a", 3, "@"), "a\\@\\@")
+        self.assertEqual(printy.strip(ljust("[r]a@", 3, "@")), "a@@")
+        for fillchar in ("", "ab", "漢", "\u0301"):
+            with self.subTest(fillchar=fillchar), self.assertRaises(TypeError):
+                ljust("a", 3, fillchar)
+
+    def test_package_functions(self):
+        """Tests that the functions are available from the package"""
+        self.assertIs(printy.width, get_width)
+        self.assertIs(printy.ljust, ljust)
+        self.assertIs(printy.rjust, rjust)
+        self.assertIs(printy.center, center)
+
+
+if __name__ == "__main__":
+    unittest.main()
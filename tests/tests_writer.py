@@ -0,0 +1,263 @@
+import io
+import os
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from printy import writer as writer_module
+from printy.core import Printy
+from printy.writer import AsyncPrintyWriter, PrintyWriter
+
+# Neither disables nor forces the ansi codes, whatever the environment is
+color_env = {"NO_COLOR": "", "FORCE_COLOR": "", "TERM": ""}
+
+
+class TestPrintyWriter(unittest.TestCase):
+    """Test case for the buffered writer"""
+
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, color_env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.raw_text = Printy().get_formatted_text
+
+    def test_buffered_until_flush(self):
+        """Tests that nothing is written until the buffer is flushed"""
+        stream = io.StringIO()
+        writer = PrintyWriter(stream)
+        writer.format("[r]Some@ text")
+        writer.format({"a": 1}, end="")
+
+        self.assertEqual(stream.getvalue(), "")
+        writer.flush()
+        self.assertEqual(
+            stream.getvalue(),
+            self.raw_text("[r]Some@ text") + "\n" + self.raw_text({"a": 1}),
+        )
+
+    def test_single_write_per_flush(self):
+        """Tests that the whole buffer is written at once"""
+        stream = mock.Mock()
+        with PrintyWriter(stream) as writer:
+            for i in range(100):
+                writer.format("[n]%d@" % i, end="")
+
+        stream.write.assert_called_once_with(
+            "".join(self.raw_text("[n]%d@" % i) for i in range(100))
+        )
+
+    def test_flush_on_buffer_size(self):
+        """Tests that the buffer is written when it's full"""
+        stream = io.StringIO()
+        writer = PrintyWriter(stream, buffer_size=10)
+        writer.write("12345")
+        self.assertEqual(stream.getvalue(), "")
+        writer.write("67890")
+        self.assertEqual(stream.getvalue(), "1234567890")
+
+    def test_flush_on_interval(self):
+        """Tests that the buffer is written when the interval has passed"""
+        stream = io.StringIO()
+        writer = PrintyWriter(stream, flush_interval=5)
+        with mock.patch("printy.writer.time.monotonic", return_value=0):
+            writer.flush()
+        with mock.patch("printy.writer.time.monotonic", return_value=1):
+            writer.write("first ")
+        self.assertEqual(stream.getvalue(), "")
+        with mock.patch("printy.writer.time.monotonic", return_value=6):
+            writer.write("second")
+        self.assertEqual(stream.getvalue(), "first second")
+
+    def test_binary_stream(self):
+        """Tests that the text is encoded for binary streams"""
+        stream = io.BytesIO()
+        with PrintyWriter(stream) as writer:
+            writer.format("[y]Olé@")
+
+        self.assertEqual(stream.getvalue(), (self.raw_text("[y]Olé@") + "\n").encode())
+
+    def test_no_ansi_codes_for_files(self):
+        """Tests that the stream is checked once to add the ansi codes or not"""
+        with tempfile.TemporaryFile("w+") as stream:
+            with PrintyWriter(stream) as writer:
+                writer.format("[y]Some@ text")
+            with PrintyWriter(stream, color=True) as colored_writer:
+                colored_writer.format("[y]Some@ text", end="")
+            stream.seek(0)
+
+            self.assertFalse(writer.color)
+            self.assertEqual(
+                stream.read(), "Some text\n" + self.raw_text("[y]Some@ text")
+            )
+
+    def test_stdout_by_default(self):
+        """Tests that the text is written to stdout without a stream"""
+        output = io.StringIO()
+        with redirect_stdout(output):
+            with PrintyWriter() as writer:
+                writer.write("text")
+
+        self.assertEqual(output.getvalue(), "text")
+
+    def test_write_after_close(self):
+        """Tests that closing twice is allowed but writing after is not"""
+        writer = PrintyWriter(io.StringIO())
+        writer.close()
+        writer.close()
+        with self.assertRaises(ValueError):
+            writer.write("text")
+
+
+class BlockedStream(io.StringIO):
+    """A stream whose writes wait until it's released"""
+
+    def __init__(self):
+        super().__init__()
+        self.writing = threading.Event()
+        self.released = threading.Event()
+        self.writes = []
+
+    def write(self, text):
+        self.writing.set()
+        self.released.wait(5)
+        self.writes.append(text)
+        return super().write(text)
+
+
+class TestAsyncPrintyWriter(unittest.TestCase):
+    """Test case for the writer with a background thread"""
+
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, color_env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.raw_text = Printy().get_formatted_text
+        self.stream = BlockedStream()
+
+    def block_writer(self, writer):
+        """Makes the background thread wait in a write of 'first'"""
+        writer.write("first ")
+        self.assertTrue(self.stream.writing.wait(5))
+
+    def test_messages_written_in_background(self):
+        """Tests that callers are not blocked by a slow stream"""
+        writer = AsyncPrintyWriter(self.stream)
+        self.addCleanup(writer.close)
+        self.block_writer(writer)
+        writer.format("[r]Not blocked@")
+
+        self.assertEqual(self.stream.getvalue(), "")
+        self.stream.released.set()
+        writer.flush()
+        self.assertEqual(
+            self.stream.getvalue(), "first " + self.raw_text("[r]Not blocked@") + "\n"
+        )
+
+    def test_queued_messages_written_at_once(self):
+        """Tests that all the queued messages are written with a single write"""
+        writer = AsyncPrintyWriter(self.stream)
+        self.block_writer(writer)
+        for i in range(3):
+            writer.write(str(i))
+        self.stream.released.set()
+        writer.close()
+
+        self.assertEqual(self.stream.writes, ["first ", "012"])
+
+    def test_drop_newest(self):
+        """Tests that with the 'drop_newest' policy the new messages are lost"""
+        writer = AsyncPrintyWriter(
+            self.stream, max_queue_size=2, overflow="drop_newest"
+        )
+        self.block_writer(writer)
+        for i in range(5):
+            writer.write(str(i))
+        self.stream.released.set()
+        writer.close()
+
+        self.assertEqual(self.stream.getvalue(), "first 01")
+        self.assertEqual(writer.dropped, 3)
+
+    def test_drop_oldest(self):
+        """Tests that with the 'drop_oldest' policy the queued messages are lost"""
+        writer = AsyncPrintyWriter(
+            self.stream, max_queue_size=2, overflow="drop_oldest"
+        )
+        self.block_writer(writer)
+        for i in range(5):
+            writer.write(str(i))
+        self.stream.released.set()
+        writer.close()
+
+        self.assertEqual(self.stream.getvalue(), "first 34")
+        self.assertEqual(writer.dropped, 3)
+
+    def test_block_until_there_is_room(self):
+        """Tests that with the 'block' policy no message is lost"""
+        writer = AsyncPrintyWriter(self.stream, max_queue_size=1)
+        self.block_writer(writer)
+        writer.write("0")
+        threading.Timer(0.05, self.stream.released.set).start()
+        writer.write("1")
+        writer.close()
+
+        self.assertEqual(self.stream.getvalue(), "first 01")
+        self.assertEqual(writer.dropped, 0)
+
+    def test_format_in_thread(self):
+        """Tests that values can be formatted by the background thread"""
+        self.stream.released.set()
+        with AsyncPrintyWriter(self.stream, format_in_thread=True) as writer:
+            writer.format({"a": [1, None]}, end="")
+            writer.format("[P]invalid flag@")
+            writer.format("[y]ok@")
+
+        self.assertEqual(
+            self.stream.getvalue(),
+            self.raw_text({"a": [1, None]}) + self.raw_text("[y]ok@") + "\n",
+        )
+        self.assertEqual(writer.errors, 1)
+
+    def test_write_errors_are_counted(self):
+        """Tests that an error writing to the stream is counted, not raised"""
+        stream = mock.Mock()
+        stream.write.side_effect = OSError
+        with AsyncPrintyWriter(stream) as writer:
+            writer.write("text")
+
+        self.assertEqual(writer.errors, 1)
+
+    def test_closed_writer(self):
+        """Tests that writing to a closed writer is not allowed"""
+        self.stream.released.set()
+        writer = AsyncPrintyWriter(self.stream)
+        writer.close()
+        writer.close()
+
+        with self.assertRaises(ValueError):
+            writer.write("text")
+
+    def test_invalid_overflow_policy(self):
+        """Tests that an unknown policy raises ValueError"""
+        with self.assertRaises(ValueError):
+            AsyncPrintyWriter(self.stream, overflow="explode")
+
+    def test_invalid_queue_size(self):
+        """Tests that a queue size below 1 raises ValueError"""
+        for size in (0, -1):
+            with self.subTest(size=size), self.assertRaises(ValueError):
+                AsyncPrintyWriter(self.stream, max_queue_size=size)
+
+    def test_closed_at_exit(self):
+        """Tests that the writers still open write their messages at exit"""
+        self.stream.released.set()
+        writer = AsyncPrintyWriter(self.stream)
+        writer.write("text")
+        self.assertIn(writer, writer_module._open_writers)
+        writer_module._close_writers()
+
+        self.assertTrue(writer.closed)
+        self.assertEqual(self.stream.getvalue(), "text")
+        self.assertNotIn(writer, writer_module._open_writers)